@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark of the Base58 encoder: the original digit by digit implementation of
+Bitcoin.__b58encode against bertocoin.base58.
+
+Run it from the root of the repository:
+    $ poetry run python3 benchmarks/base58_bench.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bertocoin import base58  # noqa: E402
+
+
+def legacy_b58encode(byte_array):
+    """
+    The Base58 encoder as it was implemented in Bitcoin.__b58encode.
+    """
+
+    digit = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+    base = len(digit)
+    val = 0
+    for b in bytearray(byte_array):
+        val *= 256
+        val += b
+
+    result = ""
+    while val:
+        (val, mod) = divmod(val, base)
+        result = digit[mod] + result
+
+    pad = 0
+    for b in byte_array:
+        if b == 0x00:
+            pad += 1
+        else:
+            break
+
+    return (digit[0] * pad) + result
+
+
+def main(coins=10000):
+    # the payloads of a batch of coins: one WIF and one address per coin
+    payloads = []
+    for _ in range(coins):
+        payloads.append(b"\x80" + os.urandom(32) + os.urandom(4))
+        payloads.append(b"\x00" + os.urandom(20) + os.urandom(4))
+
+    for payload in payloads[:100]:
+        assert legacy_b58encode(payload) == base58.b58encode(payload)
+
+    legacy = min(timeit.repeat(lambda: [legacy_b58encode(payload) for payload in payloads], number=1, repeat=5))
+    chunked = min(timeit.repeat(lambda: [base58.b58encode(payload) for payload in payloads], number=1, repeat=5))
+
+    print(f"Base58 encoding of {len(payloads)} payloads ({coins} coins):")
+    print(f"  legacy  : {1e6 * legacy / len(payloads):8.2f} µs/payload")
+    print(f"  chunked : {1e6 * chunked / len(payloads):8.2f} µs/payload  ({legacy / chunked:.1f}x)")
+
+    # the legacy encoder is quadratic in the size of the input, the gap grows with longer payloads
+    long_payload = os.urandom(1024)
+    legacy = min(timeit.repeat(lambda: legacy_b58encode(long_payload), number=10, repeat=5)) / 10
+    chunked = min(timeit.repeat(lambda: base58.b58encode(long_payload), number=10, repeat=5)) / 10
+
+    print(f"Base58 encoding of a {len(long_payload)} bytes payload:")
+    print(f"  legacy  : {1e6 * legacy:8.2f} µs")
+    print(f"  chunked : {1e6 * chunked:8.2f} µs  ({legacy / chunked:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark of the QR codes of a coin (one for the WIF and one for the address):
+pyqrcode.create against bertocoin.qr.QREncoder, with and without a fixed mask.
+
+Run it from the root of the repository:
+    $ poetry run python3 benchmarks/qr_bench.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyqrcode  # noqa: E402
+
+from bertocoin import base58, qr  # noqa: E402
+
+
+def main(coins=20):
+    contents = []
+    for _ in range(coins):
+        contents.append(base58.b58check_encode(b"\x80" + os.urandom(32)))
+        contents.append(base58.b58check_encode(b"\x00" + os.urandom(20)))
+
+    encoder = qr.QREncoder()
+    fixed_mask_encoder = qr.QREncoder(fixed_mask=0)
+    # the first codes of every size fill the caches of the encoders
+    for content in contents[:2]:
+        encoder.create(content)
+        fixed_mask_encoder.create(content)
+
+    candidates = [
+        ("pyqrcode.create  ", lambda content: pyqrcode.create(content).code),
+        ("QREncoder        ", encoder.create),
+        ("QREncoder, mask 0", fixed_mask_encoder.create),
+    ]
+
+    print(f"QR codes of {coins} coins (WIF + address):")
+    reference = None
+    for name, create in candidates:
+        seconds = min(timeit.repeat(lambda: [create(content) for content in contents], number=1, repeat=3))
+        per_coin = 1000 * seconds / coins
+        reference = reference or per_coin
+        print(f"  {name} : {per_coin:8.2f} ms/coin  ({reference / per_coin:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Startup time of the light commands (generate-pass and --help), which must not import the heavy
+dependencies of minting: the EC library, the QR and PNG stack, asyncio or the process pool.
+
+Every command is run in a new interpreter, the way a container runs it, and timed from the outside.
+One more run with "python -X importtime" gives the breakdown of the imports, e.g.:
+    $ poetry run python3 benchmarks/startup.py
+    $ poetry run python3 benchmarks/startup.py --save-baseline
+    $ poetry run python3 benchmarks/startup.py --compare --threshold 0.25
+It exits with status 1 if a command imports one of the HEAVY_MODULES, or, with --compare, if it is
+slower than the baseline by more than the threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup-baseline.json")
+
+# name -> arguments of "python bertocoin"
+COMMANDS = {
+    "generate-pass": ["generate-pass"],
+    "--generate-pass": ["--generate-pass"],
+    "--help": ["--help"],
+}
+
+# modules that only minting needs, and no light command may import
+HEAVY_MODULES = ("ecdsa", "pyqrcode", "png", "ripemd", "logging", "asyncio", "concurrent.futures",
+                 "bertocoin.bitcoin", "bertocoin.stamper", "bertocoin.terminator")
+
+
+def parse_importtime(stderr):
+    """
+    Parses the output of "python -X importtime".
+    :return: A list of (module, self µs, cumulative µs, nesting level), in the order they were imported
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # the header of the table
+            continue
+        name = fields[2].rstrip()
+        level = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(fields[0]), int(fields[1]), level))
+    return imports
+
+
+def run_command(arguments, importtime=False):
+    """
+    Runs "python bertocoin <arguments>" in a new interpreter, from the root of the repository.
+    :return: A tuple (seconds, stderr)
+    """
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["bertocoin"] + arguments
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    seconds = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"'{' '.join(command)}' exited with status {completed.returncode}:\n{completed.stderr}")
+    return seconds, completed.stderr
+
+
+def imported_modules(arguments):
+    """
+    The names of the modules imported by "python bertocoin <arguments>".
+    """
+    _, stderr = run_command(arguments, importtime=True)
+    return {name for name, _, _, _ in parse_importtime(stderr)}
+
+
+def run(repeat=5, top=10):
+    """
+    Times every command of COMMANDS.
+    :return: A dictionary with the ms of every command, its heaviest top level imports and the heavy
+             modules it imported, if any
+    """
+    # the interpreter alone, to tell the time of python from the time of bertocoin
+    interpreter = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        interpreter.append(time.perf_counter() - start)
+
+    commands = {}
+    for name, arguments in COMMANDS.items():
+        seconds = min(run_command(arguments)[0] for _ in range(repeat))
+        imports = parse_importtime(run_command(arguments, importtime=True)[1])
+        top_level = sorted((entry for entry in imports if entry[3] == 0), key=lambda entry: -entry[2])
+        commands[name] = {
+            "ms": 1e3 * seconds,
+            "import_ms": sum(cumulative for _, _, cumulative, level in imports if level == 0) / 1e3,
+            "modules": len(imports),
+            "top": [{"module": module, "cumulative_ms": cumulative / 1e3}
+                    for module, _, cumulative, _ in top_level[:top]],
+            "heavy": sorted({module for module, _, _, _ in imports if module in HEAVY_MODULES}),
+        }
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "interpreter_ms": 1e3 * min(interpreter),
+        "commands": commands,
+    }
+
+
+def compare(results, baseline, threshold, min_delta_ms=10.0):
+    """
+    Compares the commands of <results> with a <baseline> produced by run().
+    :param threshold: The relative slowdown tolerated, e.g.: 0.25 for 25%
+    :param min_delta_ms: Slowdowns smaller than this, in ms, are taken as noise
+    :return: A list of (command, baseline ms, current ms) with the commands slower than the threshold
+    """
+    regressions = []
+    for name, command in baseline["commands"].items():
+        current = results["commands"].get(name)
+        if current is not None and current["ms"] > max(command["ms"] * (1 + threshold), command["ms"] + min_delta_ms):
+            regressions.append((name, command["ms"], current["ms"]))
+    return regressions
+
+
+def report(results, baseline=None):
+    print(f"Python {results['python']}, interpreter alone: {results['interpreter_ms']:.1f} ms")
+    for name, command in results["commands"].items():
+        line = f"  {name:16} : {command['ms']:8.1f} ms, {command['modules']} modules imported"
+        if baseline and name in baseline["commands"]:
+            line += f"  ({command['ms'] / baseline['commands'][name]['ms'] - 1:+.0%} vs baseline)"
+        print(line)
+        for entry in command["top"]:
+            print(f"      {entry['cumulative_ms']:8.1f} ms  {entry['module']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Startup time of the light commands of bertocoin.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of every command, the fastest counts. Default = 5.")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest imports listed per command. Default = 10.")
+    parser.add_argument("--json", help="Write the results to this JSON file.")
+    parser.add_argument("--save-baseline", dest="save_baseline", action="store_true",
+                        help=f"Store the results as the baseline of this host ({BASELINE}).")
+    parser.add_argument("--compare", action="store_true",
+                        help="Compare with the baseline and exit with status 1 on regressions.")
+    parser.add_argument("--baseline", default=BASELINE, help="The baseline JSON file.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative slowdown tolerated per command. Default = 0.25 (25%%).")
+    parser.add_argument("--min-delta", dest="min_delta", type=float, default=10.0,
+                        help="Slowdowns below this many ms are ignored. Default = 10.")
+    args = parser.parse_args(argv)
+
+    results = run(repeat=args.repeat, top=args.top)
+
+    baseline = None
+    if args.compare:
+        with open(args.baseline, "r") as baseline_file:
+            baseline = json.load(baseline_file)
+    report(results, baseline)
+
+    for pathname in [args.json] + ([args.baseline] if args.save_baseline else []):
+        if pathname:
+            with open(pathname, "w") as json_file:
+                json.dump(results, json_file, indent=2)
+
+    status = 0
+    for name, command in results["commands"].items():
+        if command["heavy"]:
+            print(f"REGRESSION in {name}: imports {', '.join(command['heavy'])}")
+            status = 1
+
+    if baseline:
+        for name, baseline_ms, current_ms in compare(results, baseline, args.threshold, args.min_delta):
+            print(f"REGRESSION in {name}: {current_ms:.1f} ms, baseline {baseline_ms:.1f} ms")
+            status = 1
+
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
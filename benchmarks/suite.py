@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite of the minting pipeline. Every stage is timed in isolation on the same batch of
+coins, and then the whole pipeline end to end:
+
+- passphrase : sha256 of the seed of every coin (Coin_<serial>_<secret>)
+- ec         : public key derivation (precomputed table backend, and the ecdsa reference)
+- hash160    : RIPEMD-160 of the sha256 of the compressed public key
+- base58check: WIF and address encoding
+- template   : rendering of the compiled SVG template
+- qr         : QR codes of the WIF and the address, as png files and as inline SVG
+- shred      : secure deletion of the files of a coin
+- end_to_end : derive, stamp and shred a batch, the way a serial range is minted
+
+Nothing leaves the machine and no real secret is used. The results are printed in µs per coin,
+and can be written as JSON and compared with a baseline recorded on the same host, e.g.:
+    $ poetry run python3 benchmarks/suite.py --save-baseline
+    $ poetry run python3 benchmarks/suite.py --compare --threshold 0.25
+The comparison exits with status 1 if any stage is slower than the baseline by more than the threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bertocoin import base58, hashes, qr, secp256k1, shredder, template  # noqa: E402
+from bertocoin.bitcoin import Bitcoin  # noqa: E402
+from bertocoin.stamper import CoinStamper  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+RESOURCES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources")
+
+# not a real secret, only used to have coins of the right shape
+SECRET = "benchmark-secret-not-for-real-coins"
+
+
+def best_of(function, repeat):
+    """
+    Runs <function> <repeat> times and returns the fastest run, in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def coin_info(serial_number, WIF, address):
+    return {
+        'serial_number': serial_number,
+        'numerator': '1',
+        'denominator': '1000',
+        'WIF': WIF,
+        'address': address,
+    }
+
+
+def run(coins=200, repeat=3):
+    """
+    Times every stage on a batch of <coins> coins.
+    :return: A dictionary with the µs per coin of every stage and the coins/second of the end to end run
+    """
+    serial_numbers = [str(serial).zfill(4) for serial in range(1, coins + 1)]
+    seeds = [f"Coin_{serial_number}_{SECRET}".encode("utf-8") for serial_number in serial_numbers]
+    private_keys = [hashes.sha256(seed) for seed in seeds]
+    public_keys = [secp256k1.public_key(private_key) for private_key in private_keys]
+    compressed_keys = [bytes([2 + (public_key[63] & 1)]) + public_key[:32] for public_key in public_keys]
+    derived = Bitcoin(SECRET, "0000", "table").derive_many(serial_numbers)
+    coins_info = [coin_info(serial_number, WIF, address)
+                  for serial_number, (WIF, address) in zip(serial_numbers, derived)]
+
+    stages = {}
+
+    def stage(name, function):
+        stages[name] = 1e6 * best_of(function, repeat) / coins
+
+    stage("passphrase", lambda: [hashes.sha256(seed) for seed in seeds])
+
+    secp256k1.precomputed_table()
+    stage("ec_table", lambda: secp256k1.batch_to_affine([secp256k1.multiply_generator(int.from_bytes(key, "big"))
+                                                         for key in private_keys]))
+    # the reference backend is much slower, a tenth of the batch is enough
+    reference = Bitcoin(SECRET, "0000", "ecdsa")
+    sample = serial_numbers[:max(1, coins // 10)]
+    stages["ec_ecdsa"] = 1e6 * best_of(lambda: reference.derive_many(sample), repeat) / len(sample)
+
+    stage("hash160", lambda: [hashes.hash160(key) for key in compressed_keys])
+    stage("base58check", lambda: [(base58.b58check_encode(b"\x80" + private_key),
+                                   base58.b58check_encode(b"\x00" + key[:20]))
+                                  for private_key, key in zip(private_keys, compressed_keys)])
+
+    compiled_template = template.load_template(os.path.join(RESOURCES, "bertocoin.svg"))
+    values = {name: "x" * 12 for name in template.SLOTS}
+    stage("template", lambda: [compiled_template.render(values) for _ in range(coins)])
+
+    encoder = qr.QREncoder()
+    encoder.create(coins_info[0]["WIF"])
+    encoder.create(coins_info[0]["address"])
+    folder = tempfile.mkdtemp(prefix="bertocoin-bench-")
+    try:
+        pathname = os.path.join(folder, "qr.png")
+        stage("qr_png", lambda: [(qr.png_file(coin["WIF"], pathname, encoder=encoder),
+                                  qr.png_file(coin["address"], pathname, encoder=encoder)) for coin in coins_info])
+        stage("qr_inline", lambda: [(qr.svg_data_uri(coin["WIF"], encoder=encoder),
+                                     qr.svg_data_uri(coin["address"], encoder=encoder)) for coin in coins_info])
+
+        # the files of every coin: the printable and the QR images
+        stamper = CoinStamper(resources_path=RESOURCES, temp_folder=os.path.join(folder, "stamped"))
+        for coin in coins_info:
+            stamper.process_template(coin, per_serial=True)
+        files = sorted(os.listdir(stamper.temp_folder))
+
+        def shred():
+            copy = os.path.join(folder, "shred-me")
+            shutil.copytree(stamper.temp_folder, copy)
+            start = time.perf_counter()
+            shredder.Shredder().shred(copy)
+            return time.perf_counter() - start
+
+        stages["shred"] = 1e6 * min(shred() for _ in range(repeat)) / coins
+
+        def end_to_end():
+            output = os.path.join(folder, "delete-me")
+            batch_stamper = CoinStamper(resources_path=RESOURCES, temp_folder=output)
+            for serial_number, (WIF, address) in zip(serial_numbers,
+                                                     Bitcoin(SECRET, "0000", "table").derive_many(serial_numbers)):
+                batch_stamper.process_template(coin_info(serial_number, WIF, address), per_serial=True)
+            shredder.Shredder().shred(output)
+
+        stage("end_to_end", end_to_end)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "ripemd160_backend": hashes.RIPEMD160_BACKEND,
+        "coins": coins,
+        "files_per_coin": len(files) / coins,
+        "us_per_coin": stages,
+        "coins_per_second": 1e6 / stages["end_to_end"],
+    }
+
+
+def compare(results, baseline, threshold, min_delta_us=5.0):
+    """
+    Compares the stages of <results> with a <baseline> produced by run().
+    :param threshold: The relative slowdown tolerated, e.g.: 0.25 for 25%
+    :param min_delta_us: Slowdowns smaller than this, in µs per coin, are taken as noise
+    :return: A list of (stage, baseline µs, current µs) with the stages slower than the threshold
+    """
+    regressions = []
+    for name, baseline_us in baseline["us_per_coin"].items():
+        current_us = results["us_per_coin"].get(name)
+        if current_us is not None and current_us > max(baseline_us * (1 + threshold), baseline_us + min_delta_us):
+            regressions.append((name, baseline_us, current_us))
+    return regressions
+
+
+def report(results, baseline=None):
+    print(f"Python {results['python']}, RIPEMD-160 backend: {results['ripemd160_backend']}, "
+          f"{results['coins']} coins")
+    for name, us in results["us_per_coin"].items():
+        line = f"  {name:12} : {us:10.1f} µs/coin"
+        if baseline and name in baseline["us_per_coin"]:
+            line += f"  ({us / baseline['us_per_coin'][name] - 1:+.0%} vs baseline)"
+        print(line)
+    print(f"  {'end to end':12} : {results['coins_per_second']:10.1f} coins/second")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark suite of the minting pipeline.")
+    parser.add_argument("-c", "--coins", type=int, default=200, help="Coins of the batch. Default = 200.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of every stage, the fastest counts. Default = 3.")
+    parser.add_argument("--json", help="Write the results to this JSON file.")
+    parser.add_argument("--save-baseline", dest="save_baseline", action="store_true",
+                        help=f"Store the results as the baseline of this host ({BASELINE}).")
+    parser.add_argument("--compare", action="store_true",
+                        help="Compare with the baseline and exit with status 1 on regressions.")
+    parser.add_argument("--baseline", default=BASELINE, help="The baseline JSON file.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative slowdown tolerated per stage. Default = 0.25 (25%%).")
+    parser.add_argument("--min-delta", dest="min_delta", type=float, default=5.0,
+                        help="Slowdowns below this many µs per coin are ignored. Default = 5.")
+    args = parser.parse_args(argv)
+
+    results = run(coins=args.coins, repeat=args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.baseline, "r") as baseline_file:
+            baseline = json.load(baseline_file)
+    report(results, baseline)
+
+    for pathname in [args.json] + ([args.baseline] if args.save_baseline else []):
+        if pathname:
+            with open(pathname, "w") as json_file:
+                json.dump(results, json_file, indent=2)
+
+    if baseline:
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        for name, baseline_us, current_us in regressions:
+            print(f"REGRESSION in {name}: {current_us:.1f} µs/coin, baseline {baseline_us:.1f} µs/coin")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+The encodings of a coin for the different kinds of wallets, all of them computed from the same keys:
+
+- wif           : the private key in WIF without the 0x01 suffix, the one printed in the original coins.
+                  Wallets that import it look for the addresses of the uncompressed public key
+- wif-compressed: the private key in WIF with the 0x01 suffix, for the compressed public key of the addresses
+- p2pkh         : legacy address, Base58Check of 0x00 + hash160 (the one of the original coins)
+- p2wpkh        : native SegWit address (BIP 173), bech32 of the witness version 0 and the hash160
+- p2sh-p2wpkh   : SegWit nested in P2SH (BIP 49), Base58Check of 0x05 + hash160(0x00 0x14 + hash160)
+
+Every address format is the hash160 of the compressed public key in another envelope, so the public key and
+its hash160 are computed once per coin (encode) and the hash160 is all the addresses need (encode_hash160):
+adding formats adds neither point multiplications nor hashing of the public key.
+
+The bech32 checksum is computed with a lookup table of the generator of its BCH code (one XOR per
+character instead of five), and the state after the human readable part is computed once per network.
+"""
+
+from bertocoin import base58, hashes, tracing
+from bertocoin.constants import ADDRESS_FORMATS, WIF_FORMATS
+
+FORMATS = WIF_FORMATS + ADDRESS_FORMATS
+
+# the encodings of the coins before there were formats to choose from
+DEFAULT_FORMATS = ("wif", "p2pkh")
+
+# version bytes and human readable part of mainnet
+_WIF_VERSION = b"\x80"
+_P2PKH_VERSION = b"\x00"
+_P2SH_VERSION = b"\x05"
+HRP = "bc"
+
+BECH32_CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+_GENERATOR = (0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3)
+# lookup table: the 5 bits shifted out of the checksum -> the XOR of the generators they select
+_POLYMOD_TABLE = [0] * 32
+for _bits in range(32):
+    for _i, _generator in enumerate(_GENERATOR):
+        if _bits >> _i & 1:
+            _POLYMOD_TABLE[_bits] ^= _generator
+
+# checksum state after the human readable part, by human readable part
+_hrp_states = {}
+
+
+def _polymod(values, state=1):
+    table = _POLYMOD_TABLE
+    for value in values:
+        state = ((state & 0x1ffffff) << 5) ^ value ^ table[state >> 25]
+    return state
+
+
+def _hrp_state(hrp):
+    state = _hrp_states.get(hrp)
+    if state is None:
+        state = _hrp_states[hrp] = _polymod([ord(c) >> 5 for c in hrp] + [0] + [ord(c) & 31 for c in hrp])
+    return state
+
+
+def _to_5_bits(data):
+    """
+    Regroups bytes in groups of 5 bits, padding the last group with zeros.
+    """
+    bits = 8 * len(data)
+    padding = -bits % 5
+    value = int.from_bytes(data, "big") << padding
+    groups = (bits + padding) // 5
+    return [(value >> 5 * (groups - 1 - i)) & 31 for i in range(groups)]
+
+
+def bech32_encode(hrp, witness_version, program):
+    """
+    Encodes a SegWit v0 address in bech32 (BIP 173).
+    :param hrp: The human readable part, e.g.: 'bc' for mainnet
+    :param witness_version: The witness version, from 0 to 16. Bech32m (BIP 350) is not supported
+    :param program: The witness program, e.g.: the hash160 of a compressed public key for P2WPKH
+    :return: The address, in lower case
+    """
+    data = [witness_version] + _to_5_bits(program)
+    checksum = _polymod(data + [0] * 6, _hrp_state(hrp)) ^ 1
+    data += [(checksum >> 5 * (5 - i)) & 31 for i in range(6)]
+    return hrp + "1" + "".join([BECH32_CHARSET[value] for value in data])
+
+
+def bech32_decode(address):
+    """
+    Decodes a SegWit v0 address in bech32 (BIP 173), verifying its checksum.
+    :return: A tuple (human readable part, witness version, witness program)
+    :raises ValueError: if the address is not a valid SegWit v0 address
+    """
+    if address.lower() != address and address.upper() != address:
+        raise ValueError(f"'{address}' mixes upper and lower case")
+    address = address.lower()
+    separator = address.rfind("1")
+    if separator < 1 or len(address) - separator < 7 or len(address) > 90:
+        raise ValueError(f"'{address}' is not a bech32 address")
+    hrp = address[:separator]
+    try:
+        data = [BECH32_CHARSET.index(c) for c in address[separator + 1:]]
+    except ValueError:
+        raise ValueError(f"'{address}' is not a bech32 address")
+    if _polymod(data, _hrp_state(hrp)) != 1:
+        raise ValueError(f"'{address}' has a wrong checksum")
+
+    # the 5 bit groups of the program, without the witness version and the checksum
+    groups = data[1:-6]
+    bits = 5 * len(groups)
+    value = 0
+    for group in groups:
+        value = value << 5 | group
+    # the padding is shorter than 5 bits, and made of zeros
+    if bits % 8 > 4 or value & ((1 << bits % 8) - 1):
+        raise ValueError(f"'{address}' has an invalid padding")
+    program = (value >> bits % 8).to_bytes(bits // 8, "big")
+    if data[0] != 0 or len(program) not in (20, 32):
+        raise ValueError(f"'{address}' is not a SegWit v0 address")
+    return hrp, data[0], program
+
+
+def decode_address(address):
+    """
+    The hash160 inside an address of mainnet, whose checksum is verified.
+    :return: A tuple (kind, hash160): 'p2pkh' and 'p2wpkh' hold the hash160 of the public key, and 'p2sh'
+             the one of the redeem script (for p2sh-p2wpkh, the hash160 of 0x00 0x14 + the one of the key)
+    :raises ValueError: if the address is not a P2PKH, P2SH or P2WPKH address of mainnet
+    """
+    if address[:len(HRP) + 1].lower() == HRP + "1":
+        hrp, _, program = bech32_decode(address)
+        if hrp != HRP or len(program) != 20:
+            raise ValueError(f"'{address}' is not a P2WPKH address of mainnet")
+        return "p2wpkh", program
+
+    payload = base58.b58check_decode(address)
+    if len(payload) == 21 and payload[:1] in (_P2PKH_VERSION, _P2SH_VERSION):
+        return ("p2pkh" if payload[:1] == _P2PKH_VERSION else "p2sh"), payload[1:]
+    raise ValueError(f"'{address}' is not a P2PKH or P2SH address of mainnet")
+
+
+def p2sh_p2wpkh_hash160(hash160):
+    """
+    The hash160 of the redeem script of the P2SH-P2WPKH address of a hash160 of a public key.
+    """
+    # the redeem script is the witness program: version 0 and a push of the 20 bytes of the hash160
+    return hashes.hash160(b"\x00\x14" + hash160)
+
+
+def check_formats(formats):
+    """
+    :raises ValueError: if any of <formats> is unknown
+    """
+    for encoding in formats:
+        if encoding not in FORMATS:
+            raise ValueError(f"Unknown format '{encoding}', valid values: {', '.join(FORMATS)}")
+
+
+def encode_hash160(hash160, formats=ADDRESS_FORMATS):
+    """
+    The addresses of a hash160 of a compressed public key. Formats that are not addresses are ignored.
+    :return: A dictionary format -> address
+    """
+    addresses = {}
+    with tracing.span("derive.base58check"):
+        if "p2pkh" in formats:
+            addresses["p2pkh"] = base58.b58check_encode(_P2PKH_VERSION + hash160)
+        if "p2sh-p2wpkh" in formats:
+            addresses["p2sh-p2wpkh"] = base58.b58check_encode(_P2SH_VERSION + p2sh_p2wpkh_hash160(hash160))
+    if "p2wpkh" in formats:
+        with tracing.span("derive.bech32"):
+            addresses["p2wpkh"] = bech32_encode(HRP, 0, hash160)
+    return addresses
+
+
+def encode(private_key, public_key, formats=DEFAULT_FORMATS):
+    """
+    The encodings of a coin, from its keys. The hash160 of the public key is computed once, and only if an
+    address is requested.
+    :param private_key: The 32 bytes of the private key
+    :param public_key: The 64 bytes of the uncompressed public key, without the 04 prefix
+    :param formats: The encodings to compute, see FORMATS
+    :return: A dictionary format -> encoding, with the compressed public key (bytes) as 'public_key'
+    """
+    encodings = {}
+    with tracing.span("derive.base58check"):
+        if "wif" in formats:
+            encodings["wif"] = base58.b58check_encode(_WIF_VERSION + private_key)
+        if "wif-compressed" in formats:
+            encodings["wif-compressed"] = base58.b58check_encode(_WIF_VERSION + private_key + b"\x01")
+
+    # the compressed public key drops Y and keeps its parity: 03 if it is odd or 02 if it is even
+    encodings["public_key"] = (b"\x03" if public_key[63] & 1 else b"\x02") + public_key[:32]
+    if any(encoding in ADDRESS_FORMATS for encoding in formats):
+        with tracing.span("derive.hash160"):
+            hash160 = hashes.hash160(encodings["public_key"])
+        encodings.update(encode_hash160(hash160, formats))
+    return encodings
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Base58 and Base58Check codec, as used by bitcoin for WIFs and legacy addresses.
+
+The big integer that holds the data is converted 10 digits at a time (dividing by 58^10), so
+the expensive big-int divisions are 10 times fewer than with the digit by digit algorithm. Every
+chunk is then split in pairs of digits that are looked up in a precomputed table, and the digits
+are accumulated in a bytearray instead of prepending characters to a string.
+Decoding uses a precomputed reverse lookup table instead of searching the alphabet.
+"""
+
+from bertocoin import hashes
+
+ALPHABET = b"123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+BASE = len(ALPHABET)
+
+# digits converted on every big-int division
+_CHUNK_DIGITS = 10
+_CHUNK_BASE = BASE ** _CHUNK_DIGITS
+
+# lookup table: value of two digits (0 to 58^2 - 1) -> their two characters, least significant first
+_PAIR_BASE = BASE ** 2
+_PAIRS = [bytes([ALPHABET[value % BASE], ALPHABET[value // BASE]]) for value in range(_PAIR_BASE)]
+
+# reverse lookup table: byte value of a character -> digit value, or -1 if it is not in the alphabet
+_DIGITS = [-1] * 256
+for _digit, _character in enumerate(ALPHABET):
+    _DIGITS[_character] = _digit
+
+CHECKSUM_SIZE = 4
+
+
+def checksum(payload):
+    """
+    Returns the 4 checksum bytes of Base58Check: the first 4 bytes of sha256(sha256(payload)).
+    """
+    return hashes.sha256d(payload)[:CHECKSUM_SIZE]
+
+
+def b58encode(data):
+    """
+    Given a byte sequence <data>, it returns a string that represents this value in Base58 format.
+    Every leading 0x00 byte is encoded as a leading '1', so that leading zeros are not lost.
+    :param data: The sequence of bytes to encode
+    :return: A string in Base58 format
+    """
+    value = int.from_bytes(data, "big")
+
+    # digits are produced from the least significant one, and reversed at the end
+    digits = bytearray()
+    while value:
+        value, chunk = divmod(value, _CHUNK_BASE)
+        for _ in range(_CHUNK_DIGITS // 2):
+            chunk, pair = divmod(chunk, _PAIR_BASE)
+            digits += _PAIRS[pair]
+
+    # the last chunk may have added zeros on the left of the most significant digit
+    while digits and digits[-1] == ALPHABET[0]:
+        digits.pop()
+
+    pad = len(data) - len(bytes(data).lstrip(b"\x00"))
+    digits.extend(ALPHABET[0:1] * pad)
+    digits.reverse()
+
+    return digits.decode("ascii")
+
+
+def b58decode(encoded_string):
+    """
+    Decodes a Base58 <encoded_string> to a byte sequence. Every leading '1' is decoded as a 0x00 byte.
+    :param encoded_string: The string in Base58 format
+    :return: The decoded bytes
+    :raises ValueError: if the string contains characters outside the Base58 alphabet
+    """
+    encoded = encoded_string.encode("ascii", errors="replace")
+
+    value = 0
+    for start in range(0, len(encoded), _CHUNK_DIGITS):
+        chunk = encoded[start:start + _CHUNK_DIGITS]
+        chunk_value = 0
+        for character in chunk:
+            digit = _DIGITS[character]
+            if digit < 0:
+                raise ValueError(f"Invalid Base58 character in '{encoded_string}'")
+            chunk_value = chunk_value * BASE + digit
+        value = value * BASE ** len(chunk) + chunk_value
+
+    pad = len(encoded) - len(encoded.lstrip(ALPHABET[0:1]))
+    return b"\x00" * pad + value.to_bytes((value.bit_length() + 7) // 8, "big")
+
+
+def b58check_encode(payload):
+    """
+    Appends the 4 checksum bytes to <payload> and encodes the result in Base58.
+    :param payload: The bytes to encode, including the version byte, e.g.: b'\\x80' + private key
+    :return: A string in Base58Check format
+    """
+    payload = bytes(payload)
+    return b58encode(payload + checksum(payload))
+
+
+def b58check_decode(encoded_string):
+    """
+    Decodes a Base58Check string and verifies its checksum.
+    :param encoded_string: The string in Base58Check format
+    :return: The payload, without the 4 checksum bytes
+    :raises ValueError: if the string is not valid Base58 or the checksum does not match
+    """
+    data = b58decode(encoded_string)
+    if len(data) < CHECKSUM_SIZE:
+        raise ValueError(f"'{encoded_string}' is too short to be a Base58Check string")
+
+    payload, data_checksum = data[:-CHECKSUM_SIZE], data[-CHECKSUM_SIZE:]
+    if checksum(payload) != data_checksum:
+        raise ValueError(f"Invalid Base58Check checksum in '{encoded_string}'")
+
+    return payload
+
+
+def b58check_encode_batch(payloads):
+    """
+    Encodes many payloads in Base58Check at once, e.g.: all the addresses of a batch of coins.
+    :param payloads: An iterable of byte sequences
+    :return: A list with the Base58Check strings, in the same order
+    """
+    encode = b58check_encode
+    return [encode(payload) for payload in payloads]
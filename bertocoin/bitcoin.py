@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+"""
+Derivation of the coins: from the secret seed and the serial number to the WIF and the address.
+The ecdsa library is only imported when the "ecdsa" backend is used.
+"""
+
+import collections
+import hashlib
+import itertools
+import re
+
+from bertocoin import addresses, base58, constants, hashes, secp256k1, tracing
+
+
+class Bitcoin:
+    """
+    This Bitcoin class gathers all the necessary methods needed to produce the public
+    address and WIF of a bitcoin coin from just a secret seed. The self.generate_coin
+    method executes all the steps needed to convert the secret into addresses.
+    This class does not generate a secret seed, it has to be provided as an argument.
+
+    The public key can be computed by two interchangeable point multiplication backends:
+      - "ecdsa": the reference implementation, using the ecdsa library.
+      - "table": a precomputed table of multiples of the generator G, built once per process
+                 and reused for every coin (see bertocoin/secp256k1.py). Much faster for batches.
+    """
+
+    EC_BACKENDS = constants.EC_BACKENDS
+
+    def __init__(self, secret_seed, serial_number, ec_backend="ecdsa", formats=addresses.DEFAULT_FORMATS):
+        if ec_backend not in self.EC_BACKENDS:
+            raise ValueError(f"Unknown point multiplication backend '{ec_backend}'. "
+                             f"Valid values: {', '.join(self.EC_BACKENDS)}")
+        addresses.check_formats(formats)
+
+        self.secret = secret_seed
+        self.serial_number = serial_number
+        self.ec_backend = ec_backend
+        # the encodings computed by generate_coin, besides the WIF and the P2PKH address it returns
+        self.formats = tuple(dict.fromkeys(addresses.DEFAULT_FORMATS + tuple(formats)))
+        self.encodings = None
+
+    def __public_key(self, private_key_as_bytes):
+        """
+        Multiplies the generator point of the curve by the private key using the selected backend.
+        :param private_key_as_bytes: The 32 bytes of the private key
+        :return: The 64 bytes of the uncompressed public key (X and Y coordinates), without the 04 prefix
+        """
+        if self.ec_backend == "table":
+            return secp256k1.public_key(private_key_as_bytes)
+
+        import ecdsa
+
+        sk = ecdsa.SigningKey.from_string(private_key_as_bytes, curve=ecdsa.SECP256k1)
+        return sk.get_verifying_key().to_string()
+
+    def __private_key_from_passphrase(self, passphrase):
+        """
+        Given a string passphrase it returns a private key obtained by hashing it
+        :param src: The passphrase to convert
+        :return: A hex string with the sha256() hash digest of the given passphrase
+        """
+
+        privatekey = hashlib.sha256(passphrase.encode("utf-8")).hexdigest()
+        return str(privatekey)
+
+    def __ripemd160(self, byte_seq):
+        """
+        Given a sequence of bytes <byte_seq> it returns its RIPEMD160 hash object
+        :param v: The sequence of bytes whose hash we want to obtain
+        :return: A hash of the bytes <byte_seq> input, using the RIPEMD160 algorithm
+        """
+        return hashes.ripemd160(byte_seq)
+
+    def __b58encode(self, byte_array):
+        """
+        Given a byte sequence <byte_array>, it returns a string that represents this value in Base58 format.
+        To ensure that leading zeros have an influence on the result, the bitcoin base58 encoding includes
+        a manual step to convert all leading 0x00s to 1s.
+        :param v -> The sequence of bytes encode
+        :return: A string in format Base58 representing the value of v
+        """
+
+        return base58.b58encode(byte_array)
+
+    def __b58decode(self, encoded_string):
+        """
+        Decode a Base58 <encoded_string> string to byte sequence. Leading 1s are decoded as 0x00 bytes.
+        :param encoded_string -> The string in Base58 format
+        :return: A sequence of bytes corresponding to the input string
+        """
+
+        return base58.b58decode(encoded_string)
+
+    def __hex_to_byte(self, hex_str):
+        """
+        Convert a string hex byte values into a byte sequence. The Hex Byte values may
+        or may not be space separated.
+        :param hexStr: A string of hex bytes values
+        :return: A byte sequence with the hex values converted.
+        """
+        return bytes.fromhex(hex_str)
+
+    @staticmethod
+    def print_banner():
+        print("┌─────     Universidad de La Coruña     ─────┐")
+        print("│                                            │")
+        print("│            Trabajo Fin de Grado            │")
+        print("├────────────────────────────────────────────┤")
+        print("└─────     Alberto Femenías Hermida     ─────┘")
+        print()
+
+    def __private_key_digest(self, seed_as_bytes):
+        """
+        Bytes version of __private_key_from_passphrase, used by the batch derivation loop.
+        :param seed_as_bytes: The utf-8 encoded passphrase
+        :return: The 32 bytes of the sha256() digest of the passphrase
+        """
+
+        return hashlib.sha256(seed_as_bytes).digest()
+
+    def derive_many(self, serial_numbers):
+        """
+        Bulk version of generate_coin (non debug mode) for a list of serial numbers that share the secret seed
+        of this object. With the "table" backend, the public keys of the whole list are computed in Jacobian
+        coordinates and converted to affine coordinates sharing a single modular inversion.
+        :param serial_numbers: A list of preformatted serial numbers, e.g.: ['0021', '0022']
+        :return: A list of (WIF, public address) tuples, one per serial number, byte-identical to the ones
+                 returned by generate_coin.
+        """
+
+        return self.encode_many(self.private_keys_many(serial_numbers))
+
+    def private_keys_many(self, serial_numbers):
+        """
+        The first step of derive_many: the private keys of many serial numbers that share the secret seed.
+        :param serial_numbers: A list of preformatted serial numbers, e.g.: ['0021', '0022']
+        :return: A list of private keys, 32 bytes each, in the same order
+        """
+
+        secret_suffix = ('_' + self.secret).encode("utf-8")
+        with tracing.span("derive.passphrase", coins=len(serial_numbers)):
+            return [self.__private_key_digest(b'Coin_' + serial_number.encode("utf-8") + secret_suffix)
+                    for serial_number in serial_numbers]
+
+    def encode_many(self, private_keys):
+        """
+        Computes the WIF and public address of many private keys at once, the last steps of derive_many.
+        :param private_keys: A list of private keys, 32 bytes each
+        :return: A list of (WIF, public address) tuples, in the same order
+        """
+
+        return [(encodings["wif"], encodings["p2pkh"])
+                for encodings in self.encode_formats_many(private_keys, addresses.DEFAULT_FORMATS)]
+
+    def encode_formats_many(self, private_keys, formats):
+        """
+        Computes the encodings of many private keys at once. The public key and its hash160 are computed once
+        per key, whatever the number of formats.
+        :param private_keys: A list of private keys, 32 bytes each
+        :param formats: The encodings to compute, see addresses.FORMATS
+        :return: A list of dictionaries format -> encoding, see addresses.encode, in the same order
+        """
+
+        with tracing.span("derive.ec", coins=len(private_keys)):
+            if self.ec_backend == "table":
+                points = [secp256k1.multiply_generator(int.from_bytes(private_key, "big"))
+                          for private_key in private_keys]
+                public_keys = [x.to_bytes(32, "big") + y.to_bytes(32, "big")
+                               for x, y in secp256k1.batch_to_affine(points)]
+            else:
+                public_keys = [self.__public_key(private_key) for private_key in private_keys]
+
+        return [addresses.encode(private_key, public_key, formats)
+                for private_key, public_key in zip(private_keys, public_keys)]
+
+    def derive_formats_many(self, serial_numbers, formats):
+        """
+        Like derive_many, with the encodings of every coin in <formats>, see encode_formats_many.
+        """
+
+        return self.encode_formats_many(self.private_keys_many(serial_numbers), formats)
+
+    @staticmethod
+    def decode_wif(WIF):
+        """
+        Decodes a WIF of mainnet, verifying its checksum, the inverse of the encoding of the coins.
+        WIFs flagged for compressed public keys (0x01 suffix) are accepted too.
+        :param WIF: The private address in WIF format
+        :return: The 32 bytes of the private key
+        :raises ValueError: if the WIF is not valid
+        """
+
+        payload = base58.b58check_decode(WIF)
+        if payload[:1] != b"\x80" or len(payload) not in (33, 34) or (len(payload) == 34 and payload[33] != 1):
+            raise ValueError("Not a WIF of mainnet")
+        private_key = payload[1:33]
+        if not 0 < int.from_bytes(private_key, "big") < secp256k1.N:
+            raise ValueError("The private key of the WIF is out of the range of the curve")
+        return private_key
+
+    def generate_coin(self, debug=False):
+
+        coin_prefix = 'Coin_' + self.serial_number + '_'
+
+        if not debug:
+            # the private key of the coin is obtained by digesting the secret AND the serial
+            coin_secret_seed = coin_prefix + self.secret
+            with tracing.span("derive.passphrase", coins=1):
+                private_key_as_hex_string = self.__private_key_from_passphrase(coin_secret_seed)
+        else:
+            print("· Debug mode is on.")
+            print("· Note: In debug mode sensible information will be displayed.")
+            print()
+
+            is_hexprivate_key_hex = re.compile(r"^[0-9A-fz]{64}$")
+            if not is_hexprivate_key_hex.match(self.secret):
+                print("Invalid passphrase!")
+                print("In debug mode the secret provided must be 64 chars of data in hex format (private key)!")
+                exit(1)
+            coin_secret_seed = self.secret
+            # in debug mode there is no digest: secret seed is the private key
+            private_key_as_hex_string = self.secret
+
+        # the hex string is converted to bytes only once, from here on the derivation works on bytes
+        private_key_as_bytes = self.__hex_to_byte(private_key_as_hex_string)
+        # now get the uncompressed public key from our private key:
+        with tracing.span("derive.ec", coins=1):
+            public_key_as_bytes = self.__public_key(private_key_as_bytes)
+
+        # the WIF is 0x80 + the private key, and the address 0x00 + the hash160 of the compressed public key,
+        # both in Base58Check, and the other formats come from the same keys, see bertocoin/addresses.py
+        self.encodings = addresses.encode(private_key_as_bytes, public_key_as_bytes, self.formats)
+        WIF, public_address_b58 = self.encodings["wif"], self.encodings["p2pkh"]
+        public_key_compressed = self.encodings["public_key"]
+
+        if debug:
+            print("· RIPEMD-160 backend                        :", hashes.RIPEMD160_BACKEND)
+            print("· Coin serial prefix                        :", coin_prefix)
+            print("· Secret string seed                        :", coin_secret_seed)
+            print("· Private key in hex (hex digest)           :", private_key_as_hex_string)
+            print("· Private address (WIF format)              :", WIF)
+            print("· Public key in hex, full and uncompressed  :", '04' + public_key_as_bytes.hex())
+            print("· Public key in hex, compressed             :", public_key_compressed.hex())
+            print("· Public address, compressed, in base58     :", public_address_b58)
+            for encoding in self.formats:
+                if encoding not in addresses.DEFAULT_FORMATS:
+                    print(f"· {'Format ' + encoding:<43}:", self.encodings[encoding])
+            print()
+
+        return WIF, public_address_b58
+
+
+# The secret of the batch, as seen from inside a derivation worker process. It is handed over once, when the
+# worker starts, so the serial chunks sent through the pool pipes carry no secret at all.
+_worker_secret = None
+_worker_ec_backend = "ecdsa"
+_worker_formats = addresses.DEFAULT_FORMATS
+
+
+def _init_derivation_worker(secret, ec_backend, formats=addresses.DEFAULT_FORMATS):
+    global _worker_secret, _worker_ec_backend, _worker_formats
+    _worker_secret = secret
+    _worker_ec_backend = ec_backend
+    _worker_formats = formats
+
+
+def derive_chunk(serial_numbers):
+    """
+    Runs inside a worker process of derive_coin_formats or derivation_pool. Derives the encodings of every
+    serial number of the chunk in the formats of the worker.
+    :param serial_numbers: A list of preformatted serial numbers, e.g.: ['0021', '0022']
+    :return: A list of dictionaries format -> encoding, in the same order
+    """
+    return Bitcoin(_worker_secret, None, _worker_ec_backend).derive_formats_many(serial_numbers, _worker_formats)
+
+
+def derivation_pool(secret, workers, ec_backend="ecdsa"):
+    """
+    A pool of <workers> processes that hold the secret, to derive coins with pool.submit(derive_chunk, serials)
+    for as long as the pool lives, e.g.: in a daemon. The secret is only sent to every worker when it starts.
+    The workers derive the WIF and the P2PKH address of the coins.
+    :return: A concurrent.futures.ProcessPoolExecutor
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_derivation_worker, initargs=(secret, ec_backend))
+
+
+def derive_coins(secret, serial_numbers, workers=1, chunk_size=None, ec_backend="ecdsa"):
+    """
+    Derives the WIF and address of every serial number, see derive_coin_formats.
+    :return: A generator of (serial_number, WIF, address) tuples
+    """
+
+    for serial_number, encodings in derive_coin_formats(secret, serial_numbers, addresses.DEFAULT_FORMATS,
+                                                        workers=workers, chunk_size=chunk_size,
+                                                        ec_backend=ec_backend):
+        yield serial_number, encodings["wif"], encodings["p2pkh"]
+
+
+def derive_coin_formats(secret, serial_numbers, formats, workers=1, chunk_size=None, ec_backend="ecdsa"):
+    """
+    Derives the encodings of every serial number in <formats> (see bertocoin/addresses.py), fanning out the
+    work across <workers> processes. The results are yielded in the same order as <serial_numbers>, as soon
+    as they are available, so the caller can keep writing printables while the pool derives the next chunks.
+    :param secret: The secret seed shared by all the coins
+    :param serial_numbers: A list of preformatted serial numbers, e.g.: ['0021', '0022'], or any iterable
+                           of them if <chunk_size> is given, to derive a stream of serial numbers
+    :param formats: The encodings to compute. The public key and the hash160 of every coin are computed once.
+    :param workers: Number of worker processes. With 1 worker the coins are derived in this process.
+    :param chunk_size: How many serials are sent to a worker at once. By default it is chosen so that
+                       every worker gets around 4 chunks. The keys of a chunk are derived together
+                       with Bitcoin.derive_formats_many.
+    :param ec_backend: The point multiplication backend, see Bitcoin.EC_BACKENDS
+    :return: A generator of (serial_number, dictionary format -> encoding) tuples
+    """
+    addresses.check_formats(formats)
+    if chunk_size is None:
+        chunk_size = max(1, min(256, len(serial_numbers) // (max(1, workers) * 4)))
+
+    results = map_chunks(derive_chunk, chunked(serial_numbers, chunk_size), workers=workers,
+                         initializer=_init_derivation_worker, initargs=(secret, ec_backend, tuple(formats)))
+    for chunk, coins in results:
+        yield from zip(chunk, coins)
+
+
+def compact_size(length):
+    """
+    The variable length integer of the serialization of Bitcoin (CompactSize), used by the signed messages
+    and the transactions to prefix counts and lengths.
+    """
+    if length < 0xfd:
+        return bytes([length])
+    if length <= 0xffff:
+        return b"\xfd" + length.to_bytes(2, "little")
+    if length <= 0xffffffff:
+        return b"\xfe" + length.to_bytes(4, "little")
+    return b"\xff" + length.to_bytes(8, "little")
+
+
+def chunked(items, chunk_size):
+    """
+    Splits any iterable in lists of <chunk_size> items, lazily.
+    """
+    items = iter(items)
+    while chunk := list(itertools.islice(items, chunk_size)):
+        yield chunk
+
+
+def map_chunks(function, chunks, workers=1, initializer=None, initargs=()):
+    """
+    Applies <function> to every chunk in a pool of <workers> processes, yielding the results in the order
+    of the chunks. At most 2 chunks per worker are in flight, so the results waiting to be consumed do not
+    pile up in memory when the caller is slower than the pool, and <chunks> can be a lazy stream.
+    With 1 worker the chunks are processed in this process, after calling <initializer>. Closing the
+    generator cancels the chunks in flight that have not started yet.
+    :param function: A function of the module level (it is pickled), that takes a chunk
+    :return: A generator of (chunk, result) tuples
+    """
+
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for chunk in chunks:
+            yield chunk, function(chunk)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunks = iter(chunks)
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        try:
+            pending = collections.deque((chunk, pool.submit(function, chunk))
+                                        for chunk in itertools.islice(chunks, 2 * workers))
+            while pending:
+                chunk, future = pending.popleft()
+                result = future.result()
+                for next_chunk in itertools.islice(chunks, 1):
+                    pending.append((next_chunk, pool.submit(function, next_chunk)))
+                yield chunk, result
+        finally:
+            # when the generator is closed early (or fails) the chunks that have not started are dropped
+            pool.shutdown(cancel_futures=True)
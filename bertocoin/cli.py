@@ -0,0 +1,765 @@
+# -*- coding: utf-8 -*-
+"""
+The subcommands of the command line. Every subcommand imports the modules it needs when it runs, so
+the light ones (e.g.: generate-pass or --help) do not pay for the EC library, the QR and PNG stack,
+asyncio or the process pool at startup, see benchmarks/startup.py.
+"""
+
+import argparse
+import atexit
+import contextlib
+import os
+import sys
+import time
+
+from bertocoin import tracing
+from bertocoin.inputs import EC_BACKENDS, CoinInput
+
+
+def output_storage(args):
+    """
+    Returns the storage of the generated files chosen in the command line, see bertocoin/storage.py
+    :raises storage.StorageError: if RAM-only output was requested but it is not available
+    """
+    from bertocoin import storage as storage_backends
+
+    if args.ram_only:
+        return storage_backends.RamStorage()
+    return storage_backends.DiskStorage(shred_passes=args.shred_passes)
+
+
+def open_manifest(args):
+    """
+    Returns the watch-only manifest chosen in the command line, see bertocoin/manifest.py, or None
+    """
+    if not args.manifest:
+        return None
+
+    from bertocoin import manifest
+
+    return manifest.ManifestWriter(args.manifest, args.manifest_format)
+
+
+def mint_serial_range(args, storage=None):
+    """
+    Batch mode: mints every serial number in args.serial_range within this single process.
+    Every coin is derived from the same secret and all the printables are written in one pass.
+    By default the instructions, the countdown and the secure delete are run only once at the end of the
+    batch. With args.rolling_timeout the files of every coin (or sheet) are destroyed args.timeout seconds
+    after being written, in the background, while the rest of the batch is minted.
+    :param args: The Namespace returned by CoinInput.command_line_arguments
+    :param storage: Where the generated files are written, the delete-me folder by default
+    :return: <it outputs via stdout>
+    """
+    import asyncio
+
+    asyncio.run(_mint_serial_range(args, storage))
+
+
+async def _mint_serial_range(args, storage):
+    import asyncio
+
+    from bertocoin.bitcoin import derive_coin_formats
+    from bertocoin.stamper import CoinStamper
+    from bertocoin.terminator import CoinTerminator
+
+    loop = asyncio.get_running_loop()
+    stamper = CoinStamper(inline_qr=args.inline_qr, qr_mask=args.qr_mask, per_sheet=args.per_sheet,
+                          storage=storage, address_format=args.address_format, wif_format=args.wif_format)
+    terminator = CoinTerminator(printable_filepath=stamper.printable_pattern(), shred_passes=args.shred_passes,
+                                storage=stamper.storage, animation=args.animation)
+    terminator.watch_early_destruction()
+    workers = args.workers or os.cpu_count()
+    serial_numbers = [str(serial).zfill(4) for serial in args.serial_range]
+    derive_seconds = 0.0
+    stamp_seconds = 0.0
+    # tasks that destroy the files of every coin on their own deadline, with args.rolling_timeout
+    expiring = []
+
+    if args.rolling_timeout:
+        await terminator.show_instructions_async(args.timeout)
+        print()
+
+    print(f"Minting {len(args.serial_range)} coins, "
+          f"serials {args.serial_range.start:04d} to {args.serial_range[-1]:04d}, using {workers} worker(s)...")
+    print()
+
+    def stamp(coin):
+        if args.per_sheet > 1:
+            stamper.impose(coin_info=coin)
+        else:
+            stamper.process_template(coin_info=coin, per_serial=True)
+
+    # the P2PKH address is always derived, as the binary manifest stores its hash160
+    formats = tuple(dict.fromkeys(("p2pkh", args.wif_format, args.address_format)))
+    derived_coins = derive_coin_formats(args.passphrase, serial_numbers, formats, workers=workers,
+                                        ec_backend=args.ec_backend)
+    destroyed = False
+    try:
+        # the manifest is closed (and flushed) even if the batch fails, nullcontext stands for no manifest
+        with open_manifest(args) or contextlib.nullcontext() as watch_only:
+            coins = 0
+            while not terminator.destruction_requested:
+                # with several workers this is the time spent waiting for the pool, not the CPU time of derivation
+                start = time.perf_counter()
+                # the blocking steps run in a thread, so the event loop keeps destroying expired files meanwhile
+                with tracing.span("batch.derive"):
+                    serial_number, encodings = await loop.run_in_executor(None, next, derived_coins, (None, None))
+                if serial_number is None:
+                    break
+                derived = time.perf_counter()
+
+                coin = {
+                    'serial_number': serial_number,
+                    'numerator': str(args.numerator),
+                    'denominator': str(args.denominator),
+                    'WIF': encodings[args.wif_format],
+                    'wif_format': args.wif_format,
+                    'address': encodings[args.address_format],
+                    'address_format': args.address_format,
+                    'formats': encodings
+                }
+                with tracing.span("batch.stamp"):
+                    await loop.run_in_executor(None, stamp, coin)
+                stamped = time.perf_counter()
+                if watch_only:
+                    with tracing.span("batch.manifest"):
+                        watch_only.add(coin)
+
+                coins += 1
+                derive_seconds += derived - start
+                stamp_seconds += stamped - derived
+                print(f"· Coin {coin['serial_number']}: {coin['address']}")
+
+                if args.rolling_timeout:
+                    expiring += [asyncio.ensure_future(terminator.expire(paths, args.timeout))
+                                 for paths in stamper.pop_artifacts()]
+
+        start = time.perf_counter()
+        sheets = stamper.close_sheets()
+        stamp_seconds += time.perf_counter() - start
+        if args.rolling_timeout:
+            expiring += [asyncio.ensure_future(terminator.expire(paths, args.timeout))
+                         for paths in stamper.pop_artifacts()]
+
+        if terminator.destruction_requested:
+            print("Early destruction requested, the rest of the batch has not been minted.")
+        total_seconds = derive_seconds + stamp_seconds
+        print()
+        print(f"Minted {coins} coins in {total_seconds:.2f} seconds "
+              f"({coins / max(total_seconds, 1e-9):.1f} coins/second).")
+        print(f"  Per coin: {1000 * derive_seconds / max(1, coins):.2f} ms deriving keys, "
+              f"{1000 * stamp_seconds / max(1, coins):.2f} ms writing printables.")
+        if sheets:
+            print(f"  {len(sheets)} sheet(s) of {args.per_sheet} coins.")
+        if watch_only:
+            print(f"  {watch_only.rows} coins written to the manifest {watch_only.pathname}.")
+        print()
+
+        # with a deadline per coin, the files of the last coin are the last ones to expire
+        await terminator.countdown_and_destroy(args.timeout, pending=expiring,
+                                               show_instructions=not args.rolling_timeout)
+        destroyed = True
+    finally:
+        # the pool stops deriving, and its queued chunks are cancelled
+        derived_coins.close()
+        if not destroyed:
+            # the batch failed or was interrupted: the printables written so far hold the WIFs of their coins
+            for task in expiring:
+                task.cancel()
+            await asyncio.gather(*expiring, return_exceptions=True)
+            await loop.run_in_executor(None, terminator.destroy_temp_folder)
+
+
+def mint(argv=None):
+    """
+    Mints a coin, or a batch of coins with --serial-range. It is the default subcommand.
+    :param argv: The arguments of the subcommand, see CoinInput.command_line_arguments
+    :return: The exit status
+    """
+    # Testing data from:
+    # - https://medium.freecodecamp.org/how-to-create-a-bitcoin-wallet-address-from-a-private-key-eca3ddd9c05f
+    # Online testing tools:
+    # - https://gobittest.appspot.com/
+    # - https://privatekeys.pw/calc
+    #
+    # To test, call this code:
+    #   $ python3 bertocoin --debug --passphrase=60cf347dbc59d31c1358c8e5cf5e45b822ab85b79cb32a9f3d98184779a9efc2
+    #
+    # Expected results:
+    #
+    # · Coin serial prefix                        : Coin_0000_
+    # · Secret string seed secret                 : 60cf347dbc59d31c1358c8e5cf5e45b822ab85b79cb32a9f3d98184779a9efc2
+    # · Hex digest of string seed secret          : 60cf347dbc59d31c1358c8e5cf5e45b822ab85b79cb32a9f3d98184779a9efc2
+    # · Private key in hex                        : 60cf347dbc59d31c1358c8e5cf5e45b822ab85b79cb32a9f3d98184779a9efc2
+    # · Private address (WIF format)              : 5JYvSurww2jTxmCeoN8T9QgRMWp45rre7WgFS76ae6Rgd1BnkC6
+    # · Public key in hex, full and uncompressed  : 041e7bcc70c72770dbb72fea022e8a6d07f814d2ebe4de9ae3f7af75bf706902a7b73ff919898c836396a6b0c96812c3213b99372050853bd1678da0ead14487d7 # noqa: E501
+    # · Public key in hex, compressed             : 031e7bcc70c72770dbb72fea022e8a6d07f814d2ebe4de9ae3f7af75bf706902a7
+    # · Public address, compressed, in base58     : 17JsmEygbbEUEpvt4PFtYaTeSqfb9ki1F1
+    #
+    # If you want to check the integrity of a coin without debug mode, just input the WIF in this page:
+    # https://www.bitaddress.org/ > Wallet Details > (Input WIF)
+    # and validate that the public address is correct
+
+    DEBUG = False
+
+    # STEP 1: Obtain all necessary inputs to create the coin
+    try:
+        args = CoinInput.command_line_arguments(argv, subcommands=SUBCOMMANDS)
+        DEBUG = args.debug_mode
+    except IOError as e:
+        print(e)
+        return 1
+
+    if (args.generate_pass):
+        print(CoinInput.secure_random_passphrase())
+        return 0
+
+    if (args.profile):
+        # the trace is written when the program exits, whatever the path it takes
+        tracing.start(profile=args.profile_cprofile, memory=args.profile_memory)
+        atexit.register(tracing.write, args.profile, args.profile_format)
+
+    if (not DEBUG and not CoinInput.passphrase_is_robust(args.passphrase)):
+        print("The passphrase you entered is not sufficiently robust! \n"
+              "Please choose a different one with greater entropy.")
+        return 1
+
+    if (DEBUG and args.serial_range):
+        print("Batch mode is not available in debug mode: the serial number does not influence the private key, "
+              "so every coin of the batch would be the same one.")
+        return 1
+
+    if (args.per_sheet < 1 or (args.per_sheet > 1 and not args.serial_range)):
+        print("The number of coins per sheet must be at least 1, and several coins per sheet are only available "
+              "in batch mode (--serial-range).")
+        return 1
+
+    from bertocoin import storage as storage_backends
+
+    if (args.manifest):
+        from bertocoin import manifest
+
+        try:
+            manifest.resolve_format(args.manifest, args.manifest_format)
+        except ValueError as e:
+            print(e)
+            return 1
+
+    try:
+        with tracing.span("inputs.storage"):
+            storage = output_storage(args)
+    except storage_backends.StorageError as e:
+        print(e)
+        return 1
+
+    from bertocoin.bitcoin import Bitcoin
+    from bertocoin.stamper import CoinStamper
+    from bertocoin.terminator import CoinTerminator
+
+    Bitcoin.print_banner()
+
+    if (args.serial_range):
+        with tracing.span("batch", coins=len(args.serial_range), workers=args.workers):
+            mint_serial_range(args, storage)
+        return 0
+
+    coin = {
+        'passphrase': args.passphrase,
+        'serial_number': str(args.serial).zfill(4),
+        'numerator': str(args.numerator),
+        'denominator': str(args.denominator),
+        'WIF': None,
+        'address': None
+    }
+
+    # STEP 2: Obtain WIF and public-address from secret
+    btc = Bitcoin(coin['passphrase'], coin['serial_number'], args.ec_backend,
+                  formats=(args.wif_format, args.address_format))
+    with tracing.span("derive"):
+        btc.generate_coin(debug=DEBUG)
+
+    # the coin holds the encodings that are printed, and the manifest writes the address
+    coin["WIF"] = btc.encodings[args.wif_format]
+    coin["wif_format"] = args.wif_format
+    coin["address"] = btc.encodings[args.address_format]
+    coin["address_format"] = args.address_format
+    coin["formats"] = btc.encodings
+
+    watch_only = open_manifest(args)
+    if (watch_only):
+        with watch_only:
+            watch_only.add(coin)
+
+    if (DEBUG):
+        print("Attention: you are running the program in Debug mode so the passphrase entropy was not "
+              "checked.\nThe coin generated might not be secure! \n")
+        import json
+
+        print("Here is all the information that constitutes the coin:")
+        print(json.dumps(coin, indent=4, default=bytes.hex))
+        print()
+
+    # STEP 3: Generate printable file with all coin info
+    stamper = CoinStamper(inline_qr=args.inline_qr, qr_mask=args.qr_mask, storage=storage,
+                          address_format=args.address_format, wif_format=args.wif_format)
+    with tracing.span("stamp"):
+        generated_coin_dirpath = stamper.process_template(coin_info=coin)
+
+    # STEP 4: Show instructions and then delete resources
+    terminator = CoinTerminator(printable_filepath=generated_coin_dirpath, shred_passes=args.shred_passes,
+                                storage=stamper.storage, animation=args.animation)
+    with tracing.span("terminate"):
+        terminator.run(timeout=args.timeout)
+    return 0
+
+
+def generate_pass(argv=None):
+    """
+    Prints a secure random passphrase, the same one as mint --generate-pass.
+    :return: The exit status
+    """
+    parser = argparse.ArgumentParser("python3 bertocoin generate-pass",
+                                     description="Prints a secret generated with the best source of randomness "
+                                                 "provided by the host operating system.")
+    parser.add_argument("-l", "--length", type=int, default=64, help="Characters of the secret. Default = 64.")
+    args = parser.parse_args(argv)
+
+    passphrase = CoinInput.secure_random_passphrase(length=args.length)
+    if not CoinInput.passphrase_is_robust(passphrase):
+        print("A secret of this length is not sufficiently robust, choose a longer one.")
+        return 1
+    print(passphrase)
+    return 0
+
+
+def verify(argv=None):
+    """
+    Audits minted coins: re-derives the coins of a manifest from the secret, or the addresses of a list of
+    WIFs, and reports the mismatches. See bertocoin/verify.py.
+    :return: The exit status, 1 if any coin does not match
+    """
+    from bertocoin import manifest, verify as audit
+
+    parser = argparse.ArgumentParser("python3 bertocoin verify", formatter_class=argparse.RawTextHelpFormatter,
+                                     description="Checks that minted coins come from a secret and their serials,\n"
+                                                 "or that a list of WIFs matches its addresses.")
+    parser.add_argument("--manifest", metavar="MANIFEST_FILE",
+                        help="· Manifest of the coins, as written by mint --manifest. Without --wifs, the address\n"
+                             "  of every coin is derived again from the secret and its serial number.")
+    parser.add_argument("--manifest-format", dest="manifest_format", choices=manifest.FORMATS,
+                        help="· Format of the manifest. Default = the extension of MANIFEST_FILE.")
+    parser.add_argument("--wifs", metavar="WIF_FILE",
+                        help="· File with a WIF per line, optionally followed by the address it should have\n"
+                             "  (use - to read standard input). With --manifest, every address must also be\n"
+                             "  in the manifest. The secret is not needed.")
+    parser.add_argument("-p", "--passphrase", type=str,
+                        help="· Secret the coins of the manifest were minted with. By default the secret is read\n"
+                             "  from \"./entropy.txt\".")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="· Number of processes that derive the keys. Use 0 to start one worker per CPU core.\n"
+                             "  Default = 1.")
+    parser.add_argument("--ec-backend", dest="ec_backend", choices=EC_BACKENDS, default="table",
+                        help="· Engine used to compute the public keys. Default = table.")
+    args = parser.parse_args(argv)
+
+    if not args.manifest and not args.wifs:
+        parser.error("a --manifest, a list of --wifs or both are required")
+    workers = args.workers or os.cpu_count()
+
+    try:
+        if args.wifs:
+            known = None
+            if args.manifest:
+                # the addresses of a manifest are bounded by the serial numbers, 10000 at most
+                known = {coin["address"] for coin in manifest.read_manifest(args.manifest, args.manifest_format)}
+            wif_file = sys.stdin if args.wifs == "-" else open(args.wifs, "r", encoding="utf-8")
+            with wif_file:
+                return _report(((f"line {line_number}", expected, address, error)
+                                for line_number, expected, address, error in audit.verify_wifs(
+                                    wif_file, workers=workers, ec_backend=args.ec_backend)), known)
+
+        secret = CoinInput.passphrase_or_entropy_file(args.passphrase)
+        coins = manifest.read_manifest(args.manifest, args.manifest_format)
+        return _report(((f"coin {serial_number}", expected, address, None)
+                        for serial_number, expected, address in audit.verify_manifest(
+                            secret, coins, workers=workers, ec_backend=args.ec_backend)))
+    except (OSError, ValueError) as e:
+        print(e)
+        return 1
+
+
+def _report(results, known=None, what="coins"):
+    """
+    Prints the coins that do not match as they are found, and a summary at the end.
+    :param results: An iterable of (label, expected address or None, derived address or None, error or None)
+    :param known: If given, the set of addresses every derived address must belong to
+    :param what: What is verified, for the summary
+    :return: The exit status, 1 if any coin does not match
+    """
+    start = time.perf_counter()
+    checked = 0
+    mismatches = 0
+    for label, expected, address, error in results:
+        checked += 1
+        if error is None and expected is not None and address != expected:
+            error = f"the address should be {expected}, but it is {address}"
+        elif error is None and known is not None and address not in known:
+            error = f"the address {address} is not in the manifest"
+        if error is not None:
+            mismatches += 1
+            print(f"· MISMATCH in {label}: {error}")
+
+    seconds = time.perf_counter() - start
+    print(f"Verified {checked} {what} in {seconds:.2f} seconds ({checked / max(seconds, 1e-9):.1f} {what}/second): "
+          f"{mismatches} mismatch(es).")
+    return 1 if mismatches else 0
+
+
+def serve(argv=None):
+    """
+    Runs the minting daemon until it is stopped, see bertocoin/serve.py.
+    :return: The exit status
+    """
+    import asyncio
+
+    from bertocoin import shredder
+
+    parser = argparse.ArgumentParser("python3 bertocoin serve", formatter_class=argparse.RawTextHelpFormatter,
+                                     description="Mints the coins requested through a Unix domain socket, one JSON\n"
+                                                 "object per line, e.g.: {\"serial\": 21, \"numerator\": 1, "
+                                                 "\"denominator\": 1000}.\n"
+                                                 "Send {\"command\": \"stats\"} for the latency percentiles.")
+    parser.add_argument("--socket", default="bertocoin.sock",
+                        help="· Path of the Unix domain socket. Default = ./bertocoin.sock.")
+    parser.add_argument("-p", "--passphrase", type=str,
+                        help="· Secret of the coins. By default it is read from \"./entropy.txt\", once, at startup.")
+    parser.add_argument("-w", "--workers", type=int, default=2,
+                        help="· Number of processes that derive the keys. Use 0 to start one worker per CPU core.\n"
+                             "  Default = 2.")
+    parser.add_argument("-c", "--concurrency", type=int, default=4,
+                        help="· Number of coins minted at the same time. Default = 4.")
+    parser.add_argument("-q", "--queue-size", dest="queue_size", type=int, default=64,
+                        help="· Number of requests that can wait to be minted, the rest are rejected. Default = 64.")
+    parser.add_argument("--ec-backend", dest="ec_backend", choices=EC_BACKENDS, default="table",
+                        help="· Engine used to compute the public keys. Default = table.")
+    parser.add_argument("--inline-qr", dest="inline_qr", action="store_true",
+                        help="· Embed the QR codes in the printables instead of writing png files.")
+    parser.add_argument("--qr-mask", dest="qr_mask", type=int, choices=range(8), metavar="{0..7}",
+                        help="· Use always the same mask pattern for the QR codes.")
+    parser.add_argument("--ram-only", dest="ram_only", action="store_true",
+                        help="· Write the printables to a private folder in RAM (/dev/shm).")
+    parser.add_argument("--shred-passes", dest="shred_passes", choices=shredder.PASS_POLICIES, default="dod",
+                        help="· How the printables are overwritten before being deleted. Default = dod.")
+    parser.add_argument("-t", "--timeout", type=int, default=300,
+                        help="· Seconds the files of every coin are kept. Default = 300 (5 minutes).")
+    args = parser.parse_args(argv)
+
+    try:
+        passphrase = CoinInput.passphrase_or_entropy_file(args.passphrase)
+    except IOError as e:
+        print(e)
+        return 1
+    if not CoinInput.passphrase_is_robust(passphrase):
+        print("The passphrase you entered is not sufficiently robust! \n"
+              "Please choose a different one with greater entropy.")
+        return 1
+
+    from bertocoin import storage as storage_backends
+    from bertocoin.serve import MintServer
+
+    try:
+        storage = output_storage(args)
+    except storage_backends.StorageError as e:
+        print(e)
+        return 1
+
+    server = MintServer(passphrase, args.socket, storage, workers=args.workers or os.cpu_count(),
+                        concurrency=args.concurrency, queue_size=args.queue_size, timeout=args.timeout,
+                        ec_backend=args.ec_backend, inline_qr=args.inline_qr, qr_mask=args.qr_mask,
+                        shred_passes=args.shred_passes)
+
+    def ready():
+        print(f"Listening on {args.socket}, press Enter or Ctrl+C to stop and destroy all the coins.", flush=True)
+
+    asyncio.run(server.serve(ready))
+    stats = server.stats()
+    print(f"Minted {stats['minted']} coins, {stats['rejected']} requests rejected. Latency: " +
+          ", ".join(f"{name} {ms:.1f} ms" for name, ms in stats["latency_ms"].items()))
+    return 0
+
+
+def vanity(argv=None):
+    """
+    Searches private keys whose address starts with a prefix, see bertocoin/vanity.py.
+    :return: The exit status, 1 if the keys were not found
+    """
+    from bertocoin import vanity as search
+
+    parser = argparse.ArgumentParser("python3 bertocoin vanity", formatter_class=argparse.RawTextHelpFormatter,
+                                     description="Searches private keys whose address starts with PREFIX, e.g.: for\n"
+                                                 "showcase coins minted with --debug --passphrase=<private key>.")
+    parser.add_argument("prefix", metavar="PREFIX", help="· Start of the address, e.g.: 1Bert")
+    parser.add_argument("-n", "--count", type=int, default=1, help="· Number of keys to find. Default = 1.")
+    parser.add_argument("-w", "--workers", type=int, default=0,
+                        help="· Number of processes that search. Default = 0, one worker per CPU core.")
+    parser.add_argument("--batch-size", dest="batch_size", type=int, default=search.BATCH_SIZE,
+                        help=f"· Keys that share a modular inversion. Default = {search.BATCH_SIZE}.")
+    parser.add_argument("--max-keys", dest="max_keys", type=int,
+                        help="· Give up after checking this many keys. Default = search until they are found.")
+    args = parser.parse_args(argv)
+
+    try:
+        ranges = search.prefix_ranges(args.prefix)
+    except ValueError as e:
+        print(e)
+        return 1
+    print(f"Searching {args.count} key(s) for {args.prefix}, 1 in {1 / search.probability(ranges):,.0f} keys "
+          f"matches.", flush=True)
+    print("· Note: the private keys are displayed, use them for showcase coins only.")
+
+    found = 0
+    checked = 0
+    seconds = 0
+    results = search.search(args.prefix, matches=args.count, workers=args.workers or os.cpu_count(),
+                            batch_size=max(1, args.batch_size), max_keys=args.max_keys)
+    try:
+        for kind, *values in results:
+            if kind == "match":
+                private_key, address = values
+                found += 1
+                print(f"· {address} private key: {private_key:064x}", flush=True)
+            else:
+                checked, seconds = values
+    except KeyboardInterrupt:
+        pass
+    finally:
+        results.close()
+
+    print(f"Checked {checked} keys in {seconds:.2f} seconds ({checked / max(seconds, 1e-9):.0f} keys/second): "
+          f"{found} found.")
+    return 0 if found >= args.count else 1
+
+
+def scan(argv=None):
+    """
+    Looks up the coins of a serial range in a snapshot of the UTXO set, see bertocoin/scan.py.
+    :return: The exit status
+    """
+    from bertocoin import scan as scanner
+
+    parser = argparse.ArgumentParser("python3 bertocoin scan", formatter_class=argparse.RawTextHelpFormatter,
+                                     description="Reports which coins are funded and which ones are empty, offline,\n"
+                                                 "against a snapshot of the UTXO set.")
+    parser.add_argument("--utxos", metavar="UTXO_FILE", required=True,
+                        help="· Snapshot of the UTXO set, an output per line: its address and its value in\n"
+                             "  satoshis, e.g.: \"1BertoCoin... 100000\". An index built before is accepted too.")
+    parser.add_argument("--index", metavar="INDEX_FILE",
+                        help="· Where the index of the snapshot is built. It is reused while it is newer than the\n"
+                             "  snapshot. Default = UTXO_FILE.idx.")
+    parser.add_argument("-r", "--serial-range", dest="serial_range", type=CoinInput.parse_serial_range, required=True,
+                        help="· Coins to look up, both ends included, e.g.: --serial-range 0100:0199.")
+    parser.add_argument("-p", "--passphrase", type=str,
+                        help="· Secret the coins were minted with. By default it is read from \"./entropy.txt\".")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="· Number of processes that derive the keys. Use 0 to start one worker per CPU core.\n"
+                             "  Default = 1.")
+    parser.add_argument("--ec-backend", dest="ec_backend", choices=EC_BACKENDS, default="table",
+                        help="· Engine used to compute the public keys. Default = table.")
+    parser.add_argument("--funded-only", dest="funded_only", action="store_true",
+                        help="· List only the funded coins.")
+    args = parser.parse_args(argv)
+
+    try:
+        index_path = args.utxos
+        if not scanner.is_index(args.utxos):
+            index_path = args.index or args.utxos + ".idx"
+            if not os.path.exists(index_path) or os.path.getmtime(index_path) < os.path.getmtime(args.utxos):
+                start = time.perf_counter()
+                with open(args.utxos, "r", encoding="utf-8", errors="replace") as snapshot:
+                    outputs, skipped, addresses = scanner.build_index(snapshot, index_path)
+                print(f"Indexed {outputs} outputs of {addresses} addresses in {time.perf_counter() - start:.2f} "
+                      f"seconds ({skipped} lines skipped): {index_path}")
+
+        secret = CoinInput.passphrase_or_entropy_file(args.passphrase)
+        serial_numbers = (str(serial).zfill(4) for serial in args.serial_range)
+        funded = 0
+        total = 0
+        with scanner.UtxoIndex(index_path) as index:
+            for serial_number, address, value in scanner.scan_coins(secret, serial_numbers, index,
+                                                                    workers=args.workers or os.cpu_count(),
+                                                                    ec_backend=args.ec_backend):
+                if value is not None:
+                    funded += 1
+                    total += value
+                    print(f"· Coin {serial_number} {address}: funded, {value / 1e8:.8f} BTC")
+                elif not args.funded_only:
+                    print(f"· Coin {serial_number} {address}: empty")
+    except (OSError, ValueError) as e:
+        print(e)
+        return 1
+
+    print(f"Scanned {len(args.serial_range)} coins: {funded} funded ({total / 1e8:.8f} BTC), "
+          f"{len(args.serial_range) - funded} empty.")
+    return 0
+
+
+def prove(argv=None):
+    """
+    Signs an audit challenge with the key of every coin of a serial range, see bertocoin/proofs.py.
+    :return: The exit status
+    """
+    from bertocoin import proofs
+
+    parser = argparse.ArgumentParser("python3 bertocoin prove", formatter_class=argparse.RawTextHelpFormatter,
+                                     description="Proves the control of the coins of a serial range: the challenge\n"
+                                                 "of an audit is signed with the key of every coin (Bitcoin signed\n"
+                                                 "messages), a proof per line: serial number, address and signature.")
+    parser.add_argument("-r", "--serial-range", dest="serial_range", type=CoinInput.parse_serial_range, required=True,
+                        help="· Coins that sign, both ends included, e.g.: --serial-range 0100:0199.")
+    parser.add_argument("-m", "--challenge", required=True, help="· Message to sign, given by the auditor.")
+    parser.add_argument("-o", "--output", default="-",
+                        help="· File the proofs are written to. Default = standard output.")
+    parser.add_argument("-p", "--passphrase", type=str,
+                        help="· Secret the coins were minted with. By default it is read from \"./entropy.txt\".")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="· Number of processes that sign. Use 0 to start one worker per CPU core.\n"
+                             "  Default = 1.")
+    args = parser.parse_args(argv)
+
+    try:
+        secret = CoinInput.passphrase_or_entropy_file(args.passphrase)
+        output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    except OSError as e:
+        print(e)
+        return 1
+
+    start = time.perf_counter()
+    serial_numbers = (str(serial).zfill(4) for serial in args.serial_range)
+    try:
+        for serial_number, address, signature in proofs.prove(secret, args.challenge, serial_numbers,
+                                                              workers=args.workers or os.cpu_count()):
+            output.write(f"{serial_number} {address} {signature}\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    seconds = time.perf_counter() - start
+    # the summary does not mix with the proofs on the standard output
+    print(f"Signed {len(args.serial_range)} proofs in {seconds:.2f} seconds "
+          f"({len(args.serial_range) / max(seconds, 1e-9):.1f} proofs/second).",
+          file=sys.stderr if output is sys.stdout else sys.stdout)
+    return 0
+
+
+def verify_proofs(argv=None):
+    """
+    Checks the proofs of control written by prove, see bertocoin/proofs.py.
+    :return: The exit status, 1 if any proof is not valid
+    """
+    from bertocoin import proofs
+
+    parser = argparse.ArgumentParser("python3 bertocoin verify-proofs",
+                                     formatter_class=argparse.RawTextHelpFormatter,
+                                     description="Checks that every signature of the challenge was made by the key\n"
+                                                 "of its address. The public keys are recovered from the signatures,\n"
+                                                 "so the secret is not needed.")
+    parser.add_argument("--proofs", metavar="PROOFS_FILE", default="-",
+                        help="· File with a proof per line: an optional label, the address and the signature, as\n"
+                             "  written by prove. Default = standard input.")
+    parser.add_argument("-m", "--challenge", required=True, help="· Message that was signed.")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="· Number of processes that verify. Use 0 to start one worker per CPU core.\n"
+                             "  Default = 1.")
+    args = parser.parse_args(argv)
+
+    try:
+        proofs_file = sys.stdin if args.proofs == "-" else open(args.proofs, "r", encoding="utf-8")
+    except OSError as e:
+        print(e)
+        return 1
+    with proofs_file:
+        return _report(proofs.verify_proofs(proofs.parse_proofs(proofs_file), args.challenge,
+                                            workers=args.workers or os.cpu_count()), what="proofs")
+
+
+def sweep(argv=None):
+    """
+    Builds the signed transactions that sweep the funds of redeemed coins, offline, see bertocoin/sweep.py.
+    :return: The exit status
+    """
+    from bertocoin import sweep as sweeper
+
+    parser = argparse.ArgumentParser("python3 bertocoin sweep", formatter_class=argparse.RawTextHelpFormatter,
+                                     description="Writes the signed raw transactions that move the funds of the\n"
+                                                 "coins to an address, in hex, one per line. Nothing is broadcast.")
+    parser.add_argument("-r", "--serial-range", dest="serial_range", type=CoinInput.parse_serial_range, required=True,
+                        help="· Redeemed coins, both ends included, e.g.: --serial-range 0100:0199.")
+    parser.add_argument("--utxos", metavar="UTXO_FILE", required=True,
+                        help="· JSON list of the unspent outputs of the coins, as the one of listunspent, with\n"
+                             "  txid, vout, address and value (satoshis) or amount (BTC).")
+    parser.add_argument("--to", dest="destination", required=True, help="· Address that receives the funds.")
+    parser.add_argument("--fee-rate", dest="fee_rate", type=float, default=10,
+                        help="· Fee in satoshis per byte. Default = 10.")
+    parser.add_argument("--max-inputs", dest="max_inputs", type=int, default=sweeper.MAX_INPUTS,
+                        help=f"· Inputs per transaction. Default = {sweeper.MAX_INPUTS}.")
+    parser.add_argument("-p", "--passphrase", type=str,
+                        help="· Secret the coins were minted with. By default it is read from \"./entropy.txt\".")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="· Number of processes that sign. Use 0 to start one worker per CPU core.\n"
+                             "  Default = 1.")
+    parser.add_argument("--ec-backend", dest="ec_backend", choices=EC_BACKENDS, default="table",
+                        help="· Engine used to compute the public keys. Default = table.")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        secret = CoinInput.passphrase_or_entropy_file(args.passphrase)
+        with open(args.utxos, "r", encoding="utf-8") as utxo_file:
+            utxos = sweeper.load_utxos(utxo_file)
+        transactions, empty = sweeper.sweep(secret, (str(serial).zfill(4) for serial in args.serial_range), utxos,
+                                            args.destination, args.fee_rate, max_inputs=args.max_inputs,
+                                            workers=args.workers or os.cpu_count(), ec_backend=args.ec_backend)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    for transaction in transactions:
+        print(transaction["hex"])
+
+    # the report does not mix with the transactions on the standard output
+    for serial_number in empty:
+        print(f"· Coin {serial_number} has no unspent outputs.", file=sys.stderr)
+    for transaction in transactions:
+        print(f"· Transaction of {transaction['inputs']} inputs, coins {', '.join(transaction['serials'])}: "
+              f"{transaction['value'] / 1e8:.8f} BTC, fee {transaction['fee']} satoshis.", file=sys.stderr)
+    print(f"Built {len(transactions)} transactions in {time.perf_counter() - start:.2f} seconds. "
+          f"They have not been broadcast.", file=sys.stderr)
+    return 0
+
+
+# name -> function that runs the subcommand with its arguments and returns the exit status
+SUBCOMMANDS = {
+    "mint": mint,
+    "generate-pass": generate_pass,
+    "verify": verify,
+    "serve": serve,
+    "vanity": vanity,
+    "scan": scan,
+    "prove": prove,
+    "verify-proofs": verify_proofs,
+    "sweep": sweep,
+}
+
+
+def main(argv=None):
+    """
+    Runs the subcommand named by the first argument. Without one, the arguments are those of mint, as
+    in the versions without subcommands.
+    :param argv: The command line arguments, sys.argv[1:] by default
+    :return: The exit status
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in SUBCOMMANDS:
+        return SUBCOMMANDS[argv[0]](argv[1:])
+    return mint(argv)
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+The choices shared by the command line parsers and the modules that implement them. This module imports
+nothing, so that parsing the arguments does not import the derivation code.
+"""
+
+# point multiplication backends, see bitcoin.Bitcoin
+EC_BACKENDS = ("ecdsa", "table")
+
+# encodings of the private key and of the addresses of a coin, see bertocoin/addresses.py
+WIF_FORMATS = ("wif", "wif-compressed")
+ADDRESS_FORMATS = ("p2pkh", "p2wpkh", "p2sh-p2wpkh")
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Hash functions used to derive the coins, with the fastest RIPEMD-160 implementation available.
+
+RIPEMD-160 is provided by OpenSSL through hashlib in most Python builds, but OpenSSL 3 moved it
+to the legacy provider and some distributions do not ship it. The available backends are probed
+the first time RIPEMD-160 is needed, in order of preference, and every candidate has to pass a
+known-answer test before being selected. The pure Python "ripemd" package is the last resort, and it
+is only imported if needed. Importing this module for the sha256 functions alone (e.g.: base58, in the
+light subcommands) probes nothing.
+"""
+
+import hashlib
+
+# known answer test: RIPEMD-160 of the ascii string "abc"
+_KNOWN_ANSWER = (b"abc", bytes.fromhex("8eb208f7e05d987a9b044a8e98c6b087f15a0bfc"))
+
+
+def _hashlib_ripemd160():
+    hashlib.new("ripemd160")
+
+    def ripemd160(data):
+        return hashlib.new("ripemd160", data).digest()
+
+    return ripemd160
+
+
+def _pure_python_ripemd160():
+    from ripemd import ripemd160 as ripemd160_module
+
+    def ripemd160(data):
+        return ripemd160_module.new(bytes(data)).digest()
+
+    return ripemd160
+
+
+# name -> factory that returns the hash function, or raises if the backend is not available
+RIPEMD160_BACKENDS = {
+    "hashlib": _hashlib_ripemd160,
+    "ripemd": _pure_python_ripemd160,
+}
+
+
+def load_ripemd160_backend(name):
+    """
+    Loads a RIPEMD-160 backend and checks it against a known answer.
+    :param name: One of the keys of RIPEMD160_BACKENDS
+    :return: A function that takes bytes and returns the 20 bytes digest
+    :raises ValueError: if the backend is not available or returns wrong digests
+    """
+    if name not in RIPEMD160_BACKENDS:
+        raise ValueError(f"Unknown RIPEMD-160 backend '{name}'")
+
+    try:
+        ripemd160 = RIPEMD160_BACKENDS[name]()
+    except (ImportError, ValueError) as error:
+        raise ValueError(f"RIPEMD-160 backend '{name}' is not available: {error}")
+
+    data, digest = _KNOWN_ANSWER
+    if ripemd160(data) != digest:
+        raise ValueError(f"RIPEMD-160 backend '{name}' failed the known answer test")
+
+    return ripemd160
+
+
+def _probe_ripemd160():
+    import logging
+
+    logger = logging.getLogger(__name__)
+    for name in RIPEMD160_BACKENDS:
+        try:
+            ripemd160 = load_ripemd160_backend(name)
+        except ValueError as error:
+            logger.debug(error)
+            continue
+        logger.info(f"Using the '{name}' RIPEMD-160 backend")
+        return name, ripemd160
+
+    raise ImportError("No RIPEMD-160 implementation available, please install the 'ripemd-hash' package.")
+
+
+# (name, function) of the backend selected, once probed
+_selected = None
+
+
+def _select_ripemd160():
+    global _selected, RIPEMD160_BACKEND, ripemd160
+    if _selected is None:
+        _selected = _probe_ripemd160()
+        RIPEMD160_BACKEND, ripemd160 = _selected
+    return _selected
+
+
+def ripemd160(data):
+    """
+    RIPEMD-160 of <data>. The first call probes the backends, and replaces this function by the one of the
+    backend selected.
+    :raises ImportError: if no backend is available
+    """
+    return _select_ripemd160()[1](data)
+
+
+def __getattr__(name):
+    # RIPEMD160_BACKEND is only defined once the backends have been probed
+    if name == "RIPEMD160_BACKEND":
+        return _select_ripemd160()[0]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def sha256(data):
+    return hashlib.sha256(data).digest()
+
+
+def sha256d(data):
+    """
+    Double sha256, used by the Base58Check checksums.
+    """
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+def hash160(data):
+    """
+    RIPEMD-160 of the sha256 of <data>, used to turn a public key into the payload of its address.
+    """
+    return ripemd160(hashlib.sha256(data).digest())
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Imposition of many coins on every printed sheet.
+
+The coin template is split into its top level elements (see template.split_elements). Elements
+without slots are the artwork shared by every coin: consecutive runs of them are written once per
+sheet inside <defs>, and every coin only references them with <use>. The elements with slots are
+compiled once and rendered for every coin. Z-order is kept, since the references and the rendered
+elements of a coin follow the order of the template.
+
+Every coin is drawn in a nested <svg> with the viewBox of the template, scaled to fit a cell of a
+grid on an A4 page. The grid is chosen to make the coins as large as possible for the number of
+coins per sheet. Sheets are written while the coins arrive, so a batch never needs more memory
+than one coin, and the size of the output grows with the number of sheets rather than with the
+number of coins.
+"""
+
+import math
+import os
+import re
+
+from bertocoin import template
+
+# A4 in points (1/72 inch), the unit of the viewBox of the template
+A4 = (595.28, 841.89)
+A4_SIZE_ATTRIBUTES = 'width="210mm" height="297mm"'
+
+_VIEW_BOX = re.compile(r'\bviewBox\s*=\s*"([^"]*)"')
+_DEFS = re.compile(r"\s*<defs\b")
+
+
+def view_box(root_tag):
+    """
+    Reads the viewBox of the opening <svg> tag of a template.
+    :return: A tuple (min_x, min_y, width, height)
+    """
+    match = _VIEW_BOX.search(root_tag)
+    if match is None:
+        raise template.TemplateError("The template has no viewBox, coins can not be scaled to fit the sheet.")
+
+    values = tuple(float(value) for value in match.group(1).replace(",", " ").split())
+    if len(values) != 4 or values[2] <= 0 or values[3] <= 0:
+        raise template.TemplateError(f"Invalid viewBox in the template: '{match.group(1)}'")
+    return values
+
+
+def grid(per_sheet, cell_width, cell_height, page_width, page_height):
+    """
+    Chooses the columns and rows of the grid that makes <per_sheet> cells of the given aspect ratio
+    as large as possible on the page. On a tie, the grid with fewer empty cells wins.
+    :return: A tuple (columns, rows, scale), where scale is the factor applied to every cell
+    """
+    if per_sheet < 1:
+        raise ValueError("At least one coin per sheet is required.")
+
+    best = None
+    for columns in range(1, per_sheet + 1):
+        rows = math.ceil(per_sheet / columns)
+        scale = min(page_width / (columns * cell_width), page_height / (rows * cell_height))
+        key = (round(scale, 9), -(columns * rows))
+        if best is None or key > best[0]:
+            best = (key, (columns, rows, scale))
+
+    return best[1]
+
+
+class SheetWriter:
+    """
+    Writes coins on sheets of <per_sheet> coins, one .svg file per sheet.
+    """
+
+    def __init__(self, template_path, output_pattern, per_sheet, page_size=A4, margin=0.0):
+        """
+        :param template_path: The path to the .svg template of a coin
+        :param output_pattern: The path of the sheets, with a placeholder for the sheet number,
+                               e.g.: delete-me/print-me-sheet-{:04d}.svg
+        :param per_sheet: How many coins are placed on every sheet
+        :param page_size: (width, height) of the page, in points
+        :param margin: Blank space left on every side of the page, in points
+        """
+        # validates the slots of the whole template
+        template.load_template(template_path)
+        with open(template_path, "r", encoding="utf-8") as template_file:
+            prologue, elements, _ = template.split_elements(template_file.read())
+
+        self.output_pattern = output_pattern
+        self.per_sheet = per_sheet
+        self.page_width, self.page_height = page_size
+        self.view_box = view_box(prologue)
+        _, _, cell_width, cell_height = self.view_box
+        self.columns, self.rows, self.scale = grid(per_sheet, cell_width, cell_height,
+                                                   self.page_width - 2 * margin, self.page_height - 2 * margin)
+        # center the grid on the page
+        self.left = (self.page_width - self.columns * cell_width * self.scale) / 2
+        self.top = (self.page_height - self.rows * cell_height * self.scale) / 2
+
+        # runs of static elements become <defs> shared by all the coins of a sheet
+        defs = []
+        cell = []
+        static_run = []
+        for element in elements + [None]:
+            if element is not None and _DEFS.match(element):
+                # the template's own definitions are shared as they are
+                defs.append(element)
+                continue
+            if element is not None and not template.has_slots(element):
+                static_run.append(element)
+                continue
+            if static_run:
+                art_id = f"bertocoin-art-{len(defs)}"
+                defs.append(f'\n<g id="{art_id}">{"".join(static_run)}\n</g>')
+                cell.append(f'\n<use xlink:href="#{art_id}"/>')
+                static_run = []
+            if element is not None:
+                cell.append(element)
+
+        self.defs = "".join(defs).encode("utf-8")
+        self.cell = template.CompiledTemplate("".join(cell), source=template_path, strict=False)
+
+        self.sheets = []
+        self.__sheet = None
+        self.__coins_in_sheet = 0
+
+    def __open_sheet(self):
+        pathname = self.output_pattern.format(len(self.sheets) + 1)
+        self.sheets.append(pathname)
+        self.__sheet = open(pathname, "wb")
+        self.__sheet.write(
+            (f'<?xml version="1.0" encoding="utf-8"?>\n'
+             f'<svg version="1.1" xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+             f'{A4_SIZE_ATTRIBUTES if (self.page_width, self.page_height) == A4 else ""} '
+             f'viewBox="0 0 {self.page_width} {self.page_height}" xml:space="preserve">\n<defs>').encode("utf-8"))
+        self.__sheet.write(self.defs)
+        self.__sheet.write(b"\n</defs>")
+        self.__coins_in_sheet = 0
+
+    def __close_sheet(self):
+        self.__sheet.write(b"\n</svg>\n")
+        self.__sheet.close()
+        self.__sheet = None
+
+    def add(self, values):
+        """
+        Places a coin in the next free cell, starting a new sheet when the current one is full.
+        :param values: The values of the slots of the coin, as in CompiledTemplate.render
+        :return: The path of the sheet where the coin was placed
+        """
+        if self.__sheet is None:
+            self.__open_sheet()
+
+        column = self.__coins_in_sheet % self.columns
+        row = self.__coins_in_sheet // self.columns
+        min_x, min_y, width, height = self.view_box
+        x = self.left + column * width * self.scale
+        y = self.top + row * height * self.scale
+        self.__sheet.write(
+            (f'\n<svg x="{x:.2f}" y="{y:.2f}" width="{width * self.scale:.2f}" height="{height * self.scale:.2f}" '
+             f'viewBox="{min_x:g} {min_y:g} {width:g} {height:g}">').encode("utf-8"))
+        self.__sheet.write(self.cell.render(values))
+        self.__sheet.write(b"\n</svg>")
+
+        sheet = self.sheets[-1]
+        self.__coins_in_sheet += 1
+        if self.__coins_in_sheet == self.per_sheet:
+            self.__close_sheet()
+        return sheet
+
+    @property
+    def sheet_open(self):
+        """
+        True while the current sheet still has free cells, False once it has been written completely.
+        """
+        return self.__sheet is not None
+
+    def close(self):
+        """
+        Finishes the last sheet, even if it is not full.
+        """
+        if self.__sheet is not None:
+            self.__close_sheet()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def sheet_pattern(printable_pathname):
+    """
+    The output pattern of the sheets for a printable path,
+    e.g.: delete-me/print-me.svg -> delete-me/print-me-sheet-{:04d}.svg
+    """
+    root, extension = os.path.splitext(printable_pathname)
+    return f"{root}-sheet-{{:04d}}{extension}"
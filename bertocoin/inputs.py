@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+Inputs of the coins: the command line arguments of the mint subcommand, the entropy file
+and the checks of the passphrase.
+"""
+
+import argparse
+import os
+import re
+
+from bertocoin import manifest, shredder, tracing
+from bertocoin.constants import ADDRESS_FORMATS, EC_BACKENDS, WIF_FORMATS
+
+
+class CoinInput:
+    """
+    The CoinInput is a static class that holds all the methods necessary to obtain and
+    validate the user inputs needed to build the coin.
+    The main method is command_line_arguments, which collects all inputs via cli
+    arguments. The secret seed can also be input via file and is read by the
+    read_entropy_file. There is also a method to create a secure secret and another one
+    to validate that the secret provided by the user has enough entropy.
+    """
+
+    @staticmethod
+    def secure_random_passphrase(length=64,
+                                 charset="ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789@()./+-"):
+        """
+        It returns a random string of length <length> using characters taken from <charset>
+        :param length:  Size of the generated string.
+        :param charset: String that contains characters that will be used to create the result
+        :return:        A random string created with the parameters given and formed using the best source of
+                        randomness provided by the host operating system -> os.urandom()
+        """
+
+        random_bytes = os.urandom(length)
+        indices = [byte % len(charset) for byte in bytearray(random_bytes)]
+        return "".join([charset[i] for i in indices])
+
+    @staticmethod
+    def passphrase_is_robust(passphrase):
+        """
+        Given a passphrase, it performs a series of checks to determine if it is robust enough to be used
+        as a seed to generate the private key of the coin.
+        :param      passphrase: A secret string of characters
+        :return:    True or False, depending on the robustness of the given password
+        """
+
+        MINIMUM_STRENGTH = 2 ** 128
+        MINIMUM_ENTROPY_SET_SIZE = 32
+
+        symbols = set(list(passphrase))
+        entropy_set_size = len(set(symbols))
+
+        combinations = entropy_set_size ** len(passphrase)
+        is_valid = (combinations > MINIMUM_STRENGTH) & (entropy_set_size > MINIMUM_ENTROPY_SET_SIZE)
+
+        return is_valid
+
+    @staticmethod
+    def read_entropy_file(file_path):
+        """
+        Reads secrete seed as all the content of the text file "entropy.txt"
+
+        :param    file_path: The path to the directory that stores the file
+
+        :return: The content of the file as a string
+        """
+        try:
+            file = open('entropy.txt', 'r')
+            print('Reading entropy file {}...'.format(file_path))
+            print()
+            return file.read()
+        except IOError:
+            raise IOError
+        except Exception:
+            print('An error ocurred while reading entropy file {}'.format(file_path))
+
+    @staticmethod
+    def parse_serial_range(value):
+        """
+        Parses a serial range given as <START:END> into a range object. Both ends are included,
+        so '0100:0199' produces 100 serial numbers.
+        :param value: The string typed in the command line, e.g.: '0100:0199'
+        :return: A range with all the serial numbers to mint
+        """
+
+        match = re.match(r"^(\d{1,4}):(\d{1,4})$", value.strip())
+        if not match:
+            raise argparse.ArgumentTypeError(f"Invalid serial range '{value}'. Expected START:END, e.g.: 0100:0199")
+
+        start, end = int(match.group(1)), int(match.group(2))
+        if start > end:
+            raise argparse.ArgumentTypeError(f"Invalid serial range '{value}'. START must not be greater than END.")
+
+        return range(start, end + 1)
+
+    @classmethod
+    def command_line_arguments(cls, argv=None, subcommands=("mint",)):
+        """
+        It returns a Namespace object with the arguments given in the command line.
+        :param argv: The arguments of the mint subcommand, sys.argv[1:] by default
+        :param subcommands: The names of the subcommands, listed in the help
+        """
+        parser = argparse.ArgumentParser("python3 bertocoin [mint]",
+                                         formatter_class=argparse.RawTextHelpFormatter,
+                                         description="This utility creates a ./delete-me/print-me.svg file containing\n"
+                                                     "a printable file holding the information of a physical a coin.\n"
+                                                     f"Subcommands: {', '.join(subcommands)} (default: mint).")
+
+        parser.add_argument("-s", "--serial", type=int,
+                            help="· Serial number displayed in the coin's face.\n"
+                                 "  Valid values: 0 to 9999. Default = 0.",
+                            default=0)
+
+        parser.add_argument('--debug', dest='debug_mode', action='store_true',
+                            help="· Coins should not be produced using this mode!\n"
+                                 "  In debug mode, sensible information will be output. Instead of a random seed,\n"
+                                 "  the secret provided must be 32 bytes of data in hex format (private key).\n"
+                                 "  The coin serial number will not influence the private key like in normal mode.")
+        parser.set_defaults(debug_mode=False)
+
+        parser.add_argument("-p", "--passphrase", type=str,
+                            help="· Secret that will be used to generate private key.\n"
+                                 "  By default the program will try to read the secret seed from \"./entropy.txt\".\n"
+                                 "  You can override this behaviour providing the secret via this in-line argument.\n"
+                                 "  E.g.: --passphrase='Th1s.Iz.My:SupeR.Sekret.-3aB1F79AeE21GcAb07d4'")
+
+        parser.add_argument("--generate-pass", dest='generate_pass', action='store_true',
+                            help="· Use this argument to auto-generate a secret using the best source of randomness\n"
+                                 "  provided by the host operating system.\n"
+                                 "  With this argument all inputs are ignored and only the secure secret is return.")
+        parser.set_defaults(generate_pass=False)
+
+        parser.add_argument("-n", "--numerator", type=int,
+                            help="· Numerator of the fraction printed in the coin's face.\n"
+                                 "  Valid values: 1 to 1000. Default = 1.",
+                            default=1)
+
+        parser.add_argument("-d", "--denominator", type=int,
+                            help="· Denominator of the fraction printed in the coin's face.\n"
+                                 "  Valid values: 1 to 1000. Default = 1000.",
+                            default=1000)
+
+        parser.add_argument("-r", "--serial-range", dest="serial_range", type=cls.parse_serial_range,
+                            help="· Batch mode: mint every serial between START and END (both included)\n"
+                                 "  in a single run, e.g.: --serial-range 0100:0199.\n"
+                                 "  All coins are derived from the same secret and written to the temp folder,\n"
+                                 "  followed by a single countdown and secure delete. Overrides --serial.")
+
+        parser.add_argument("-w", "--workers", type=int,
+                            help="· Batch mode only: number of processes used to derive the keys of the coins.\n"
+                                 "  Use 0 to start one worker per CPU core. Default = 1.",
+                            default=1)
+
+        parser.add_argument("--ec-backend", dest="ec_backend", choices=EC_BACKENDS,
+                            help="· Engine used to compute the public key from the private key.\n"
+                                 "  \"ecdsa\" is the reference implementation, \"table\" uses a precomputed table\n"
+                                 "  of multiples of the generator point. Default = table.",
+                            default="table")
+
+        parser.add_argument("--address-format", dest="address_format", choices=ADDRESS_FORMATS,
+                            help="· Address printed in the coin and in its public QR code: \"p2pkh\" (legacy, 1...),\n"
+                                 "  \"p2wpkh\" (native SegWit, bc1q...) or \"p2sh-p2wpkh\" (nested SegWit, 3...).\n"
+                                 "  All of them belong to the same key. Default = p2pkh.",
+                            default="p2pkh")
+
+        parser.add_argument("--wif-format", dest="wif_format", choices=WIF_FORMATS,
+                            help="· Private key printed in the coin and in its private QR code: \"wif\" (5...) or\n"
+                                 "  \"wif-compressed\" (K... or L...). Wallets look for the funds of the SegWit\n"
+                                 "  addresses only with the compressed one, so \"wif\" is only valid with p2pkh.\n"
+                                 "  Default = wif with p2pkh addresses, wif-compressed with the SegWit ones.")
+
+        parser.add_argument("--inline-qr", dest="inline_qr", action="store_true",
+                            help="· Embed the QR codes in the printable as SVG images instead of writing them\n"
+                                 "  to png files, so the printable is the only file generated for every coin.")
+        parser.set_defaults(inline_qr=False)
+
+        parser.add_argument("--qr-mask", dest="qr_mask", type=int, choices=range(8), metavar="{0..7}",
+                            help="· Use always the same mask pattern for the QR codes instead of choosing the\n"
+                                 "  most readable one for every code, which is much faster in batch mode.\n"
+                                 "  By default the best mask is chosen.")
+
+        parser.add_argument("-k", "--per-sheet", dest="per_sheet", type=int,
+                            help="· Batch mode only: number of coins placed on every printed A4 sheet. The coins\n"
+                                 "  are scaled to fit a grid that depends on the size of the template. Default = 1\n"
+                                 "  (one printable per coin, at full size).",
+                            default=1)
+
+        parser.add_argument("--ram-only", dest="ram_only", action="store_true",
+                            help="· Write the generated files to a private folder in RAM (/dev/shm) instead of\n"
+                                 "  the delete-me folder, so the secret of the coins never reaches the disk and\n"
+                                 "  the files are destroyed without overwriting them.")
+        parser.set_defaults(ram_only=False)
+
+        parser.add_argument("--shred-passes", dest="shred_passes", choices=shredder.PASS_POLICIES,
+                            help="· How the generated files are overwritten before being deleted:\n"
+                                 "  \"dod\" (zeros, ones and random data), \"srm-lite\" (ones and random data),\n"
+                                 "  \"random\" (a single pass of random data) or \"unlink\" (no overwriting).\n"
+                                 "  Default = dod.",
+                            default="dod")
+
+        parser.add_argument("--rolling-timeout", dest="rolling_timeout", action="store_true",
+                            help="· Batch mode only: destroy the files of every coin (or sheet) --timeout seconds\n"
+                                 "  after they are written, while the rest of the batch is minted, instead of\n"
+                                 "  destroying all of them at the end of the batch.")
+        parser.set_defaults(rolling_timeout=False)
+
+        parser.add_argument("--no-animation", dest="animation", action="store_false",
+                            help="· Print the instructions at once instead of simulating manual typing.")
+        parser.set_defaults(animation=True)
+
+        parser.add_argument("--manifest", metavar="MANIFEST_FILE",
+                            help="· Write the public side of every coin (serial number, fraction and address, never\n"
+                                 "  the WIF) to MANIFEST_FILE while the coins are minted, e.g.: for accounting.")
+
+        parser.add_argument("--manifest-format", dest="manifest_format", choices=manifest.FORMATS,
+                            help="· Format of the manifest: \"csv\", \"jsonl\" or \"bin\" (serial number and hash160\n"
+                                 "  of the address in fixed-width records, to be searched by serial).\n"
+                                 "  Default = the extension of MANIFEST_FILE.")
+
+        parser.add_argument("--profile", metavar="TRACE_FILE",
+                            help="· Time every step of the run and write the trace to TRACE_FILE when it ends.\n"
+                                 "  The trace holds timings only, never the passphrase, keys or addresses.")
+
+        parser.add_argument("--profile-format", dest="profile_format", choices=tracing.FORMATS,
+                            help="· Format of the trace: \"json\" (spans and a summary per step) or \"chrome\"\n"
+                                 "  (to open in chrome://tracing or Perfetto). Default = json.",
+                            default="json")
+
+        parser.add_argument("--profile-cprofile", dest="profile_cprofile", action="store_true",
+                            help="· With --profile, also profile every function call with cProfile and write the\n"
+                                 "  profile to TRACE_FILE.pstats.")
+        parser.set_defaults(profile_cprofile=False)
+
+        parser.add_argument("--profile-memory", dest="profile_memory", action="store_true",
+                            help="· With --profile, also trace the memory allocations with tracemalloc.")
+        parser.set_defaults(profile_memory=False)
+
+        parser.add_argument("-t", "--timeout", type=int,
+                            help="· How many seconds before the printable template and associated files are deleted.\n"
+                                 "  Default = 300 (5 minutes).",
+                            default=300)
+
+        arguments = parser.parse_args(argv)
+
+        # the SegWit addresses are only defined for compressed public keys, whose WIF has the compression flag
+        if (arguments.wif_format is None):
+            arguments.wif_format = "wif" if arguments.address_format == "p2pkh" else "wif-compressed"
+        elif (arguments.wif_format == "wif" and arguments.address_format != "p2pkh"):
+            parser.error(f"--wif-format wif can not be used with --address-format {arguments.address_format}: "
+                         "wallets that import it never find the funds of the SegWit address")
+
+        if (not arguments.generate_pass):
+            arguments.passphrase = cls.passphrase_or_entropy_file(arguments.passphrase)
+
+        return arguments
+
+    @classmethod
+    def passphrase_or_entropy_file(cls, passphrase):
+        """
+        It returns <passphrase>, or the content of the entropy file if no passphrase is provided.
+        :raises IOError: if there is no passphrase and no entropy file either
+        """
+        if (passphrase is None or passphrase == ""):
+            try:
+                return cls.read_entropy_file("entropy.txt")
+            except IOError:
+                raise IOError("No file 'entropy.txt' in the current directory! You must provide either an entropy file "
+                              "or a passphrase as inline argument.\n"
+                              "Enter --help to show the help message.")
+        return passphrase
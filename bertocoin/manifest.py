@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+Watch-only manifest of a batch: the public side of every coin (serial number, fraction, the address
+printed in it and the format of that address, see bertocoin/addresses.py), never its WIF, to be loaded
+in an accounting system.
+
+The rows are streamed while the coins are derived and written in batches, so the memory used does not
+grow with the number of coins. Three formats are available:
+
+- csv  : serial_number,numerator,denominator,address,address_format
+- jsonl: one JSON object per line, with the same fields
+- bin  : a header (magic, version and record size) followed by one fixed-width record per coin: the
+         serial number (uint32, big-endian) and the 20 bytes hash160 of its public key, the one of all its
+         address formats. Records are sorted by serial number, so the file can be memory-mapped and searched
+         by serial, see BinaryManifest. The fraction and the address format are not stored, the coins are
+         read back with their P2PKH address.
+"""
+
+import bisect
+import csv
+import mmap
+import os
+import struct
+
+from bertocoin import base58
+
+FORMATS = ("csv", "jsonl", "bin")
+
+# the only fields of a coin that are written, whatever the coin holds
+FIELDS = ("serial_number", "numerator", "denominator", "address", "address_format")
+# the format of the address of the coins minted before there were formats to choose from
+DEFAULT_ADDRESS_FORMAT = "p2pkh"
+
+MAGIC = b"BCMF"
+VERSION = 1
+_HEADER = struct.Struct(">4sHH")
+_RECORD = struct.Struct(">I20s")
+_SERIAL = struct.Struct(">I")
+
+# version byte of the P2PKH addresses of mainnet
+_ADDRESS_VERSION = b"\x00"
+
+
+def resolve_format(pathname, manifest_format=None):
+    """
+    The format of a manifest: <manifest_format> if given, or the one of the extension of <pathname>.
+    :raises ValueError: if the format is unknown
+    """
+    if manifest_format is None:
+        manifest_format = os.path.splitext(pathname)[1].lstrip(".").lower()
+    if manifest_format not in FORMATS:
+        raise ValueError(f"Unknown manifest format '{manifest_format}', valid values: {', '.join(FORMATS)}")
+    return manifest_format
+
+
+def address_hash160(address):
+    """
+    The 20 bytes hash160 of a P2PKH address, whose checksum is verified.
+    :raises ValueError: if the address is not a valid P2PKH address of mainnet
+    """
+    payload = base58.b58check_decode(address)
+    if len(payload) != 21 or payload[:1] != _ADDRESS_VERSION:
+        raise ValueError(f"'{address}' is not a P2PKH address")
+    return payload[1:]
+
+
+def hash160_address(hash160):
+    """
+    The P2PKH address of a 20 bytes hash160.
+    """
+    return base58.b58check_encode(_ADDRESS_VERSION + bytes(hash160))
+
+
+class ManifestWriter:
+    """
+    Streams the public fields of the coins to a manifest file.
+    """
+
+    def __init__(self, pathname, manifest_format=None, batch_size=1024):
+        """
+        :param pathname: The manifest file, it is overwritten
+        :param manifest_format: One of FORMATS, by default the extension of <pathname>
+        :param batch_size: How many rows are kept in memory before being written and flushed
+        """
+        self.pathname = pathname
+        self.format = resolve_format(pathname, manifest_format)
+        self.batch_size = max(1, batch_size)
+        self.rows = 0
+        self.__pending = []
+        self.__last_serial = -1
+
+        if self.format == "bin":
+            self.__file = open(pathname, "wb")
+            self.__file.write(_HEADER.pack(MAGIC, VERSION, _RECORD.size))
+        else:
+            self.__file = open(pathname, "w", newline="", encoding="utf-8")
+            if self.format == "csv":
+                self.__csv = csv.writer(self.__file, lineterminator="\n")
+                self.__csv.writerow(FIELDS)
+
+    def add(self, coin_info):
+        """
+        Adds a coin to the manifest. Only the FIELDS are written, the WIF is ignored.
+        :param coin_info: A dictionary with at least the FIELDS, e.g.: the coin_info of CoinStamper. The
+                          address_format is p2pkh if missing. The bin format needs the P2PKH address, in
+                          coin_info['formats'] if the address is in another format.
+        :raises ValueError: in the bin format, if the serial numbers are not increasing
+        """
+        address_format = coin_info.get("address_format", DEFAULT_ADDRESS_FORMAT)
+        if self.format == "bin":
+            serial = int(coin_info["serial_number"])
+            if serial <= self.__last_serial:
+                raise ValueError("The serial numbers of a binary manifest must be increasing.")
+            self.__last_serial = serial
+            address = coin_info["address"] if address_format == "p2pkh" else coin_info["formats"]["p2pkh"]
+            row = _RECORD.pack(serial, address_hash160(address))
+        else:
+            row = [str(coin_info[field]) for field in FIELDS[:-1]] + [address_format]
+
+        self.__pending.append(row)
+        if len(self.__pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the pending rows, so a run that stops halfway leaves only complete rows.
+        """
+        if not self.__pending:
+            return
+
+        if self.format == "bin":
+            self.__file.write(b"".join(self.__pending))
+        elif self.format == "csv":
+            self.__csv.writerows(self.__pending)
+        else:
+            import json
+
+            self.__file.write("".join(json.dumps(dict(zip(FIELDS, row))) + "\n" for row in self.__pending))
+        self.rows += len(self.__pending)
+        self.__pending.clear()
+        self.__file.flush()
+
+    def close(self):
+        if not self.__file.closed:
+            self.flush()
+            self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _Serials:
+    """
+    The serial numbers of the records of a mapped binary manifest, as a sequence for bisect.
+    """
+
+    def __init__(self, data, count):
+        self.data = data
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        return _SERIAL.unpack_from(self.data, _HEADER.size + index * _RECORD.size)[0]
+
+
+class BinaryManifest:
+    """
+    A binary manifest mapped in memory. Only the pages that are read are loaded, so finding a serial
+    number among millions of records takes a few page reads.
+    """
+
+    def __init__(self, pathname):
+        """
+        :raises ValueError: if the file is not a binary manifest
+        """
+        with open(pathname, "rb") as manifest_file:
+            size = os.fstat(manifest_file.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"{pathname} is not a binary manifest")
+            self.__data = mmap.mmap(manifest_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, record_size = _HEADER.unpack_from(self.__data)
+        if magic != MAGIC or version != VERSION or record_size != _RECORD.size \
+                or (size - _HEADER.size) % _RECORD.size:
+            self.__data.close()
+            raise ValueError(f"{pathname} is not a binary manifest, or it is truncated")
+
+        self.__serials = _Serials(self.__data, (size - _HEADER.size) // _RECORD.size)
+
+    def __len__(self):
+        return len(self.__serials)
+
+    def __getitem__(self, index):
+        """
+        :return: The tuple (serial number, hash160) of the record at <index>
+        """
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        return _RECORD.unpack_from(self.__data, _HEADER.size + index * _RECORD.size)
+
+    def __iter__(self):
+        return (_RECORD.unpack_from(self.__data, _HEADER.size + index * _RECORD.size) for index in range(len(self)))
+
+    def find(self, serial):
+        """
+        Binary search of a serial number.
+        :return: The 20 bytes hash160 of the coin, or None if the serial number is not in the manifest
+        """
+        index = bisect.bisect_left(self.__serials, serial)
+        if index < len(self) and self.__serials[index] == serial:
+            return self[index][1]
+        return None
+
+    def close(self):
+        self.__data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_manifest(pathname, manifest_format=None):
+    """
+    Reads the coins of a manifest one by one, in any of the FORMATS.
+    :return: A generator of dictionaries with the FIELDS. The fraction is None in the bin format, and the
+             address_format is p2pkh in the bin format and in the manifests written without it.
+    """
+    manifest_format = resolve_format(pathname, manifest_format)
+
+    if manifest_format == "bin":
+        with BinaryManifest(pathname) as manifest:
+            for serial, hash160 in manifest:
+                yield {"serial_number": str(serial).zfill(4), "numerator": None, "denominator": None,
+                       "address": hash160_address(hash160), "address_format": DEFAULT_ADDRESS_FORMAT}
+        return
+
+    with open(pathname, "r", newline="", encoding="utf-8") as manifest_file:
+        if manifest_format == "csv":
+            coins = csv.DictReader(manifest_file)
+        else:
+            import json
+
+            coins = (json.loads(line) for line in manifest_file if line.strip())
+
+        for coin in coins:
+            if not coin.get("address_format"):
+                coin["address_format"] = DEFAULT_ADDRESS_FORMAT
+            yield coin
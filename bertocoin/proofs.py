@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+Proofs of control of the minted coins, for reserve audits: every coin signs an audit challenge with its
+private key, in the message signing format of Bitcoin (the one of signmessage and verifymessage in
+Bitcoin Core), so the proofs can be checked by any wallet too.
+
+- The message is hashed with sha256d(b"\\x18Bitcoin Signed Message:\\n" + length + message).
+- The signature is deterministic (RFC 6979 nonces, see ecdsa.rfc6979.generate_k) and has a low s, and it
+  is encoded in Base64 as 65 bytes: a header byte (27 + 4 for compressed public keys + the recovery id),
+  r and s. The nonce points k * G are computed with the table of secp256k1, and the recovery id is read
+  from them (the parity of their ordinate, and whether their abscissa overflows N), so signing needs
+  neither the public key nor any recovery.
+- The public key is recovered from the signature and the message (recover_public_key), so a proof is
+  verified against the address of the coin without deriving its key, and without its secret.
+
+Signing and verification run on a pool of worker processes in chunks, see bitcoin.map_chunks.
+Proofs are written one per line: "serial_number address signature".
+"""
+
+import base64
+import hashlib
+
+from bertocoin import base58, bitcoin, hashes, secp256k1
+
+CHUNK_SIZE = 64
+
+MESSAGE_MAGIC = b"\x18Bitcoin Signed Message:\n"
+# header byte of the signatures: 27 + recovery id, + 4 if the address uses the compressed public key
+_HEADER_BASE = 27
+_COMPRESSED = 4
+
+# the secret and the challenge, as seen from inside a worker process
+_worker_secret = None
+_worker_digest = None
+
+
+def message_digest(message):
+    """
+    The digest signed by the message signing format of Bitcoin.
+    :param message: A string, encoded in utf-8
+    :return: The 32 bytes of the digest
+    """
+    message = message.encode("utf-8")
+    return hashes.sha256d(MESSAGE_MAGIC + bitcoin.compact_size(len(message)) + message)
+
+
+def _public_key_bytes(point, compressed=True):
+    x, y = point
+    if compressed:
+        return (b"\x03" if y & 1 else b"\x02") + x.to_bytes(32, "big")
+    return b"\x04" + x.to_bytes(32, "big") + y.to_bytes(32, "big")
+
+
+def _recover_many(digest, signatures):
+    """
+    Recovers the public keys of many signatures of the same digest. The whole list shares three modular
+    inversions: the one of the r values, the one of the points u1 * G and the one of the recovered keys.
+    :param signatures: A list of (r, s, recovery id) tuples
+    :return: A list with the public key of every signature as an affine point (x, y), or None if the
+             signature is not valid
+    """
+    e = int.from_bytes(digest, "big") % secp256k1.N
+    # (index, r, s, R) of the signatures whose point R exists
+    candidates = []
+    for index, (r, s, recovery_id) in enumerate(signatures):
+        try:
+            if not (0 < r < secp256k1.N and 0 < s < secp256k1.N):
+                raise ValueError("r and s must be in the range of the curve")
+            x = r + (recovery_id >> 1) * secp256k1.N
+            if x >= secp256k1.P:
+                raise ValueError("the recovery id is out of range")
+            candidates.append((index, r, s, secp256k1.lift_x(x, recovery_id & 1)))
+        except ValueError:
+            continue
+    if not candidates:
+        return [None] * len(signatures)
+
+    # Q = r^-1 * (s * R - e * G) = u2 * R + u1 * G
+    r_inverses = secp256k1.batch_inverse([r for _, r, _, _ in candidates], secp256k1.N)
+    u1s = [-e * r_inverse % secp256k1.N for r_inverse in r_inverses]
+    generator_points = iter(secp256k1.batch_to_affine([secp256k1.multiply_generator(u1) for u1 in u1s if u1]))
+
+    public_keys = [None] * len(signatures)
+    indexes = []
+    points = []
+    for (index, _, s, R), r_inverse, u1 in zip(candidates, r_inverses, u1s):
+        point = secp256k1.multiply(R, s * r_inverse % secp256k1.N)
+        if u1:
+            point = secp256k1.jacobian_add_affine(point, next(generator_points))
+        if point[2] != 0:
+            indexes.append(index)
+            points.append(point)
+
+    for index, public_key in zip(indexes, secp256k1.batch_to_affine(points)):
+        public_keys[index] = public_key
+    return public_keys
+
+
+def recover_public_key(digest, r, s, recovery_id):
+    """
+    The public key whose signature of <digest> is (r, s), given the recovery id of the signature.
+    :return: An affine point (x, y), or None if the signature is not valid
+    """
+    return _recover_many(digest, [(r, s, recovery_id)])[0]
+
+
+def decode_signature(signature):
+    """
+    Decodes a signature in Base64.
+    :return: A tuple (r, s, recovery id, compressed)
+    :raises ValueError: if it is not a signature of the message signing format
+    """
+    try:
+        data = base64.b64decode(signature, validate=True)
+    except ValueError:
+        raise ValueError("The signature is not valid Base64")
+    if len(data) != 65 or not _HEADER_BASE <= data[0] < _HEADER_BASE + 8:
+        raise ValueError("The signature is not a signed message of Bitcoin")
+
+    header = data[0] - _HEADER_BASE
+    return int.from_bytes(data[1:33], "big"), int.from_bytes(data[33:], "big"), header & 3, header >= _COMPRESSED
+
+
+def sign_digests(private_keys, digests):
+    """
+    Signs one digest with every key. The signatures are the ones of ecdsa.SigningKey.sign_digest_deterministic
+    with a low s, and the nonce points of the list share one modular inversion.
+    :param private_keys: A list with the 32 bytes of every private key
+    :param digests: A list with the 32 bytes digest signed by every key, in the same order
+    :return: A list with the (r, s, recovery id) of every signature
+    """
+    from ecdsa import rfc6979
+
+    secret_exponents = [int.from_bytes(private_key, "big") for private_key in private_keys]
+    nonces = [rfc6979.generate_k(secp256k1.N, d, hashlib.sha256, digest)
+              for d, digest in zip(secret_exponents, digests)]
+    nonce_points = secp256k1.batch_to_affine([secp256k1.multiply_generator(k) for k in nonces])
+    nonce_inverses = secp256k1.batch_inverse(nonces, secp256k1.N)
+
+    signatures = []
+    for d, digest, k, (x, y), k_inverse in zip(secret_exponents, digests, nonces, nonce_points, nonce_inverses):
+        e = int.from_bytes(digest, "big")
+        retry_gen = 0
+        while True:
+            r = x % secp256k1.N
+            s = k_inverse * (e + r * d) % secp256k1.N
+            if r and s:
+                break
+            # as RFC 6979 prescribes, and ecdsa does, the next nonce of the sequence is used instead
+            retry_gen += 1
+            k = rfc6979.generate_k(secp256k1.N, d, hashlib.sha256, digest, retry_gen=retry_gen)
+            x, y = secp256k1.to_affine(secp256k1.multiply_generator(k))
+            k_inverse = pow(k, -1, secp256k1.N)
+
+        # the recovery id tells R = k * G from the other points with abscissa r: parity of y and overflow of x
+        recovery_id = (y & 1) | (2 if x >= secp256k1.N else 0)
+        if s > secp256k1.N // 2:
+            # the low s signature is the one of -R
+            s = secp256k1.N - s
+            recovery_id ^= 1
+        signatures.append((r, s, recovery_id))
+    return signatures
+
+
+def sign_messages(private_keys, digest):
+    """
+    Signs the same digest with many keys, for their compressed public keys, see sign_digests.
+    :param private_keys: A list with the 32 bytes of every private key
+    :param digest: The digest of the message, see message_digest
+    :return: A list with the signature of every key in Base64
+    """
+    return [base64.b64encode(bytes([_HEADER_BASE + _COMPRESSED + recovery_id]) + r.to_bytes(32, "big") +
+                             s.to_bytes(32, "big")).decode("ascii")
+            for r, s, recovery_id in sign_digests(private_keys, [digest] * len(private_keys))]
+
+
+def sign_message(private_key, message=None, digest=None):
+    """
+    Signs a message with the format of Bitcoin, for the compressed public key of <private_key>.
+    :param private_key: The 32 bytes of the private key
+    :param message: The message, or its <digest> if it has already been computed with message_digest
+    :return: The signature in Base64
+    """
+    return sign_messages([private_key], digest or message_digest(message))[0]
+
+
+def _init_prove_worker(secret, challenge):
+    global _worker_secret, _worker_digest
+    _worker_secret = secret
+    _worker_digest = message_digest(challenge)
+
+
+def prove_chunk(serial_numbers):
+    """
+    Runs inside a worker process of prove. Derives the key of every serial number and signs the challenge.
+    :return: A list of (address, signature) tuples, in the same order
+    """
+    coins = bitcoin.Bitcoin(_worker_secret, None, "table")
+    private_keys = coins.private_keys_many(serial_numbers)
+    addresses = [address for _, address in coins.encode_many(private_keys)]
+    return list(zip(addresses, sign_messages(private_keys, _worker_digest)))
+
+
+def prove(secret, challenge, serial_numbers, workers=1, chunk_size=CHUNK_SIZE):
+    """
+    Signs the challenge with the key of every coin.
+    :param serial_numbers: An iterable of preformatted serial numbers, e.g.: ['0021', '0022']
+    :return: A generator of (serial number, address, signature) tuples, in the same order
+    """
+    results = bitcoin.map_chunks(prove_chunk, bitcoin.chunked(serial_numbers, chunk_size), workers=workers,
+                                 initializer=_init_prove_worker, initargs=(secret, challenge))
+    for chunk, proofs in results:
+        for serial_number, (address, signature) in zip(chunk, proofs):
+            yield serial_number, address, signature
+
+
+def _init_verify_worker(challenge):
+    global _worker_digest
+    _worker_digest = message_digest(challenge)
+
+
+def _verify_chunk(proofs):
+    """
+    Runs inside a worker process of verify_proofs.
+    :param proofs: A list of (label, address, signature) tuples
+    :return: A list of (label, address, recovered address or None, error or None) tuples
+    """
+    decoded = []
+    for _, address, signature in proofs:
+        try:
+            if address is None:
+                raise ValueError("the line must hold an address and a signature")
+            decoded.append(decode_signature(signature))
+        except ValueError as error:
+            decoded.append(error)
+
+    signatures = [signature[:3] for signature in decoded if not isinstance(signature, ValueError)]
+    public_keys = iter(_recover_many(_worker_digest, signatures))
+
+    results = []
+    for (label, address, _), signature in zip(proofs, decoded):
+        if isinstance(signature, ValueError):
+            results.append((label, address, None, str(signature)))
+            continue
+        public_key = next(public_keys)
+        if public_key is None:
+            results.append((label, address, None, "the signature is not valid"))
+            continue
+        recovered = base58.b58check_encode(b"\x00" + hashes.hash160(_public_key_bytes(public_key, signature[3])))
+        results.append((label, address, recovered, None))
+    return results
+
+
+def parse_proofs(lines):
+    """
+    Parses proofs, one per line: an optional label (e.g.: the serial number), the address and the signature.
+    Blank lines and lines starting with # are skipped.
+    :return: A generator of (label, address, signature) tuples, the label is the line number if missing
+    """
+    for line_number, line in enumerate(lines, 1):
+        fields = line.split()
+        if not fields or fields[0].startswith("#"):
+            continue
+        if len(fields) == 2:
+            yield f"line {line_number}", fields[0], fields[1]
+        elif len(fields) == 3:
+            yield f"coin {fields[0]}", fields[1], fields[2]
+        else:
+            yield f"line {line_number}", None, None
+
+
+def verify_proofs(proofs, challenge, workers=1, chunk_size=CHUNK_SIZE):
+    """
+    Checks that every signature of the challenge has been made by the key of its address.
+    :param proofs: An iterable of (label, address, signature) tuples, e.g.: parse_proofs
+    :return: A generator of (label, address, recovered address or None, error or None) tuples
+    """
+    results = bitcoin.map_chunks(_verify_chunk, bitcoin.chunked(proofs, chunk_size), workers=workers,
+                                 initializer=_init_verify_worker, initargs=(challenge,))
+    for _, chunk_results in results:
+        yield from chunk_results
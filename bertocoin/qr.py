@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+QR codes of the coins.
+
+PyQRCode builds every code from scratch: it picks the version, draws the function patterns,
+walks the matrix to place the data bits once per mask, and scores the eight masks to keep the
+best one. All WIFs are 51 characters long and all P2PKH addresses 34, so for a batch of coins
+everything but the data bits is the same for every code. QREncoder keeps those parts, per
+content length and error correction level, and reuses them for every coin. The masks are scored
+with the same rules as PyQRCode, evaluated on whole rows and columns, and the scoring can be
+skipped altogether by always using the same mask (any mask produces a valid code).
+
+Besides the png files, the QR codes can be rendered in memory as a small standalone SVG (one
+<path> with a square per dark module) and embedded in the printable as a base64 data URI. That
+way the printable is the only file written for a coin, and there are no QR images holding the
+secret to be deleted afterwards.
+"""
+
+import base64
+import itertools
+import re
+
+import pyqrcode
+from pyqrcode import builder, tables
+
+# blank modules around the code, as in the png files generated by PyQRCode
+QUIET_ZONE = 4
+
+MASKS = len(tables.mask_patterns)
+
+# penalty rules 1 and 3 of the QR standard, see QRCodeBuilder.choose_best_mask
+_RUNS = re.compile(r"0{5,}|1{5,}")
+_FINDER_LIKE = re.compile(r"(?=00001011101|10111010000)")
+
+
+def _content_mode(content):
+    """
+    The QR mode PyQRCode would choose for an ASCII <content>: numeric, alphanumeric or binary.
+    Returns None for non ASCII content, which is left to PyQRCode.
+    """
+    if not content.isascii():
+        return None
+    if content.isdigit():
+        return "numeric"
+    if all(character in tables.ascii_codes for character in content):
+        return "alphanumeric"
+    return "binary"
+
+
+def penalty(code):
+    """
+    Computes the penalty score of a QR matrix exactly as QRCodeBuilder.choose_best_mask does,
+    working on whole rows and columns (as strings and integers) instead of module by module.
+    :param code: The matrix of the QR code, as a list of rows of 0 and 1 modules
+    :return: The total penalty, the mask with the lowest one is the most readable
+    """
+    rows = ["".join("1" if module else "0" for module in row) for row in code]
+    columns = ["".join(column) for column in zip(*rows)]
+    lines = rows + columns
+    size = len(rows)
+
+    # rule 1: 3 points for every run of 5 modules of the same color, plus 1 per extra module
+    score = sum(len(run) - 2 for line in lines for run in _RUNS.findall(line))
+
+    # rule 2: 3 points for every 2x2 block of the same color
+    numbers = [int(row, 2) for row in rows]
+    block_mask = (1 << (size - 1)) - 1
+    blocks = 0
+    for upper, lower in zip(numbers, numbers[1:]):
+        different = (upper ^ (upper >> 1)) | (upper ^ lower) | (upper ^ (lower >> 1))
+        blocks += (~different & block_mask).bit_count()
+    score += 3 * blocks
+
+    # rule 3: 40 points for every 1011101 pattern preceded or followed by 4 light modules
+    score += 40 * sum(len(_FINDER_LIKE.findall(line)) for line in lines)
+
+    # rule 4: 10 points for every 5% of deviation from 50% dark modules
+    percent = (sum(row.count("1") for row in rows) / size ** 2 * 100) - 50
+    score += int((abs(int(percent)) / 5) * 10)
+
+    return score
+
+
+class _Layout:
+    """
+    The parts of a QR code that only depend on its version and error correction level: the matrix
+    with the function patterns and the format bits of every mask, the position of every data bit,
+    and whether every mask flips it.
+    """
+
+    def __init__(self, code_builder):
+        size = tables.version_size[code_builder.version]
+        template = [[" "] * size for _ in range(size)]
+        code_builder.add_detection_pattern(template)
+        code_builder.add_position_pattern(template)
+        code_builder.add_version_pattern(template)
+
+        self.templates = []
+        for n in range(MASKS):
+            masked_template = [row.copy() for row in template]
+            code_builder.add_type_pattern(masked_template, tables.type_bits[code_builder.error][n])
+            self.templates.append(masked_template)
+
+        # same path as QRCodeBuilder.make_masks: pairs of columns, moving up and down
+        self.positions = []
+        row_start = itertools.cycle([size - 1, 0])
+        row_stop = itertools.cycle([-1, size])
+        direction = itertools.cycle([-1, 1])
+        for column in range(size - 1, 0, -2):
+            if column <= 6:
+                column = column - 1
+            column_pair = itertools.cycle([column, column - 1])
+            for row in range(next(row_start), next(row_stop), next(direction)):
+                for _ in range(2):
+                    col = next(column_pair)
+                    if self.templates[0][row][col] == " ":
+                        self.positions.append((row, col))
+
+        self.flips = [[1 if tables.mask_patterns[n](row, col) else 0 for row, col in self.positions]
+                      for n in range(MASKS)]
+
+    def apply(self, bits, mask):
+        """
+        Places the data <bits> (a string of 0s and 1s) in a copy of the template of <mask>.
+        """
+        code = [row.copy() for row in self.templates[mask]]
+        # positions left after the data are filled with 0s, the "remainder bits"
+        bits = itertools.chain(bits, itertools.repeat("0"))
+        for (row, col), flip, bit in zip(self.positions, self.flips[mask], bits):
+            code[row][col] = (bit == "1") ^ flip
+
+        return code
+
+
+class _CachedQRCodeBuilder(builder.QRCodeBuilder):
+    """
+    A QRCodeBuilder that takes the layout of the code from QREncoder instead of building it.
+    """
+
+    def __init__(self, data, version, mode, error, encoder):
+        self.encoder = encoder
+        super().__init__(data, version, mode, error)
+
+    def make_code(self):
+        layout = self.encoder.layout(self)
+        bits = self.buffer.getvalue()
+
+        if self.encoder.fixed_mask is not None:
+            self.best_mask = self.encoder.fixed_mask
+            self.code = layout.apply(bits, self.best_mask)
+            return
+
+        self.masks = [layout.apply(bits, n) for n in range(MASKS)]
+        self.best_mask = self.choose_best_mask()
+        self.code = self.masks[self.best_mask]
+
+    def choose_best_mask(self):
+        scores = [penalty(mask) for mask in self.masks]
+        return scores.index(min(scores))
+
+
+class QREncoder:
+    """
+    Builds QR codes reusing, across calls, everything that only depends on the length of the content.
+    """
+
+    def __init__(self, error="H", fixed_mask=None):
+        """
+        :param error: The error correction level, as in pyqrcode.create
+        :param fixed_mask: None to choose the best of the 8 masks for every code, like PyQRCode does,
+                           or the number of the mask (0 to 7) to use for every code.
+        """
+        if fixed_mask is not None and fixed_mask not in range(MASKS):
+            raise ValueError(f"Invalid QR mask {fixed_mask}, valid values: 0 to {MASKS - 1}")
+
+        self.error = error
+        self.fixed_mask = fixed_mask
+        # (length, mode) -> (version, mode, error) as chosen by PyQRCode
+        self.__versions = {}
+        # (version, error) -> _Layout
+        self.__layouts = {}
+
+    def layout(self, code_builder):
+        key = (code_builder.version, code_builder.error)
+        if key not in self.__layouts:
+            self.__layouts[key] = _Layout(code_builder)
+        return self.__layouts[key]
+
+    def create(self, content):
+        """
+        Builds the QR code of <content>.
+        :param content: The text to encode
+        :return: A tuple with the version of the code and its matrix, as a list of rows of 0 and 1 modules
+        """
+        mode = _content_mode(content)
+        if mode is None:
+            code = pyqrcode.create(content, error=self.error)
+            return code.version, code.code
+
+        key = (len(content), mode)
+        if key not in self.__versions:
+            # the first code of every size is used to learn the version and mode chosen by PyQRCode
+            code = pyqrcode.QRCode(content, error=self.error)
+            self.__versions[key] = (code.version, code.mode, code.error)
+        version, mode, error = self.__versions[key]
+
+        code_builder = _CachedQRCodeBuilder(content.encode("ascii"), version, mode, error, self)
+        return version, code_builder.code
+
+
+_default_encoder = QREncoder()
+
+
+def create(content, encoder=None):
+    """
+    Builds the QR code of <content> with error correction level H, like pyqrcode.create.
+    :return: A tuple with the version of the code and its matrix
+    """
+    return (encoder or _default_encoder).create(content)
+
+
+def svg_path(code, quiet_zone=QUIET_ZONE):
+    """
+    Converts a QR matrix into the data of an SVG path. Every run of consecutive dark modules
+    in a row becomes a rectangle of height 1.
+    :param code: The matrix of the QR code, as a list of rows of 0 (light) and 1 (dark) modules
+    :param quiet_zone: Blank modules left around the code
+    :return: The 'd' attribute of an SVG path
+    """
+    commands = []
+    for y, row in enumerate(code, start=quiet_zone):
+        x = 0
+        size = len(row)
+        while x < size:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < size and row[x]:
+                x += 1
+            commands.append(f"M{start + quiet_zone} {y}h{x - start}v1h-{x - start}z")
+
+    return "".join(commands)
+
+
+def svg_image(content, encoder=None):
+    """
+    Renders the QR code of <content> as a standalone SVG document, without writing any file.
+    :param content: The text to encode, e.g.: a WIF or an address
+    :return: The SVG document as utf-8 bytes
+    """
+    _, code = create(content, encoder)
+    size = len(code) + 2 * QUIET_ZONE
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+            f'<rect width="{size}" height="{size}" fill="#FFFFFF"/>'
+            f'<path fill="#000000" d="{svg_path(code)}"/></svg>').encode("utf-8")
+
+
+def svg_data_uri(content, encoder=None):
+    """
+    Returns the QR code of <content> as a data URI that can be used as the xlink:href of an SVG <image>.
+    """
+    return "data:image/svg+xml;base64," + base64.b64encode(svg_image(content, encoder)).decode("ascii")
+
+
+def png_file(content, pathname, scale=2, encoder=None):
+    """
+    Saves the QR code of <content> as a png image.
+    """
+    version, code = create(content, encoder)
+    # same writer used by pyqrcode.QRCode.png
+    builder._png(code, version, pathname, scale=scale)
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Offline scan of the minted coins against a snapshot of the UTXO set, to know which ones are funded and
+which ones are empty or already swept, without connecting to any node or explorer.
+
+The snapshot is a plain text file with an output per line: its address (or the hex of its hash160) and
+its value in satoshis, separated by spaces or a comma, e.g.: "1BertoCoin... 100000". P2PKH, P2WPKH and
+P2SH addresses are read, every coin is looked up by the hash160 of its key (its P2PKH and P2WPKH outputs)
+and by the one of its P2SH-P2WPKH redeem script. Other lines (headers, comments, other scripts) are skipped.
+
+Snapshots have tens of millions of outputs, so they are turned into an index once (build_index): a header
+followed by fixed-width records, the 20 bytes hash160 and the total value (uint64, big-endian) of every
+address, sorted by hash160. It is built with an external sort, sorting runs of a bounded size in memory
+and merging them from temporary files, so the memory used does not depend on the size of the snapshot.
+The index is memory-mapped and searched by binary search (UtxoIndex), only the pages read are loaded.
+"""
+
+import bisect
+import heapq
+import itertools
+import mmap
+import os
+import struct
+import tempfile
+
+from bertocoin import addresses, bitcoin, manifest
+
+MAGIC = b"BCUX"
+VERSION = 1
+_HEADER = struct.Struct(">4sHH")
+_RECORD = struct.Struct(">20sQ")
+
+# outputs sorted in memory at once when the index is built, and records read at once from every run
+RUN_SIZE = 1 << 19
+_READ_RECORDS = 4096
+
+
+def parse_utxo(line):
+    """
+    Parses a line of a UTXO snapshot.
+    :return: A tuple (hash160, value in satoshis), or None if the line is not a P2PKH, P2WPKH or P2SH output
+    """
+    fields = line.replace(",", " ").split()
+    if len(fields) < 2 or not fields[1].isdigit():
+        return None
+    try:
+        if len(fields[0]) == 40:
+            return bytes.fromhex(fields[0]), int(fields[1])
+        return addresses.decode_address(fields[0])[1], int(fields[1])
+    except ValueError:
+        return None
+
+
+def _read_run(run_file):
+    run_file.seek(0)
+    while True:
+        block = run_file.read(_READ_RECORDS * _RECORD.size)
+        if not block:
+            return
+        yield from (block[start:start + _RECORD.size] for start in range(0, len(block), _RECORD.size))
+
+
+def _write_records(index_file, records):
+    """
+    Writes sorted packed records, adding up the values of the same hash160.
+    :return: The number of records written
+    """
+    count = 0
+    for hash160, group in itertools.groupby(records, key=lambda record: record[:20]):
+        index_file.write(_RECORD.pack(hash160, sum(_RECORD.unpack(record)[1] for record in group)))
+        count += 1
+    return count
+
+
+def build_index(lines, pathname, run_size=RUN_SIZE):
+    """
+    Builds the index of a UTXO snapshot. The index is written to a temporary file that replaces <pathname>
+    once complete, and the runs of the external sort are written next to it.
+    :param lines: An iterable of lines of the snapshot, e.g.: an open file
+    :param run_size: How many outputs are sorted in memory at once
+    :return: A tuple (outputs read, lines skipped, addresses in the index)
+    """
+    folder = os.path.dirname(os.path.abspath(pathname))
+    outputs = 0
+    skipped = 0
+    runs = []
+    run = []
+    try:
+        for line in lines:
+            utxo = parse_utxo(line)
+            if utxo is None:
+                skipped += 1
+                continue
+            outputs += 1
+            # packed records take less memory than tuples, and sort by hash160 all the same
+            run.append(_RECORD.pack(*utxo))
+            if len(run) >= run_size:
+                run.sort()
+                run_file = tempfile.TemporaryFile(dir=folder)
+                runs.append(run_file)
+                run_file.write(b"".join(run))
+                run.clear()
+
+        run.sort()
+        records = heapq.merge(run, *[_read_run(run_file) for run_file in runs]) if runs else run
+        temporary = pathname + ".tmp"
+        with open(temporary, "wb") as index_file:
+            index_file.write(_HEADER.pack(MAGIC, VERSION, _RECORD.size))
+            addresses = _write_records(index_file, records)
+        os.replace(temporary, pathname)
+    finally:
+        for run_file in runs:
+            run_file.close()
+
+    return outputs, skipped, addresses
+
+
+def is_index(pathname):
+    """
+    True if <pathname> is an index built by build_index, False if it is anything else, e.g.: a snapshot.
+    """
+    with open(pathname, "rb") as candidate:
+        return candidate.read(len(MAGIC)) == MAGIC
+
+
+class _Hashes:
+    """
+    The hash160s of the records of a mapped index, as a sequence for bisect.
+    """
+
+    def __init__(self, data, count):
+        self.data = data
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        start = _HEADER.size + index * _RECORD.size
+        return self.data[start:start + 20]
+
+
+class UtxoIndex:
+    """
+    An index of a UTXO snapshot mapped in memory. Finding an address among tens of millions takes a few
+    page reads.
+    """
+
+    def __init__(self, pathname):
+        """
+        :raises ValueError: if the file is not an index
+        """
+        with open(pathname, "rb") as index_file:
+            size = os.fstat(index_file.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"{pathname} is not a UTXO index")
+            self.__data = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, record_size = _HEADER.unpack_from(self.__data)
+        if magic != MAGIC or version != VERSION or record_size != _RECORD.size \
+                or (size - _HEADER.size) % _RECORD.size:
+            self.__data.close()
+            raise ValueError(f"{pathname} is not a UTXO index, or it is truncated")
+
+        self.__hashes = _Hashes(self.__data, (size - _HEADER.size) // _RECORD.size)
+
+    def __len__(self):
+        return len(self.__hashes)
+
+    def find(self, hash160):
+        """
+        Binary search of a hash160.
+        :return: The total value of its outputs in satoshis, or None if it has none
+        """
+        index = bisect.bisect_left(self.__hashes, hash160)
+        if index < len(self) and self.__hashes[index] == hash160:
+            return _RECORD.unpack_from(self.__data, _HEADER.size + index * _RECORD.size)[1]
+        return None
+
+    def close(self):
+        self.__data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def scan_coins(secret, serial_numbers, index, workers=1, chunk_size=256, ec_backend="table"):
+    """
+    Derives the coins of a secret and looks them up in an index.
+    :param serial_numbers: An iterable of preformatted serial numbers, e.g.: ['0021', '0022']
+    :param index: An open UtxoIndex
+    :return: A generator of (serial number, P2PKH address, value in satoshis or None if it is empty) tuples.
+             The value adds up the outputs of all the address formats of the coin.
+    """
+    coins = bitcoin.derive_coins(secret, serial_numbers, workers=workers, chunk_size=chunk_size,
+                                 ec_backend=ec_backend)
+    for serial_number, _, address in coins:
+        hash160 = manifest.address_hash160(address)
+        values = [value for value in (index.find(hash160), index.find(addresses.p2sh_p2wpkh_hash160(hash160)))
+                  if value is not None]
+        yield serial_number, address, sum(values) if values else None
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Pure Python arithmetic over the secp256k1 curve, specialised in the only scalar multiplication
+that coin minting needs: k * G, where G is the generator of the curve.
+
+Since the base point never changes, all the multiples of G that a multiplication can use are computed
+once per process and kept in a table (fixed-base windowed method). The private key is read as 32 one-byte
+windows and k * G becomes the sum of 32 points taken from the table, without any point doubling.
+Points are accumulated in Jacobian coordinates (X, Y, Z), which represent the affine point (X/Z², Y/Z³),
+so that a single modular inversion is needed at the very end.
+
+The multiplication of any other point (multiply) uses plain double-and-add, it is only needed to recover
+the public key of a signature.
+"""
+
+# Curve parameters, see https://en.bitcoin.it/wiki/Secp256k1
+P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
+N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+Gx = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798
+Gy = 0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8
+G = (Gx, Gy)
+
+# Every window covers one byte of the private key
+WINDOW_BITS = 8
+WINDOWS = 256 // WINDOW_BITS
+
+_table = None
+
+
+def _affine_add(p1, p2):
+    """
+    Adds two affine points. Only used to build the table, where speed is not critical.
+    None represents the point at infinity.
+    """
+    if p1 is None:
+        return p2
+    if p2 is None:
+        return p1
+
+    (x1, y1), (x2, y2) = p1, p2
+    if x1 == x2:
+        if (y1 + y2) % P == 0:
+            return None
+        slope = 3 * x1 * x1 * pow(2 * y1, -1, P) % P
+    else:
+        slope = (y2 - y1) * pow(x2 - x1, -1, P) % P
+
+    x3 = (slope * slope - x1 - x2) % P
+    y3 = (slope * (x1 - x3) - y1) % P
+    return x3, y3
+
+
+def jacobian_double(point):
+    """
+    Doubles a point in Jacobian coordinates (dbl-2009-l formulas, valid for curves with a = 0).
+    """
+    X1, Y1, Z1 = point
+    if Z1 == 0 or Y1 == 0:
+        return 0, 1, 0
+
+    A = X1 * X1 % P
+    B = Y1 * Y1 % P
+    C = B * B % P
+    D = 2 * ((X1 + B) * (X1 + B) - A - C) % P
+    E = 3 * A % P
+    F = E * E % P
+    X3 = (F - 2 * D) % P
+    Y3 = (E * (D - X3) - 8 * C) % P
+    Z3 = 2 * Y1 * Z1 % P
+    return X3, Y3, Z3
+
+
+def jacobian_add_affine(point, affine_point):
+    """
+    Adds an affine point to a point in Jacobian coordinates (madd-2007-bl formulas).
+    A Jacobian point with Z = 0 is the point at infinity.
+    """
+    X1, Y1, Z1 = point
+    x2, y2 = affine_point
+    if Z1 == 0:
+        return x2, y2, 1
+
+    Z1Z1 = Z1 * Z1 % P
+    U2 = x2 * Z1Z1 % P
+    S2 = y2 * Z1 * Z1Z1 % P
+    H = (U2 - X1) % P
+    r = 2 * (S2 - Y1) % P
+    if H == 0:
+        if r == 0:
+            return jacobian_double(point)
+        return 0, 1, 0
+
+    HH = H * H % P
+    Ii = 4 * HH % P
+    J = H * Ii % P
+    V = X1 * Ii % P
+    X3 = (r * r - J - 2 * V) % P
+    Y3 = (r * (V - X3) - 2 * Y1 * J) % P
+    Z3 = ((Z1 + H) * (Z1 + H) - Z1Z1 - HH) % P
+    return X3, Y3, Z3
+
+
+def to_affine(point):
+    """
+    Converts a point in Jacobian coordinates to affine coordinates, which costs one modular inversion.
+    """
+    X, Y, Z = point
+    if Z == 0:
+        raise ValueError("The point at infinity has no affine coordinates.")
+
+    z_inv = pow(Z, -1, P)
+    z_inv_2 = z_inv * z_inv % P
+    return X * z_inv_2 % P, Y * z_inv_2 * z_inv % P
+
+
+def batch_inverse(values, modulus=P):
+    """
+    Inverts a list of field elements with a single modular inversion (Montgomery's trick):
+    the product of all the values is inverted once, and every individual inverse is then
+    recovered from it with three multiplications.
+    :param values: A list of non-zero integers modulo <modulus>
+    :param modulus: P for coordinates, or N for scalars
+    :return: The list of their inverses modulo <modulus>, in the same order
+    """
+    prefix_products = []
+    accumulated = 1
+    for value in values:
+        prefix_products.append(accumulated)
+        accumulated = accumulated * value % modulus
+
+    accumulated_inverse = pow(accumulated, -1, modulus)
+    inverses = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        inverses[i] = accumulated_inverse * prefix_products[i] % modulus
+        accumulated_inverse = accumulated_inverse * values[i] % modulus
+
+    return inverses
+
+
+def batch_to_affine(points):
+    """
+    Converts a list of points in Jacobian coordinates to affine coordinates sharing one modular
+    inversion for the whole list. The result is identical to calling to_affine on every point.
+    :param points: A list of (X, Y, Z) tuples
+    :return: A list of (x, y) tuples
+    """
+    if any(Z == 0 for _, _, Z in points):
+        raise ValueError("The point at infinity has no affine coordinates.")
+
+    affine_points = []
+    for (X, Y, _), z_inv in zip(points, batch_inverse([Z for _, _, Z in points])):
+        z_inv_2 = z_inv * z_inv % P
+        affine_points.append((X * z_inv_2 % P, Y * z_inv_2 * z_inv % P))
+
+    return affine_points
+
+
+def precomputed_table():
+    """
+    Returns the table of multiples of G, building it on first use. The table has one row per window,
+    and row <i> holds the affine points j * 256^i * G for j = 1...255, so the lookup of a window
+    with value j is table[i][j - 1].
+    """
+    global _table
+
+    if _table is None:
+        table = []
+        base = G
+        for _ in range(WINDOWS):
+            row = [(base[0], base[1], 1)]
+            for _ in range(2 ** WINDOW_BITS - 2):
+                row.append(jacobian_add_affine(row[-1], base))
+            row = batch_to_affine(row)
+            table.append(row)
+            # the base of the next window is 256 * base = 255 * base + base
+            base = _affine_add(row[-1], base)
+        _table = table
+
+    return _table
+
+
+def multiply_generator(scalar):
+    """
+    Computes scalar * G in Jacobian coordinates using the precomputed table.
+    :param scalar: An integer in the range [1, N - 1]
+    :return: A tuple (X, Y, Z)
+    """
+    if not 0 < scalar < N:
+        raise ValueError("The private key must be an integer between 1 and the order of the curve.")
+
+    table = precomputed_table()
+    point = (0, 1, 0)
+    for window in range(WINDOWS):
+        digit = scalar & 0xff
+        if digit:
+            point = jacobian_add_affine(point, table[window][digit - 1])
+        scalar >>= WINDOW_BITS
+
+    return point
+
+
+def multiply(affine_point, scalar):
+    """
+    Computes scalar * point for any point of the curve, by double-and-add in Jacobian coordinates.
+    :param affine_point: A tuple (x, y)
+    :param scalar: A non-negative integer
+    :return: A tuple (X, Y, Z), with Z = 0 if the result is the point at infinity
+    """
+    point = (0, 1, 0)
+    for bit in bin(scalar)[2:]:
+        point = jacobian_double(point)
+        if bit == "1":
+            point = jacobian_add_affine(point, affine_point)
+
+    return point
+
+
+def lift_x(x, odd):
+    """
+    The point of the curve with abscissa <x> and the given parity of its ordinate.
+    :raises ValueError: if no point of the curve has abscissa <x>
+    """
+    alpha = (x * x * x + 7) % P
+    # P = 3 (mod 4), so the square root is a single exponentiation
+    y = pow(alpha, (P + 1) // 4, P)
+    if y * y % P != alpha:
+        raise ValueError("No point of the curve has this abscissa.")
+    return (x, y) if y & 1 == odd else (x, P - y)
+
+
+def public_key(private_key_as_bytes):
+    """
+    Derives the public key of a private key, in the same format as ecdsa.VerifyingKey.to_string():
+    64 bytes holding the X and Y coordinates of the point, big endian.
+    :param private_key_as_bytes: The 32 bytes of the private key
+    :return: The 64 bytes of the uncompressed public key, without the 04 prefix
+    """
+    x, y = to_affine(multiply_generator(int.from_bytes(private_key_as_bytes, "big")))
+    return x.to_bytes(32, "big") + y.to_bytes(32, "big")
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+A long-lived minting daemon. Everything a coin needs is set up only once: the secret is read at startup
+and handed to a pool of derivation processes, the precomputed table of the curve is built in every
+worker, and the template and the QR encoder stay compiled between coins.
+
+The daemon listens on a Unix domain socket, readable and writable only by the user that started it.
+Every request and every response is a line of JSON:
+
+    {"serial": 21, "numerator": 1, "denominator": 1000}
+    -> {"ok": true, "serial_number": "0021", "address": "1...", "printable": "delete-me/print-me-0021.svg",
+        "expires_in": 300, "latency_ms": 12.3}
+    {"command": "stats"}
+    -> {"ok": true, "minted": 10, "rejected": 0, "queued": 0, "latency_ms": {"p50": ..., "p90": ..., ...}}
+
+Requests wait in a bounded queue, and are rejected at once when it is full. A fixed number of them are
+minted at the same time. The printable of every coin is destroyed after the timeout, and all of them
+when the daemon stops (SIGINT, SIGTERM or Enter). Responses never hold the WIF of a coin.
+"""
+
+import asyncio
+import collections
+import json
+import math
+import os
+import time
+
+from bertocoin import bitcoin, tracing
+from bertocoin.stamper import CoinStamper
+from bertocoin.terminator import CoinTerminator
+
+# the longest request line accepted, in bytes
+MAX_REQUEST_SIZE = 4096
+
+
+class RequestError(Exception):
+    pass
+
+
+class LatencyStats:
+    """
+    The latencies of the last <window> requests, and their percentiles.
+    """
+
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self, window=10000):
+        self.latencies = collections.deque(maxlen=window)
+
+    def add(self, seconds):
+        self.latencies.append(seconds)
+
+    def percentiles(self):
+        """
+        :return: A dictionary with the nearest-rank percentiles and the maximum, in ms
+        """
+        if not self.latencies:
+            return {}
+        latencies = sorted(self.latencies)
+        stats = {f"p{percentile}": 1e3 * latencies[max(0, math.ceil(percentile / 100 * len(latencies)) - 1)]
+                 for percentile in self.PERCENTILES}
+        stats["max"] = 1e3 * latencies[-1]
+        return stats
+
+
+def parse_request(request):
+    """
+    Validates a mint request.
+    :return: A tuple (serial number, numerator, denominator), the serial number preformatted, e.g.: '0021'
+    :raises RequestError: if the request is not valid
+    """
+    serial = request.get("serial")
+    numerator = request.get("numerator", 1)
+    denominator = request.get("denominator", 1000)
+    for name, value, low, high in (("serial", serial, 0, 9999), ("numerator", numerator, 1, 1000),
+                                   ("denominator", denominator, 1, 1000)):
+        if not isinstance(value, int) or isinstance(value, bool) or not low <= value <= high:
+            raise RequestError(f"'{name}' must be an integer from {low} to {high}")
+    return str(serial).zfill(4), numerator, denominator
+
+
+class MintServer:
+    """
+    Mints the coins requested through a Unix domain socket.
+    """
+
+    def __init__(self, secret, socket_path, storage, workers=2, concurrency=4, queue_size=64, timeout=300,
+                 ec_backend="table", inline_qr=False, qr_mask=None, shred_passes="dod"):
+        """
+        :param secret: The secret seed of the coins, it is only kept by the derivation workers
+        :param socket_path: Where the Unix domain socket is created
+        :param storage: Where the printables are written, see bertocoin/storage.py
+        :param workers: Number of processes that derive the keys
+        :param concurrency: Number of coins minted at the same time
+        :param queue_size: Number of requests that can wait, the rest are rejected
+        :param timeout: Seconds the files of every coin are kept
+        """
+        self.socket_path = socket_path
+        self.workers = max(1, workers)
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.stamper = CoinStamper(inline_qr=inline_qr, qr_mask=qr_mask, storage=storage)
+        self.terminator = CoinTerminator(printable_filepath=self.stamper.printable_pattern(),
+                                         shred_passes=shred_passes, storage=storage, animation=False)
+        self.latency = LatencyStats()
+        self.minted = 0
+        self.rejected = 0
+        self.__pool = bitcoin.derivation_pool(secret, self.workers, ec_backend)
+        self.__queue = asyncio.Queue(maxsize=max(1, queue_size))
+        # the stamper reuses its QR encoder between coins, so all the coins are stamped by the same thread
+        self.__stamp_thread = None
+        # serials whose files still exist, they can not be minted again until they expire
+        self.__alive = set()
+        self.__expiring = set()
+
+    def stats(self):
+        return {"ok": True, "minted": self.minted, "rejected": self.rejected, "queued": self.__queue.qsize(),
+                "alive": len(self.__alive), "latency_ms": self.latency.percentiles()}
+
+    async def __warm_up(self):
+        """
+        Builds the precomputed state before the first request: the table of the curve in every derivation
+        worker, the compiled template and the layout of the QR codes.
+        """
+        loop = asyncio.get_running_loop()
+        coins = await asyncio.gather(*[loop.run_in_executor(self.__pool, bitcoin.derive_chunk, ["0000"])
+                                       for _ in range(self.workers)])
+        [encodings] = coins[0]
+        WIF, address = encodings["wif"], encodings["p2pkh"]
+        await loop.run_in_executor(self.__stamp_thread, self.stamper.warm_up, WIF, address)
+
+    def __stamp(self, coin):
+        self.stamper.process_template(coin_info=coin, per_serial=True)
+        return self.stamper.pop_artifacts()
+
+    async def __mint(self, serial_number, numerator, denominator):
+        loop = asyncio.get_running_loop()
+        with tracing.span("serve.derive"):
+            [encodings] = await loop.run_in_executor(self.__pool, bitcoin.derive_chunk, [serial_number])
+        WIF, address = encodings["wif"], encodings["p2pkh"]
+
+        coin = {
+            'serial_number': serial_number,
+            'numerator': str(numerator),
+            'denominator': str(denominator),
+            'WIF': WIF,
+            'address': address
+        }
+        with tracing.span("serve.stamp"):
+            artifacts = await loop.run_in_executor(self.__stamp_thread, self.__stamp, coin)
+
+        for paths in artifacts:
+            task = asyncio.ensure_future(self.__expire(serial_number, paths))
+            self.__expiring.add(task)
+            task.add_done_callback(self.__expiring.discard)
+
+        return {"ok": True, "serial_number": serial_number, "address": address, "printable": artifacts[0][0],
+                "expires_in": self.timeout}
+
+    async def __expire(self, serial_number, paths):
+        try:
+            await self.terminator.expire(paths, self.timeout)
+        finally:
+            self.__alive.discard(serial_number)
+
+    async def __worker(self):
+        while True:
+            request, response, start = await self.__queue.get()
+            try:
+                result = await self.__mint(*request)
+                self.minted += 1
+            except Exception as error:
+                self.__alive.discard(request[0])
+                result = {"ok": False, "error": f"The coin could not be minted: {type(error).__name__}"}
+            latency = time.perf_counter() - start
+            self.latency.add(latency)
+            result["latency_ms"] = 1e3 * latency
+            if not response.done():
+                response.set_result(result)
+            self.__queue.task_done()
+
+    async def __respond(self, line):
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise RequestError("the request must be a JSON object")
+            if request.get("command") == "stats":
+                return self.stats()
+
+            serial_number, numerator, denominator = parse_request(request)
+        except (ValueError, RequestError) as error:
+            self.rejected += 1
+            return {"ok": False, "error": f"Invalid request: {error}"}
+
+        if serial_number in self.__alive:
+            self.rejected += 1
+            return {"ok": False, "error": f"The files of the coin {serial_number} have not expired yet"}
+
+        response = asyncio.get_running_loop().create_future()
+        try:
+            self.__queue.put_nowait(((serial_number, numerator, denominator), response, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return {"ok": False, "error": "Too many requests, try again later"}
+        self.__alive.add(serial_number)
+        return await response
+
+    async def __handle(self, reader, writer):
+        try:
+            while not reader.at_eof():
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(json.dumps({"ok": False, "error": "Request too long"}).encode("utf-8") + b"\n")
+                    break
+                if not line.strip():
+                    continue
+                writer.write(json.dumps(await self.__respond(line)).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, ready=None):
+        """
+        Runs the daemon until it is stopped, then destroys all the files.
+        :param ready: A function called once the daemon accepts requests
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.__stamp_thread = ThreadPoolExecutor(max_workers=1)
+        self.terminator.watch_early_destruction()
+        try:
+            await self.__warm_up()
+
+            # the socket is created readable and writable only by this user
+            umask = os.umask(0o177)
+            try:
+                server = await asyncio.start_unix_server(self.__handle, self.socket_path, limit=MAX_REQUEST_SIZE)
+            finally:
+                os.umask(umask)
+
+            workers = [asyncio.ensure_future(self.__worker()) for _ in range(self.concurrency)]
+            if ready is not None:
+                ready()
+
+            await self.terminator.wait_for_destruction_request()
+
+            server.close()
+            await server.wait_closed()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            while not self.__queue.empty():
+                _, response, _ = self.__queue.get_nowait()
+                response.set_result({"ok": False, "error": "The daemon is stopping"})
+            # the destruction has been requested, so the pending files are destroyed at once
+            await asyncio.gather(*self.__expiring)
+        finally:
+            self.__pool.shutdown(cancel_futures=True)
+            self.__stamp_thread.shutdown()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            await asyncio.get_running_loop().run_in_executor(None, self.terminator.destroy_temp_folder)
+
+
+def request(socket_path, payload):
+    """
+    Sends a request to a running daemon and waits for its response, e.g.: request(path, {"serial": 21})
+    :return: The response, as a dictionary
+    """
+    import socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with connection.makefile("rb") as response:
+            return json.loads(response.readline())
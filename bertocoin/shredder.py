@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Secure deletion of the files that hold the secret of the coins, without external tools.
+
+Every file is overwritten in place with large page-aligned buffers written with os.pwrite, once
+per pass of the chosen policy, and flushed to the device with fsync after every pass. Then it is
+truncated, renamed to a random name (so the original name does not survive in the directory) and
+unlinked. The directory tree is walked only once, and the files are shredded by a pool of threads:
+os.pwrite and os.fsync release the GIL, so the I/O of many small files overlaps. The buffers of the
+constant patterns are built once, while the random passes draw fresh random data for every block of
+every file, so no two blocks are overwritten with the same bytes.
+
+Keep in mind that overwriting in place is only effective on file systems that do not relocate the
+written blocks (no copy-on-write, journaling of data or SSD wear levelling guarantees), as with srm.
+"""
+
+import itertools
+import mmap
+import os
+import secrets
+import stat
+
+from bertocoin import tracing
+
+# name -> the patterns written on every pass, None stands for random data
+PASS_POLICIES = {
+    # a single pass of random data, like srm -ll
+    "random": (None,),
+    # zeros, ones and random data, as in DoD 5220.22-M
+    "dod": (b"\x00", b"\xff", None),
+    # the random pass of srm -l, preceded by 0xff
+    "srm-lite": (b"\xff", None),
+    # no overwriting at all, files are only renamed and unlinked (e.g.: for RAM backed folders)
+    "unlink": (),
+}
+
+# 1 MiB, a multiple of the block size of any file system
+BUFFER_SIZE = 1 << 20
+
+
+class ShredError(Exception):
+    """
+    Raised when some files could not be shredded. <failures> holds a (path, error) tuple for each one.
+    """
+
+    def __init__(self, failures):
+        self.failures = failures
+        super().__init__("\n".join(f"{path}: {error}" for path, error in failures))
+
+
+class Shredder:
+    """
+    Overwrites and deletes files and directory trees.
+    """
+
+    def __init__(self, passes="dod", fsync=True, workers=4, buffer_size=BUFFER_SIZE):
+        """
+        :param passes: The name of the pass policy, one of the keys of PASS_POLICIES
+        :param fsync: Flush every pass to the device before the next one starts
+        :param workers: Number of files shredded at the same time
+        :param buffer_size: Size of the buffers written with every os.pwrite call
+        """
+        if passes not in PASS_POLICIES:
+            raise ValueError(f"Unknown pass policy '{passes}', valid values: {', '.join(PASS_POLICIES)}")
+
+        self.passes = passes
+        self.fsync = fsync
+        self.workers = max(1, workers)
+        self.buffer_size = buffer_size
+        self.__patterns = PASS_POLICIES[passes]
+        # the buffers of the constant patterns are built once and reused for every file, anonymous maps are
+        # aligned to the page size
+        self.__buffers = {}
+        for pattern in self.__patterns:
+            if pattern is not None and pattern not in self.__buffers:
+                buffer = mmap.mmap(-1, buffer_size)
+                buffer.write(pattern * buffer_size)
+                self.__buffers[pattern] = memoryview(buffer)
+
+    def __overwrite(self, fd, size):
+        # whole blocks are overwritten, including the slack after the end of the file
+        block_size = os.fstat(fd).st_blksize or 4096
+        size = -(-size // block_size) * block_size
+        # every file has its own random buffer, as the pool shreds several files at the same time
+        random_buffer = None
+        if size and None in self.__patterns:
+            random_buffer = memoryview(mmap.mmap(-1, min(self.buffer_size, size)))
+
+        for pattern in self.__patterns:
+            offset = 0
+            while offset < size:
+                length = min(self.buffer_size, size - offset)
+                if pattern is None:
+                    # refilled for every block: a repeated random block would be a pattern of its own
+                    random_buffer[:length] = os.urandom(length)
+                    buffer = random_buffer
+                else:
+                    buffer = self.__buffers[pattern]
+                offset += os.pwrite(fd, buffer[:length], offset)
+            if self.fsync:
+                os.fsync(fd)
+
+    @staticmethod
+    def __random_name(path):
+        """
+        A random name, of the same length as the current one, in the same directory, that no other file has:
+        renaming over it would replace that file. Short names get longer when their names are taken.
+        """
+        directory, name = os.path.split(path)
+        alphabet = "abcdefghijklmnopqrstuvwxyz0123456789"
+        for attempt in itertools.count():
+            renamed = os.path.join(directory, "".join(secrets.choice(alphabet)
+                                                      for _ in range(len(name) + attempt // 8)))
+            if not os.path.lexists(renamed):
+                return renamed
+
+    def __unlink(self, path, remove=os.unlink):
+        renamed = self.__random_name(path)
+        os.rename(path, renamed)
+        try:
+            remove(renamed)
+        except OSError:
+            # keep the original name, so that the file can be found and removed manually
+            os.rename(renamed, path)
+            raise
+
+    def shred_file(self, path):
+        """
+        Overwrites the file <path> with every pass of the policy and deletes it.
+        Symbolic links are deleted without touching the file they point to.
+        """
+        if not os.path.islink(path):
+            fd = os.open(path, os.O_WRONLY | getattr(os, "O_NOFOLLOW", 0))
+            try:
+                self.__overwrite(fd, os.fstat(fd).st_size)
+                os.ftruncate(fd, 0)
+                if self.fsync:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+
+        self.__unlink(path)
+
+    def __shred_file(self, path):
+        try:
+            self.shred_file(path)
+        except OSError as error:
+            return path, error
+        return None
+
+    def shred(self, path):
+        """
+        Shreds a file, or a directory with all its contents.
+        :param path: The file or directory to delete
+        :raises ShredError: with every file or directory that could not be deleted. The rest are deleted anyway.
+        """
+        if os.path.islink(path) or not os.path.isdir(path):
+            failure = self.__shred_file(path)
+            if failure:
+                raise ShredError([failure])
+            return
+
+        files = []
+        directories = []
+        failures = []
+        for root, dir_names, file_names in os.walk(path, topdown=False, onerror=lambda error: failures.append(
+                (error.filename, error))):
+            files.extend(os.path.join(root, name) for name in file_names)
+            for name in dir_names:
+                # os.walk does not follow symbolic links to directories, they are listed as directories anyway
+                dir_path = os.path.join(root, name)
+                if stat.S_ISLNK(os.lstat(dir_path).st_mode):
+                    files.append(dir_path)
+                else:
+                    directories.append(dir_path)
+        directories.append(path)
+
+        # concurrent.futures is slow to import, and only needed once there is something to shred
+        from concurrent.futures import ThreadPoolExecutor
+
+        with tracing.span("shred", files=len(files), passes=len(self.__patterns)):
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                failures.extend(failure for failure in pool.map(self.__shred_file, files) if failure)
+
+        # bottom-up, so every directory is empty when it is removed
+        for directory in directories:
+            try:
+                self.__unlink(directory, remove=os.rmdir)
+            except OSError as error:
+                failures.append((directory, error))
+
+        if failures:
+            raise ShredError(failures)
@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+Printables of the coins: the SVG template filled with the information of every coin, and its QR codes.
+"""
+
+import os
+
+from bertocoin import imposition, qr, template, tracing
+from bertocoin import storage as storage_backends
+
+
+class CoinStamper:
+    """
+    The duty of the CoinStamper is to produce a printable file and the address QR codes.
+    All the information needed to produce the coin (serial, fraction, addres and WIF)
+    have to be provided as arguments, this class has no knowledge of bitcoin, it just
+    generates the final resources from the coin information object.
+    """
+
+    def __init__(self,
+                 resources_path="./resources",
+                 template_input="bertocoin.svg",
+                 template_output="print-me.svg",
+                 temp_folder="delete-me",
+                 inline_qr=False,
+                 qr_mask=None,
+                 per_sheet=1,
+                 storage=None,
+                 address_format="p2pkh",
+                 wif_format="wif"):
+
+        if wif_format == "wif" and address_format != "p2pkh":
+            # wallets that import the WIF without the compression flag never find the funds of a SegWit address
+            raise ValueError(f"The {address_format} addresses need the wif-compressed format of the private key")
+
+        # where the generated files are written, see bertocoin/storage.py
+        self.storage = storage or storage_backends.DiskStorage(temp_folder)
+        temp_folder = self.temp_folder = self.storage.folder
+        # when True the QR codes are embedded in the printable as SVG data URIs instead of png files
+        self.inline_qr = inline_qr
+        # the QR encoder reuses the layout of the codes across all the coins of a batch
+        self.qr_encoder = qr.QREncoder(fixed_mask=qr_mask)
+        self.template_input_path = f"{resources_path}/{template_input}"
+        self.template_output_path = os.path.join(temp_folder, template_output)
+        self.private_qr_pathname = os.path.join(temp_folder, "coin_private_qr.png")
+        self.public_qr_pathname = os.path.join(temp_folder, "coin_public_qr.png")
+        # coins placed on every printed sheet in batch mode, see bertocoin/imposition.py
+        self.per_sheet = per_sheet
+        # the encodings of the coin that fill the address and secret slots, see bertocoin/addresses.py
+        self.address_format = address_format
+        self.wif_format = wif_format
+        self.__sheet_writer = None
+        # groups of files that hold complete coins or sheets, see pop_artifacts
+        self.__artifacts = []
+        self.__sheet_artifacts = []
+
+    @staticmethod
+    def __with_serial(pathname, serial):
+        """
+        Adds the serial number to a file name, e.g.: delete-me/print-me.svg -> delete-me/print-me-0021.svg
+        Used in batch mode, so that every coin of the batch gets its own set of files.
+        """
+        root, extension = os.path.splitext(pathname)
+        return f"{root}-{serial}{extension}"
+
+    def printable_pattern(self):
+        """
+        Returns the glob pattern that matches every printable written in batch mode.
+        """
+        return self.__with_serial(self.template_output_path, "*")
+
+    def __similar_splits(self, s, n):
+        """
+        Given a string <s> it splits it into <n> 'almost' equal elements.
+        If the splits can not be made equal, the excess is added to the first elements.
+        :param s: The string to divide
+        :param n: Number of splits
+        :return: A list with the <n> splits
+        """
+
+        if n > len(s):
+            err_msg = "{} equal splits requested, when a string of length {} was provided.".format(n, len(s))
+            raise Exception(err_msg)
+
+        remainder = len(s) % n
+        part_size = (len(s) - remainder) // n
+        excess = remainder
+
+        index = 0
+        ret = []
+        for i in range(n):
+            delta = 1 if excess > 0 else 0
+            excess -= 1
+            next_index = (index + part_size + delta)
+            chunk = s[index:next_index]
+            ret.append(chunk)
+            index = next_index
+
+        sanity_check = "".join(ret)
+        if not sanity_check == s:
+            exception_msg = f"Unexpected error, splits don't add up to the whole string.\n <{s}> != <{sanity_check}>"
+            raise Exception(exception_msg)
+
+        return ret
+
+    def __encoding(self, coin_info, encoding, legacy_key):
+        """
+        The encoding of a coin in one of the formats of bertocoin/addresses.py, taken from coin_info["formats"],
+        or from coin_info[<legacy_key>] if it is in that format: coin_info["wif_format"] for the 'WIF' and
+        coin_info["address_format"] for the 'address', wif and p2pkh for coins without them.
+        """
+        if encoding in coin_info.get("formats", {}):
+            return coin_info["formats"][encoding]
+        format_key, default = {"WIF": ("wif_format", "wif"), "address": ("address_format", "p2pkh")}[legacy_key]
+        if encoding == coin_info.get(format_key, default):
+            return coin_info[legacy_key]
+        raise ValueError(f"The coin {coin_info['serial_number']} has not been encoded as {encoding}")
+
+    def coin_address(self, coin_info):
+        """
+        The address of the coin in the format of the address slots.
+        """
+        return self.__encoding(coin_info, self.address_format, "address")
+
+    def __qr_contents(self, coin_info):
+        """
+        The contents of the QR codes of a coin: its WIF and its address. Bech32 addresses are encoded in upper
+        case, as BIP 173 recommends, which fits the alphanumeric mode of the QR codes and makes them smaller.
+        """
+        address = self.coin_address(coin_info)
+        if self.address_format == "p2wpkh":
+            address = address.upper()
+        return self.__encoding(coin_info, self.wif_format, "WIF"), address
+
+    def warm_up(self, WIF, address):
+        """
+        Compiles the template and lays out the QR codes of a coin ahead of the first one, e.g.: in a daemon.
+        Nothing is written.
+        """
+        template.load_template(self.template_input_path)
+        self.qr_encoder.create(WIF)
+        self.qr_encoder.create(address)
+
+    def __create_temp_folder(self):
+        """
+        Utility method. It creates a temp folder to place the temporary files used to generate the
+        printable template.
+        :return: Nothing.
+        """
+        # Create target directory if it doesn't exist
+        self.storage.create()
+
+    def __generate_QR_codes(self, WIF, public_address, private_qr_pathname, public_qr_pathname):
+        """
+        Generates the two QR png images (WIF and public address) using the QR code generator
+        utility PyQRCode, through the QR encoder of this stamper (see bertocoin/qr.py).
+        :param WIF: Wallet Input Format to be hidden in the coin
+        :param public_address: Public address displayed in the face of the coin
+        :param private_qr_pathname: Where to save the QR of the WIF
+        :param public_qr_pathname: Where to save the QR of the public address
+        :return: saves the QR codes to two different png files.
+        """
+        self.__create_temp_folder()
+
+        with tracing.span("stamp.qr", inline=False):
+            qr.png_file(WIF, private_qr_pathname, scale=2, encoder=self.qr_encoder)
+            qr.png_file(public_address, public_qr_pathname, scale=2, encoder=self.qr_encoder)
+
+    def process_template(self, coin_info, per_serial=False):
+        """
+        It creates the printable file by replacing the variables inside the .svg template
+        file with their respective values. This method will also generate the QR images
+        which are also part of the processed template, either as png files or, in inline_qr mode,
+        embedded in the printable itself.
+        The template is compiled only once (see bertocoin/template.py) and reused for every coin.
+
+        Expected variables are:
+        ::serial::      -> The serial number that will be printed in the coin, e.g.: <0021>
+        ::f::           -> The fraction of bitcoin that will be stored in the coin. e.g.:  1:1000
+        ::address.00x:: -> The address where the bitcoins will be placed.
+                           e.g.: 5JgMaYD8yxft8SLQAj7Rme1pCGcQQ5Ce5VmhpijrARwwUYnBPDF
+                           There are 3 fields in the template, each of which will be replaced with a fragment of
+                           the address, like in:
+                           ::address.001:: -> 1Mjm3C1gSScY
+                           ::address.002:: -> xi9WRPCdVCMe
+                           ::address.003:: -> KYUgLcCHEK
+        :param coin_info: A dictionary containing the relevant info.
+                          It has these keys:
+                            "serial"        ->  A string containing the serial number, preformatted, e.g. '0021'
+                            "numerator"     ->  The numerator of the fraction that represents the value of the coin.
+                                                E.g.: 1
+                            "denominator"   ->  The denominator of the fraction that represents the value of the coin.
+                                                E.g.: 1000
+                            "address"       ->  A string that contains the address where the value of the coin will
+                                                be stored; represented in Base58check format
+                            "WIF"           ->  A string that contains the private key used to unlock the funds of
+                                                the coin, as a WIF string.
+                            "formats"       ->  Optional. A dictionary with the encodings of the coin in the formats
+                                                of bertocoin/addresses.py. The address and secret slots are filled
+                                                with the ones of self.address_format and self.wif_format.
+        :param per_serial: Batch mode. When True the serial number is added to the name of every generated file,
+                           so the printables of different coins can live together in the temp folder.
+        """
+        template_output_path = self.template_output_path
+        private_qr_pathname = self.private_qr_pathname
+        public_qr_pathname = self.public_qr_pathname
+        if per_serial:
+            template_output_path = self.__with_serial(template_output_path, coin_info["serial_number"])
+            private_qr_pathname = self.__with_serial(private_qr_pathname, coin_info["serial_number"])
+            public_qr_pathname = self.__with_serial(public_qr_pathname, coin_info["serial_number"])
+
+        with tracing.span("stamp.render"):
+            compiled_template = template.load_template(self.template_input_path)
+            values = self.__template_values(coin_info, private_qr_pathname, public_qr_pathname)
+            printable = compiled_template.render(values)
+
+        with tracing.span("stamp.write", bytes=len(printable)):
+            self.__create_temp_folder()
+            with open(template_output_path, 'wb') as template_output:
+                template_output.write(printable)
+
+        if not self.inline_qr:
+            self.__generate_QR_codes(*self.__qr_contents(coin_info), private_qr_pathname, public_qr_pathname)
+            self.__artifacts.append([template_output_path, private_qr_pathname, public_qr_pathname])
+        else:
+            self.__artifacts.append([template_output_path])
+
+        # return the path to the printable file we just generated
+        return template_output_path
+
+    def impose(self, coin_info):
+        """
+        Batch mode with several coins per sheet: places the coin in the next free cell of the current
+        sheet instead of writing a printable of its own. The artwork of the template is written once
+        per sheet, and the sheets are written as the coins arrive. close_sheets() must be called once
+        the last coin of the batch has been imposed.
+        :param coin_info: The same dictionary as in process_template
+        :return: The path of the sheet where the coin was placed
+        """
+        if self.__sheet_writer is None:
+            self.__create_temp_folder()
+            self.__sheet_writer = imposition.SheetWriter(self.template_input_path,
+                                                         imposition.sheet_pattern(self.template_output_path),
+                                                         self.per_sheet)
+
+        private_qr_pathname = self.__with_serial(self.private_qr_pathname, coin_info["serial_number"])
+        public_qr_pathname = self.__with_serial(self.public_qr_pathname, coin_info["serial_number"])
+        with tracing.span("stamp.impose"):
+            sheet = self.__sheet_writer.add(self.__template_values(coin_info, private_qr_pathname, public_qr_pathname))
+
+        if not self.inline_qr:
+            self.__generate_QR_codes(*self.__qr_contents(coin_info), private_qr_pathname, public_qr_pathname)
+            self.__sheet_artifacts += [private_qr_pathname, public_qr_pathname]
+        if not self.__sheet_writer.sheet_open:
+            self.__artifacts.append([sheet] + self.__sheet_artifacts)
+            self.__sheet_artifacts = []
+
+        return sheet
+
+    def close_sheets(self):
+        """
+        Finishes the last sheet of the batch.
+        :return: The list of the sheets written, or None if no coin was imposed.
+        """
+        if self.__sheet_writer is None:
+            return None
+        if self.__sheet_writer.sheet_open:
+            self.__sheet_writer.close()
+            self.__artifacts.append([self.__sheet_writer.sheets[-1]] + self.__sheet_artifacts)
+            self.__sheet_artifacts = []
+        return self.__sheet_writer.sheets
+
+    def pop_artifacts(self):
+        """
+        Returns the files written since the last call, grouped by coin, or by sheet when several coins are
+        placed on every sheet. A group is returned once all its files are complete, e.g.: the printable of
+        a coin and its QR images.
+        :return: A list of lists of paths
+        """
+        artifacts, self.__artifacts = self.__artifacts, []
+        return artifacts
+
+    def __template_values(self, coin_info, private_qr_pathname, public_qr_pathname):
+        """
+        The value of every slot of the template for a coin, see process_template.
+        """
+        wif = self.__similar_splits(self.__encoding(coin_info, self.wif_format, "WIF"), 3)
+        address = self.__similar_splits(self.coin_address(coin_info), 3)
+        values = {
+            'serial': coin_info["serial_number"],
+            'f': '{}:{}'.format(coin_info["numerator"], coin_info["denominator"]),
+        }
+        if self.inline_qr:
+            # the QR codes go inside the printable, no image files are written
+            with tracing.span("stamp.qr", inline=True):
+                private_content, public_content = self.__qr_contents(coin_info)
+                values['private_qr'] = qr.svg_data_uri(private_content, encoder=self.qr_encoder)
+                values['public_qr'] = qr.svg_data_uri(public_content, encoder=self.qr_encoder)
+        else:
+            # point the QR images to the files of this coin
+            values['private_qr'] = os.path.basename(private_qr_pathname)
+            values['public_qr'] = os.path.basename(public_qr_pathname)
+        for i in range(0, 3):
+            values['address.000{}'.format(i + 1)] = address[i]
+            values['secret.000{}'.format(i + 1)] = wif[i]
+
+        return values
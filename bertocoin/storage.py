@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Where the files that hold the secret of the coins (printables and QR codes) are written.
+
+- DiskStorage: the delete-me folder in the current directory, as usual. Every file has to be
+               overwritten before being deleted, see bertocoin/shredder.py.
+- RamStorage: a private folder (mode 0700) in a RAM backed file system, /dev/shm by default. The
+              browser opens the printable through its path as with any other file, but nothing is
+              ever written to the disk, so destroying the coins is just unlinking the files and
+              their memory is released at once, with no overwrite passes.
+
+Keep in mind that a RAM backed file system may still be paged out to an unencrypted swap device.
+"""
+
+import os
+import tempfile
+
+from bertocoin import shredder
+
+# file systems that keep their files in memory
+RAM_FILE_SYSTEMS = ("tmpfs", "ramfs")
+
+
+class StorageError(Exception):
+    pass
+
+
+def file_system_type(path, mounts_file="/proc/self/mounts"):
+    """
+    Returns the type of the file system that holds <path>, e.g.: 'tmpfs', or None if it is unknown.
+    """
+    path = os.path.realpath(path)
+    best_mount_point, best_type = "", None
+    try:
+        with open(mounts_file, "r") as mounts:
+            for line in mounts:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                # spaces in the mount points are escaped as \040
+                mount_point, fs_type = fields[1].replace("\\040", " "), fields[2]
+                inside = path == mount_point or path.startswith(mount_point.rstrip("/") + "/")
+                if inside and len(mount_point) >= len(best_mount_point):
+                    best_mount_point, best_type = mount_point, fs_type
+    except OSError:
+        return None
+
+    return best_type
+
+
+class DiskStorage:
+    """
+    The printables are written in a folder of the current directory.
+    """
+
+    def __init__(self, folder="delete-me", shred_passes="dod"):
+        self.folder = folder
+        self.shredder = shredder.Shredder(passes=shred_passes)
+
+    def create(self):
+        """
+        Creates the folder, if it does not exist yet.
+        """
+        if not os.path.exists(self.folder):
+            os.mkdir(self.folder)
+
+    def destroy(self):
+        """
+        Securely deletes the folder and all its contents.
+        :raises shredder.ShredError: with the files that could not be deleted
+        """
+        self.shredder.shred(self.folder)
+
+
+class RamStorage(DiskStorage):
+    """
+    The printables are written in a private folder of a RAM backed file system.
+    """
+
+    def __init__(self, parent="/dev/shm"):
+        """
+        :param parent: A folder in a RAM backed file system where the private folder is created
+        :raises StorageError: if <parent> does not exist or is not in memory
+        """
+        if not os.path.isdir(parent):
+            raise StorageError(f"RAM-only output is not available: the folder {parent} does not exist.")
+        if file_system_type(parent) not in RAM_FILE_SYSTEMS:
+            raise StorageError(f"RAM-only output is not available: {parent} is not a RAM backed file system.")
+
+        # mkdtemp creates the folder with a random name, readable only by the current user
+        super().__init__(folder=tempfile.mkdtemp(prefix="bertocoin-", dir=parent), shred_passes="unlink")
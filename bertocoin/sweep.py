@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Offline sweep of redeemed coins: signed raw transactions that move the funds of a list of coins to a
+destination address, built without any network access from a local file of their unspent outputs.
+
+The file of unspent outputs is a JSON list, as the one of listunspent in Bitcoin Core, e.g.:
+
+    [{"txid": "9b1c...", "vout": 0, "address": "1Bert...", "value": 100000}, ...]
+
+with the value in satoshis, or "amount" in BTC. Outputs of addresses that are not coins of the serials
+are ignored. Only the P2PKH outputs of the coins can be spent: a file with outputs of their SegWit
+addresses (see bertocoin/addresses.py) is refused, so those coins are never reported as empty.
+
+The outputs are spent in as few transactions as possible, up to <max_inputs> inputs each, with a single
+P2PKH output to the destination and the fee of the size of the transaction. Every input signs the legacy
+signature hash (SIGHASH_ALL) of the transaction: the serialization with the script of the output it spends
+in its own input and empty scripts in the rest. Consecutive inputs share the start of that serialization,
+so the sha256 of the shared prefix is kept and copied (a cached midstate) instead of hashing it again for
+every input. The signatures are made on a pool of worker processes that hold the secret and derive the
+keys of their chunk (see bitcoin.map_chunks), with RFC 6979 nonces and a low s (see proofs.sign_digests).
+"""
+
+import hashlib
+import json
+import math
+from decimal import Decimal
+
+from bertocoin import addresses, bitcoin, manifest, proofs, secp256k1
+
+VERSION = 1
+LOCKTIME = 0
+SEQUENCE = b"\xff\xff\xff\xff"
+SIGHASH_ALL = 1
+
+# a P2PKH input with a compressed public key and the longest DER signature: outpoint, script and sequence
+INPUT_SIZE = 32 + 4 + 1 + (1 + 72 + 1 + 33) + 4
+OUTPUT_SIZE = 8 + 1 + 25
+# the smallest output relayed by the nodes
+DUST_LIMIT = 546
+# the standard transactions have at most 100 kB, around 670 inputs
+MAX_INPUTS = 600
+CHUNK_SIZE = 64
+
+# the secret of the coins, as seen from inside a worker process
+_worker_secret = None
+
+
+def p2pkh_script(hash160):
+    """
+    The locking script of a P2PKH address: OP_DUP OP_HASH160 <hash160> OP_EQUALVERIFY OP_CHECKSIG
+    """
+    return b"\x76\xa9\x14" + hash160 + b"\x88\xac"
+
+
+def load_utxos(utxo_file):
+    """
+    Reads the unspent outputs of a JSON file.
+    :param utxo_file: An open file
+    :return: A list of (txid, vout, value in satoshis, address) tuples
+    :raises ValueError: if the file is not a list of unspent outputs
+    """
+    utxos = []
+    for utxo in json.load(utxo_file, parse_float=Decimal):
+        try:
+            if "value" in utxo:
+                value = int(utxo["value"])
+            else:
+                value = int(Decimal(utxo["amount"]) * 10 ** 8)
+            txid = bytes.fromhex(utxo["txid"])
+            if len(txid) != 32 or not isinstance(utxo["vout"], int) or value <= 0:
+                raise ValueError
+            utxos.append((utxo["txid"], utxo["vout"], value, utxo["address"]))
+        except (KeyError, TypeError, ValueError, ArithmeticError):
+            raise ValueError(f"Invalid unspent output: {json.dumps(utxo, default=str)}")
+    return utxos
+
+
+def estimate_size(inputs):
+    """
+    The size in bytes of a sweep transaction with <inputs> inputs, at most.
+    """
+    return 4 + len(bitcoin.compact_size(inputs)) + inputs * INPUT_SIZE + 1 + OUTPUT_SIZE + 4
+
+
+def _outpoint(txid, vout):
+    # the transaction ids are shown in reverse byte order
+    return bytes.fromhex(txid)[::-1] + vout.to_bytes(4, "little")
+
+
+def signature_hashes(outpoints, scripts, outputs):
+    """
+    The legacy signature hashes (SIGHASH_ALL) of every input of a transaction. The serialization of input
+    <i> starts with the inputs before it, with empty scripts, so their sha256 is computed only once and
+    copied for every input.
+    :param outpoints: The serialized outpoint of every input
+    :param scripts: The locking script of the output spent by every input
+    :param outputs: The serialized outputs, with their count
+    :return: A list with the 32 bytes of the hash of every input
+    """
+    empty_inputs = [outpoint + b"\x00" + SEQUENCE for outpoint in outpoints]
+    end = outputs + LOCKTIME.to_bytes(4, "little") + SIGHASH_ALL.to_bytes(4, "little")
+    # the serialization after every input: the inputs after it, the outputs and the end
+    suffixes = [end]
+    for empty_input in reversed(empty_inputs[1:]):
+        suffixes.append(empty_input + suffixes[-1])
+    suffixes.reverse()
+
+    prefix = hashlib.sha256(VERSION.to_bytes(4, "little") + bitcoin.compact_size(len(outpoints)))
+    digests = []
+    for outpoint, script, empty_input, suffix in zip(outpoints, scripts, empty_inputs, suffixes):
+        midstate = prefix.copy()
+        midstate.update(outpoint + bitcoin.compact_size(len(script)) + script + SEQUENCE + suffix)
+        digests.append(hashlib.sha256(midstate.digest()).digest())
+        prefix.update(empty_input)
+    return digests
+
+
+def _push(data):
+    return bytes([len(data)]) + data
+
+
+def _der_integer(value):
+    # the shortest big endian encoding, with a leading zero byte when the top bit is set (it is not negative)
+    encoded = value.to_bytes(value.bit_length() // 8 + 1, "big")
+    return b"\x02" + _push(encoded)
+
+
+def der_signature(r, s):
+    """
+    The DER encoding of a signature, as the one of ecdsa.util.sigencode_der
+    """
+    return b"\x30" + _push(_der_integer(r) + _der_integer(s))
+
+
+def _init_sign_worker(secret):
+    global _worker_secret
+    _worker_secret = secret
+
+
+def sign_chunk(inputs):
+    """
+    Runs inside a worker process of sweep. Derives the key of every input and signs its signature hash.
+    :param inputs: A list of (serial number, signature hash) tuples
+    :return: A list with the unlocking script of every input: the DER signature and the compressed public key
+    """
+    private_keys = bitcoin.Bitcoin(_worker_secret, None, "table").private_keys_many([serial for serial, _ in inputs])
+    points = secp256k1.batch_to_affine([secp256k1.multiply_generator(int.from_bytes(private_key, "big"))
+                                        for private_key in private_keys])
+    signatures = proofs.sign_digests(private_keys, [digest for _, digest in inputs])
+    scripts = []
+    for (x, y), (r, s, _) in zip(points, signatures):
+        public_key = (b"\x03" if y & 1 else b"\x02") + x.to_bytes(32, "big")
+        scripts.append(_push(der_signature(r, s) + bytes([SIGHASH_ALL])) + _push(public_key))
+    return scripts
+
+
+def sweep(secret, serial_numbers, utxos, destination, fee_rate, max_inputs=MAX_INPUTS, workers=1,
+          chunk_size=CHUNK_SIZE, ec_backend="table"):
+    """
+    Builds the transactions that spend all the outputs of the coins of <serial_numbers>.
+    :param utxos: A list of (txid, vout, value in satoshis, address) tuples, e.g.: load_utxos
+    :param destination: The P2PKH address that receives the funds
+    :param fee_rate: The fee, in satoshis per byte
+    :return: A tuple (list of transactions, serial numbers without outputs). Every transaction is a
+             dictionary with its 'hex', 'inputs', 'serials', 'value' sent and 'fee'.
+    :raises ValueError: if the destination is not valid, a transaction would send less than the dust limit, or
+                        there are outputs of the SegWit addresses of the coins
+    """
+    output_script = p2pkh_script(manifest.address_hash160(destination))
+    max_inputs = max(1, max_inputs)
+
+    # only the addresses of the coins are derived, their keys are derived again by the workers that sign
+    coins = {}
+    segwit = {}
+    for serial_number, encodings in bitcoin.derive_coin_formats(secret, list(serial_numbers), addresses.ADDRESS_FORMATS,
+                                                                workers=workers, ec_backend=ec_backend):
+        coins[encodings["p2pkh"]] = serial_number
+        segwit.update({encodings[encoding]: serial_number for encoding in ("p2wpkh", "p2sh-p2wpkh")})
+    # bech32 addresses may be written in upper case
+    unsupported = sorted({segwit[address] for address in
+                          {address.lower() if address[:3].lower() == "bc1" else address for _, _, _, address in utxos}
+                          if address in segwit})
+    if unsupported:
+        raise ValueError(f"The coins {', '.join(unsupported)} have outputs in SegWit addresses, which can not be "
+                         f"swept yet: only P2PKH outputs are signed")
+    # every output is spent once, even if it is repeated in the file
+    spent = list({(txid.lower(), vout): (txid, vout, value, address) for txid, vout, value, address in utxos
+                  if address in coins}.values())
+    funded = {coins[address] for _, _, _, address in spent}
+    empty = [serial_number for serial_number in coins.values() if serial_number not in funded]
+
+    # the signature hashes of all the transactions are computed first, so all the inputs are signed by one pool
+    transactions = []
+    to_sign = []
+    for start in range(0, len(spent), max_inputs):
+        batch = spent[start:start + max_inputs]
+        total = sum(value for _, _, value, _ in batch)
+        fee = math.ceil(fee_rate * estimate_size(len(batch)))
+        if total - fee < DUST_LIMIT:
+            raise ValueError(f"The {len(batch)} outputs of a transaction hold {total} satoshis, which do not "
+                             f"pay a fee of {fee} satoshis")
+
+        outpoints = [_outpoint(txid, vout) for txid, vout, _, _ in batch]
+        outputs = b"\x01" + (total - fee).to_bytes(8, "little") + _push(output_script)
+        digests = signature_hashes(outpoints, [p2pkh_script(manifest.address_hash160(address))
+                                               for _, _, _, address in batch], outputs)
+        to_sign += [(coins[address], digest) for (_, _, _, address), digest in zip(batch, digests)]
+        transactions.append({"inputs": len(batch), "value": total - fee, "fee": fee,
+                             "serials": sorted({coins[address] for _, _, _, address in batch}),
+                             "outpoints": outpoints, "outputs": outputs})
+
+    signed = bitcoin.map_chunks(sign_chunk, bitcoin.chunked(to_sign, chunk_size), workers=workers,
+                                initializer=_init_sign_worker, initargs=(secret,))
+    unlocking_scripts = iter([script for _, scripts in signed for script in scripts])
+
+    for transaction in transactions:
+        outpoints = transaction.pop("outpoints")
+        raw = (VERSION.to_bytes(4, "little") + bitcoin.compact_size(len(outpoints)) +
+               b"".join(outpoint + _push(next(unlocking_scripts)) + SEQUENCE for outpoint in outpoints) +
+               transaction.pop("outputs") + LOCKTIME.to_bytes(4, "little"))
+        transaction["hex"] = raw.hex()
+
+    return transactions, empty
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Compiled printable templates.
+
+The .svg template is parsed once into a list of static byte segments and slots. Rendering a
+coin just fills the slots and joins the chunks, without scanning the template again, and the
+compiled template is cached so that every coin of a batch reuses it.
+
+Slots are written in the template as ::name::, e.g.: ::serial::. The images of the QR codes are
+also slots: the template points them to the literal file names COIN_PRIVATE_QR.png and
+COIN_PUBLIC_QR.png, which are replaced with the real location of the images of every coin.
+"""
+
+import os
+import re
+
+# name of the slot -> text that marks it in the template
+SLOTS = {
+    "serial": "::serial::",
+    "f": "::f::",
+    "address.0001": "::address.0001::",
+    "address.0002": "::address.0002::",
+    "address.0003": "::address.0003::",
+    "secret.0001": "::secret.0001::",
+    "secret.0002": "::secret.0002::",
+    "secret.0003": "::secret.0003::",
+    "private_qr": "COIN_PRIVATE_QR.png",
+    "public_qr": "COIN_PUBLIC_QR.png",
+}
+
+_MARKER_NAMES = {marker: name for name, marker in SLOTS.items()}
+# any ::name:: (known or not) and the literal names of the QR images
+_PLACEHOLDER = re.compile("|".join([r"::[^:\s<>\"]*::"] + [re.escape(marker) for marker in _MARKER_NAMES
+                                                           if not marker.startswith("::")]))
+
+_cache = {}
+
+
+class TemplateError(Exception):
+    pass
+
+
+class CompiledTemplate:
+    """
+    A template split into static byte segments and slots, ready to be rendered many times.
+    """
+
+    def __init__(self, text, source="<template>", strict=True):
+        """
+        :param text: The content of the template
+        :param source: Where the template comes from, used in the error messages
+        :param strict: When False, the template may lack some of the slots, e.g.: a fragment of a template
+        """
+        self.source = source
+        self.chunks = []
+        # position inside self.chunks of every slot, e.g.: {'serial': [1, 5], 'f': [3], ...}
+        self.slots = {}
+
+        unknown = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(text):
+            name = _MARKER_NAMES.get(match.group(0))
+            if name is None:
+                unknown.append(match.group(0))
+                continue
+            self.chunks.append(text[position:match.start()].encode("utf-8"))
+            self.slots.setdefault(name, []).append(len(self.chunks))
+            self.chunks.append(b"")
+            position = match.end()
+        self.chunks.append(text[position:].encode("utf-8"))
+
+        missing = [SLOTS[name] for name in SLOTS if name not in self.slots] if strict else []
+        if unknown or missing:
+            errors = []
+            if unknown:
+                errors.append(f"unknown placeholders {', '.join(sorted(set(unknown)))}")
+            if missing:
+                errors.append(f"missing placeholders {', '.join(missing)}")
+            raise TemplateError(f"Invalid template {source}: {'; '.join(errors)}.")
+
+    def render(self, values):
+        """
+        Fills the slots of the template.
+        :param values: A dictionary with the value of every slot, e.g.: {'serial': '0021', 'f': '1:1000', ...}
+        :return: The rendered template, as utf-8 bytes
+        """
+        chunks = self.chunks.copy()
+        for name, positions in self.slots.items():
+            value = values[name].encode("utf-8")
+            for position in positions:
+                chunks[position] = value
+
+        return b"".join(chunks)
+
+
+def has_slots(text):
+    """
+    Tells whether <text>, e.g.: an element of a template, holds any slot.
+    """
+    return any(match.group(0) in _MARKER_NAMES for match in _PLACEHOLDER.finditer(text))
+
+
+# any tag: group 1 is "/" for closing tags, group 2 is "/" for self closing ones
+_TAG = re.compile(r"<(/?)[A-Za-z][^>]*?(/?)>")
+_COMMENT = re.compile(r"<!--.*?-->|<!DOCTYPE[^>]*>|<\?.*?\?>", re.DOTALL)
+
+
+def split_elements(text):
+    """
+    Splits an SVG document into its top level elements.
+    :param text: The SVG document
+    :return: A tuple (prologue, elements, epilogue) where the prologue runs up to the end of the opening
+             <svg> tag, elements is the list of the children of the root element (each one with the blank
+             space that precedes it) and the epilogue is the rest of the document, from the end of the last element.
+    """
+    # comments and declarations may hold anything, they are blanked out before looking for tags
+    masked = _COMMENT.sub(lambda match: " " * len(match.group(0)), text)
+
+    tags = _TAG.finditer(masked)
+    root = next(tags, None)
+    if root is None:
+        raise TemplateError("The template is not an SVG document.")
+
+    elements = []
+    depth = 0
+    start = root.end()
+    for tag in tags:
+        closing, self_closing = tag.group(1), tag.group(2)
+        if closing:
+            depth -= 1
+            if depth < 0:
+                return text[:root.end()], elements, text[start:]
+        elif not self_closing:
+            depth += 1
+
+        if depth == 0:
+            elements.append(text[start:tag.end()])
+            start = tag.end()
+
+    raise TemplateError("The root element of the template is never closed.")
+
+
+def load_template(path):
+    """
+    Returns the compiled template stored in <path>. Templates are compiled only once per process,
+    unless the file changes.
+    :param path: The path to the .svg template
+    :return: A CompiledTemplate
+    """
+    key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+    if key not in _cache:
+        with open(path, "r", encoding="utf-8") as template_file:
+            _cache[key] = CompiledTemplate(template_file.read(), source=path)
+
+    return _cache[key]
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+The last steps of a run: the instructions, the countdown and the destruction of the generated files.
+"""
+
+import asyncio
+import os
+import signal
+import sys
+
+from bertocoin import shredder, tracing
+from bertocoin import storage as storage_backends
+
+
+class CoinTerminator:
+    """
+    The CoinTerminator gathers all the necessary steps needed to finish the execution
+    once the printable resource has been generated. There are 3 main steps left to do
+    before closing which are:
+      - Showing the instructions on how to print the file.
+      - Waiting some seconds to let the user some room set up the print.
+      - Delete all generated files (printable and QRs)
+    self.countdown_and_destroy (and self.run, outside an event loop) executes the 3 of them as
+    asyncio tasks: the countdown does not wait for the instructions to be typed, and the files are
+    destroyed early, by self.destroy_temp_folder, if the user presses Enter or the process is interrupted.
+    """
+
+    def __init__(self, printable_filepath, shred_passes="dod", storage=None, animation=True):
+        self.dying_folder = os.path.dirname(printable_filepath)
+        self.printable_file = os.path.basename(printable_filepath)
+        self.entropy_file = "entropy.txt"
+        self.shredder = shredder.Shredder(passes=shred_passes)
+        # the storage of the generated files, it knows how to destroy them
+        self.storage = storage or storage_backends.DiskStorage(self.dying_folder, shred_passes=shred_passes)
+        # False to print the instructions at once, without simulating manual typing
+        self.animation = animation
+        # set to destroy the files before the countdown finishes, see watch_early_destruction
+        self.__destroy_now = None
+
+    def __progress_bar(self, iteration, total, prefix='', suffix='', decimals=1, bar_length=100):
+        """
+        This method is ment to be called inside a loop to create the efect of a progress bar.
+        :params:
+        :param iteration: current iteration (Int))
+        :param total: total iterations (Int)
+        :param prefix: prefix string (Str)
+        :param suffix: suffix string (Str)
+        :param decimals: positive number of decimals in percent complete (Int)
+        :param bar_length: character length of bar (Int)
+        """
+        str_format = "{0:." + str(decimals) + "f}"
+        percents = str_format.format(100 * (iteration / float(total)))
+        filled_length = int(round(bar_length * iteration / float(total)))
+        bar = '█' * filled_length + '-' * (bar_length - filled_length)
+
+        sys.stdout.write('\r%s |%s| %s%s %s' % (prefix, bar, percents, '%', suffix)),
+
+        if iteration == total:
+            sys.stdout.write('\n')
+        sys.stdout.flush()
+
+    async def __delayed_type(self, type_me, delay=0.1, newline=True):
+        """
+        Send characters to console, one by one, simulating manual typing.
+        Without animation the text is printed at once.
+        :param type_me: Text to send
+        :param delay: Delay between keystrokes (float)
+        :param newline: whether or not finish with a new line
+        :return: <it outputs via stdout>
+        """
+
+        if not self.animation:
+            sys.stdout.write(type_me + ('\n' if newline else ''))
+            sys.stdout.flush()
+            return
+
+        type_me = type_me + " "
+        for i in range(len(type_me)):
+            partial = type_me[0:i]
+
+            sys.stdout.write('\r{}'.format(partial)),
+            sys.stdout.flush()
+            await asyncio.sleep(delay)
+
+        if newline:
+            sys.stdout.write('\n')
+        sys.stdout.flush()
+
+    def __secure_delete(self, path=None):
+        """
+        Removes files and directories in a secure manner: every file is overwritten before being
+        deleted, see bertocoin/shredder.py
+        :param path: the path to the file or directory that will be removed, with all its contents.
+                     None to destroy the generated files in the way their storage requires.
+        :return: A list of (path, error) tuples with the files that could not be removed
+        """
+
+        try:
+            if path is None:
+                self.storage.destroy()
+            else:
+                self.shredder.shred(path)
+        except shredder.ShredError as error:
+            return error.failures
+        return []
+
+    @staticmethod
+    def __report_failures(failures, what):
+        END_COLOR = '\033[0m'
+        RED = '\033[31m'
+
+        for path, error in failures:
+            print(error)
+            print(RED + "WARNING !!!" + END_COLOR)
+            print(f"  Unable to secure delete {what}: {path}.")
+            print("  Please remove it MANUALLY in a safe way, otherwise "
+                  "the security of the coin will be compromised.")
+            print()
+
+    def watch_early_destruction(self):
+        """
+        Destroys the files right away, without waiting for the countdown, when the user presses Enter
+        or the process receives SIGINT (Ctrl+C) or SIGTERM. It must be called inside a running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        self.__destroy_now = asyncio.Event()
+
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signal_number, self.__destroy_now.set)
+            except (NotImplementedError, RuntimeError):
+                # not available on Windows, nor outside the main thread
+                pass
+
+        if sys.stdin is not None and sys.stdin.isatty():
+            try:
+                loop.add_reader(sys.stdin.fileno(), self.__on_keypress)
+            except (NotImplementedError, OSError, ValueError):
+                pass
+
+    @property
+    def destruction_requested(self):
+        return self.__destroy_now is not None and self.__destroy_now.is_set()
+
+    async def wait_for_destruction_request(self):
+        """
+        Waits until early destruction is requested, e.g.: by a daemon that runs until it is stopped.
+        watch_early_destruction must have been called before.
+        """
+        await self.__destroy_now.wait()
+
+    def __on_keypress(self):
+        sys.stdin.readline()
+        self.__destroy_now.set()
+
+    async def __sleep(self, seconds):
+        """
+        Waits <seconds>, or less if early destruction is requested.
+        :return: True if early destruction was requested
+        """
+        try:
+            await asyncio.wait_for(self.__destroy_now.wait(), max(0, seconds))
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def __show_instructions(self, timeout):
+        """
+        Renders the instructions indicating how to print the coin as well as how to delete the
+        created resources to maintain the coin secure.
+        """
+        BLUE = '\033[94m'
+        END_COLOR = '\033[0m'
+        RED = '\033[31m'
+
+        await self.__delayed_type("INSTRUCTIONS")
+        await self.__delayed_type("------------")
+        print()
+        await self.__delayed_type("1.- Navigate to this folder: ")
+        await self.__delayed_type("    {}{}{} ".format(BLUE, os.path.abspath(self.dying_folder), END_COLOR),
+                                  delay=0.005)
+        print()
+        await self.__delayed_type("2.- Use your browser (Safari, Chrome...) to open this file: ")
+        await self.__delayed_type("    {}{}{} ".format(BLUE, self.printable_file, END_COLOR), delay=0.005)
+        print()
+        await self.__delayed_type("3.- Print it on good-quality paper.")
+        print()
+        await self.__delayed_type("4.- Follow the instructions provided in the template you just printed.")
+        print()
+        print()
+
+        await self.__delayed_type(RED + "WARNING:" + END_COLOR)
+        await self.__delayed_type("--------")
+        await self.__delayed_type('You only have {} seconds to print the template.'.format(timeout))
+        await self.__delayed_type('After that, all the files in the folder:')
+
+        await self.__delayed_type("    {}{}{} ".format(BLUE, os.path.abspath(self.dying_folder), END_COLOR),
+                                  delay=0.005)
+
+        await self.__delayed_type("will be deleted, to protect the security of your coin.\n")
+        await self.__delayed_type("If the self-destroy process does not finish properly, "
+                                  "please delete the contents of that folder manually.")
+        await self.__delayed_type("Press Enter (or Ctrl+C) to delete them right away.")
+        print()
+
+    async def __countdown(self, deadline, instructions=None):
+        """
+        Shows a progress bar with the time left until <deadline> (in event loop time), once the
+        <instructions> task is done. The deadline is not delayed by the instructions.
+        :return: True if early destruction was requested
+        """
+        loop = asyncio.get_running_loop()
+        total = max(1, round(deadline - loop.time()))
+
+        if instructions is not None:
+            early = asyncio.ensure_future(self.__destroy_now.wait())
+            await asyncio.wait([instructions, early], return_when=asyncio.FIRST_COMPLETED)
+            early.cancel()
+            if self.__destroy_now.is_set():
+                instructions.cancel()
+                print()
+                print("Early destruction requested.")
+                return True
+
+        while True:
+            left = deadline - loop.time()
+            self.__progress_bar(min(total, total - max(0, round(left))),
+                                total,
+                                prefix='Self destroy timer:',
+                                suffix='({} seconds left.)'.format(max(0, round(left))),
+                                bar_length=50)
+            if left <= 0:
+                return False
+            if await self.__sleep(min(1, left)):
+                print()
+                print("Early destruction requested.")
+                return True
+
+    async def expire(self, paths, timeout):
+        """
+        Destroys the files in <paths> after <timeout> seconds, or as soon as early destruction is requested,
+        without blocking the event loop. Used in batch mode to destroy the files of every coin on their own
+        deadline while the rest of the batch is minted.
+        :param paths: The files to destroy, e.g.: the printable of a coin and its QR images
+        :param timeout: Seconds the files are kept
+        """
+        await self.__sleep(timeout)
+
+        failures = await asyncio.get_running_loop().run_in_executor(None, self.__destroy_files, paths)
+        self.__report_failures(failures, "coin file")
+
+    def __destroy_files(self, paths):
+        failures = []
+        for path in paths:
+            try:
+                self.storage.shredder.shred(path)
+            except shredder.ShredError as error:
+                failures += error.failures
+        return failures
+
+    async def countdown_and_destroy(self, timeout, pending=(), show_instructions=True):
+        """
+        Shows the instructions, counts down <timeout> seconds and destroys all the generated files.
+        The instructions, the countdown and the destruction run as tasks: the countdown starts at
+        once, the instructions are rendered meanwhile, and the files are destroyed when the time is
+        up or as soon as the user asks for it (see watch_early_destruction).
+        :param timeout: The number of seconds the user has to print the file
+        :param pending: Tasks of self.expire that must be finished before the folder is destroyed
+        :param show_instructions: False when they have already been shown
+        """
+        if self.__destroy_now is None:
+            self.watch_early_destruction()
+        deadline = asyncio.get_running_loop().time() + timeout
+
+        instructions = asyncio.ensure_future(self.__show_instructions(timeout)) if show_instructions else None
+        with tracing.span("terminator.countdown", timeout=timeout):
+            await self.__countdown(deadline, instructions)
+
+            # without early destruction, pending tasks only wait for the deadlines of their own files
+            await asyncio.gather(*pending)
+        with tracing.span("terminator.destroy"):
+            await asyncio.get_running_loop().run_in_executor(None, self.destroy_temp_folder)
+
+    async def show_instructions_async(self, timeout):
+        """
+        Renders the instructions only, e.g.: at the beginning of a batch with a deadline per coin.
+        """
+        await self.__show_instructions(timeout)
+
+    def run(self, timeout):
+        """
+        Shows the instructions, waits <timeout> seconds (less if the user asks for it) and destroys
+        all the generated files. See countdown_and_destroy.
+        """
+        asyncio.run(self.countdown_and_destroy(timeout))
+
+    def destroy_temp_folder(self):
+        """
+        Utility method. It deletes the temp folder that was used to generate the printable template
+        file as well as the entropy.txt input if it was used.
+        Every file that can not be deleted is reported, and the rest are deleted anyway.
+        :return: Nothing.
+        """
+
+        print()
+        print("Destroying temporary folder...")
+        if os.path.exists(self.dying_folder):
+            failures = self.__secure_delete()
+            if failures:
+                self.__report_failures(failures, "coin file")
+            else:
+                print("Done")
+                print()
+
+        # if the secret was input via file, delete also this file
+        if os.path.isfile(self.entropy_file):
+            print(f"Destroying {self.entropy_file}...")
+            failures = self.__secure_delete(self.entropy_file)
+            if failures:
+                self.__report_failures(failures, "entropy file")
+            else:
+                print("Done")
+                print()
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Built-in instrumentation: span timers around the steps of the minting pipeline.
+
+    with tracing.span("qr.png", coins=1):
+        ...
+
+While tracing is off (the default) span() returns a shared no-op context manager, so an
+instrumented step only pays for a function call and a global lookup. Once started, every span
+records its name, its start and end (time.perf_counter_ns, monotonic), the thread and the
+attributes given. Optionally the whole run is also profiled with cProfile and the memory
+allocations are traced with tracemalloc.
+
+Traces are written as JSON (the spans plus a summary per span name) or in the Chrome trace event
+format, which can be opened with chrome://tracing or https://ui.perfetto.dev.
+
+A trace must never hold any secret: span names are fixed strings chosen in the code, and attributes
+can only be numbers or booleans (e.g.: how many coins a step processed), so neither passphrases,
+keys, WIFs nor addresses can end up in a trace file. cProfile and tracemalloc only record functions,
+files and line numbers.
+"""
+
+import os
+import threading
+import time
+
+_enabled = False
+_spans = []
+_origin = 0
+_profiler = None
+_memory = False
+
+FORMATS = ("json", "chrome")
+
+
+class _NoSpan:
+    """
+    The span returned while tracing is off, it does nothing at all.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    __slots__ = ("name", "attributes", "start")
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        _spans.append((self.name, self.start, time.perf_counter_ns(), threading.get_ident(), self.attributes))
+
+
+def span(name, **attributes):
+    """
+    Times the block of a with statement.
+    :param name: A fixed name for the step, e.g.: 'derive.ec'
+    :param attributes: Numbers or booleans that describe the step, e.g.: coins=100
+    :raises TypeError: if an attribute is not a number or a boolean, since it could hold a secret
+    """
+    if not _enabled:
+        return _NO_SPAN
+
+    for key, value in attributes.items():
+        if not isinstance(value, (int, float, bool)):
+            raise TypeError(f"The attribute '{key}' of the span '{name}' must be a number or a boolean.")
+    return _Span(name, attributes)
+
+
+def enabled():
+    return _enabled
+
+
+def start(profile=False, memory=False):
+    """
+    Starts recording spans.
+    :param profile: Also profile every function call with cProfile
+    :param memory: Also trace the memory allocations with tracemalloc
+    """
+    global _enabled, _origin, _profiler, _memory
+
+    _spans.clear()
+    _origin = time.perf_counter_ns()
+    _enabled = True
+
+    if memory:
+        import tracemalloc
+        tracemalloc.start()
+        _memory = True
+
+    if profile:
+        import cProfile
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+
+def stop():
+    """
+    Stops recording, and returns the spans recorded.
+    """
+    global _enabled
+
+    _enabled = False
+    if _profiler is not None:
+        _profiler.disable()
+    return list(_spans)
+
+
+def summary(spans):
+    """
+    Aggregates the spans by name.
+    :return: A dictionary name -> {'count', 'total_ms', 'mean_us', 'max_us'}
+    """
+    totals = {}
+    for name, start_ns, end_ns, _, _ in spans:
+        count, total, longest = totals.get(name, (0, 0, 0))
+        totals[name] = (count + 1, total + end_ns - start_ns, max(longest, end_ns - start_ns))
+
+    return {name: {"count": count, "total_ms": total / 1e6, "mean_us": total / count / 1e3, "max_us": longest / 1e3}
+            for name, (count, total, longest) in totals.items()}
+
+
+def _memory_report(top=20):
+    import tracemalloc
+
+    snapshot = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "current_bytes": current,
+        "peak_bytes": peak,
+        "top": [{"location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                 "bytes": stat.size, "blocks": stat.count}
+                for stat in snapshot.statistics("lineno")[:top]],
+    }
+
+
+def write(pathname, output_format="json"):
+    """
+    Stops tracing and writes the trace to <pathname>. With cProfile, the profile is also written
+    to <pathname>.pstats, to be read with the pstats module or tools like snakeviz.
+    :param output_format: 'json' for the spans and their summary, 'chrome' for the Chrome trace event format
+    """
+    global _profiler, _memory
+    import json
+
+    if output_format not in FORMATS:
+        raise ValueError(f"Unknown trace format '{output_format}', valid values: {', '.join(FORMATS)}")
+
+    spans = stop()
+    pid = os.getpid()
+
+    if output_format == "chrome":
+        trace = {"traceEvents": [{"name": name, "ph": "X", "ts": (start_ns - _origin) / 1e3,
+                                  "dur": (end_ns - start_ns) / 1e3, "pid": pid, "tid": thread, "args": attributes}
+                                 for name, start_ns, end_ns, thread, attributes in spans],
+                 "displayTimeUnit": "ms"}
+    else:
+        trace = {"summary": summary(spans),
+                 "spans": [{"name": name, "start_us": (start_ns - _origin) / 1e3,
+                            "duration_us": (end_ns - start_ns) / 1e3, "thread": thread, "attributes": attributes}
+                           for name, start_ns, end_ns, thread, attributes in spans]}
+
+    if _memory:
+        trace["memory" if output_format == "json" else "metadata"] = _memory_report()
+        _memory = False
+
+    with open(pathname, "w") as trace_file:
+        json.dump(trace, trace_file, indent=1)
+
+    if _profiler is not None:
+        _profiler.dump_stats(pathname + ".pstats")
+        _profiler = None
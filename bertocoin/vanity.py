@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Vanity search: private keys whose address starts with a chosen prefix, e.g.: for showcase coins minted
+in debug mode (--debug --passphrase=<private key in hex>).
+
+Every task starts from a random private key k and walks k, k+1, k+2... Instead of a full scalar
+multiplication per key, the next public key is the current one plus G, a single point addition in
+Jacobian coordinates, and the points of a batch are converted to affine coordinates sharing one
+modular inversion (see secp256k1.batch_to_affine).
+
+Candidates are never encoded in Base58: the prefix is translated once into ranges of hash160 values
+(prefix_ranges), and only the hash160 of every compressed public key is compared with them. The
+candidates in range are encoded to confirm the match, since the ranges include the 4 bytes of the
+checksum at their ends. Tasks run on a pool of processes, see bitcoin.map_chunks.
+"""
+
+import itertools
+import secrets
+import time
+
+from bertocoin import base58, bitcoin, hashes, secp256k1
+
+# keys checked by every task of the pool, and keys per modular inversion
+TASK_KEYS = 1 << 12
+BATCH_SIZE = 1024
+
+_HASH160_BITS = 160
+_CHECKSUM_BITS = 8 * base58.CHECKSUM_SIZE
+# a P2PKH address is the Base58 encoding of 25 bytes: version (0x00), hash160 and checksum
+_PAYLOAD_SIZE = 1 + 20 + base58.CHECKSUM_SIZE
+
+
+def address(hash160):
+    """
+    The P2PKH address of a hash160.
+    """
+    return base58.b58check_encode(b"\x00" + hash160)
+
+
+def prefix_ranges(prefix):
+    """
+    Translates an address prefix into the ranges of hash160 values whose address may start with it.
+    A Base58 string starts with a '1' for every leading zero byte of its payload, and the rest of the digits
+    encode the payload as an integer, so the payloads whose address starts with <prefix> are a few
+    intervals, one for every number of digits the address can have.
+    :param prefix: The start of a P2PKH address, e.g.: '1Bert'
+    :return: A list of (low, high) tuples, both included, of hash160 values as integers
+    :raises ValueError: if no address can start with <prefix>
+    """
+    if not prefix.startswith("1"):
+        raise ValueError("P2PKH addresses start with '1'")
+    # raises ValueError on characters outside the Base58 alphabet
+    base58.b58decode(prefix)
+
+    rest = prefix.lstrip("1")
+    zero_bytes = len(prefix) - len(rest)
+    # the payload has exactly <zero_bytes> leading zero bytes if the prefix goes on, at least that many if not
+    high = 256 ** (_PAYLOAD_SIZE - zero_bytes) - 1
+    low = 256 ** (_PAYLOAD_SIZE - zero_bytes - 1) if rest else 0
+    if high < 0 or zero_bytes > 1 + 20:
+        raise ValueError(f"No address can start with '{prefix}'")
+
+    intervals = []
+    if not rest:
+        intervals.append((low, high))
+    else:
+        value = int.from_bytes(base58.b58decode(rest), "big")
+        digits = 0
+        while value * base58.BASE ** digits <= high:
+            start = value * base58.BASE ** digits
+            end = (value + 1) * base58.BASE ** digits - 1
+            if end >= low:
+                intervals.append((max(start, low), min(end, high)))
+            digits += 1
+
+    ranges = [(start >> _CHECKSUM_BITS, end >> _CHECKSUM_BITS) for start, end in intervals]
+    if not ranges:
+        raise ValueError(f"No address can start with '{prefix}'")
+    return ranges
+
+
+def probability(ranges):
+    """
+    The probability that a random key matches the ranges.
+    """
+    return sum(high - low + 1 for low, high in ranges) / 2 ** _HASH160_BITS
+
+
+def search_keys(start, count, ranges, prefix, batch_size=BATCH_SIZE):
+    """
+    Checks the private keys start, start + 1, ..., start + count - 1.
+    :return: A list of (private key, address) tuples with the keys whose address starts with <prefix>
+    """
+    G = secp256k1.G
+    add = secp256k1.jacobian_add_affine
+    hash160 = hashes.hash160
+    from_bytes = int.from_bytes
+    matches = []
+
+    point = secp256k1.multiply_generator(start)
+    for batch_start in range(start, start + count, batch_size):
+        size = min(batch_size, start + count - batch_start)
+        points = [point]
+        for _ in range(size - 1):
+            points.append(add(points[-1], G))
+        point = add(points[-1], G)
+
+        for offset, (x, y) in enumerate(secp256k1.batch_to_affine(points)):
+            digest = hash160((b"\x03" if y & 1 else b"\x02") + x.to_bytes(32, "big"))
+            value = from_bytes(digest, "big")
+            for low, high in ranges:
+                if low <= value <= high:
+                    candidate = address(digest)
+                    if candidate.startswith(prefix):
+                        matches.append(((batch_start + offset) % secp256k1.N, candidate))
+                    break
+
+    return matches
+
+
+def _search_task(task):
+    """
+    Runs inside a worker process: checks <count> keys from a random private key.
+    :param task: A tuple (prefix, ranges, count, batch_size)
+    :return: The list of (private key, address) tuples that match
+    """
+    prefix, ranges, count, batch_size = task
+    # the walk must not reach the order of the curve
+    start = 1 + secrets.randbelow(secp256k1.N - count - 1)
+    return search_keys(start, count, ranges, prefix, batch_size)
+
+
+def search(prefix, matches=1, workers=1, task_keys=TASK_KEYS, batch_size=BATCH_SIZE, max_keys=None):
+    """
+    Searches private keys whose address starts with <prefix>.
+    :param matches: How many keys to find
+    :param max_keys: Give up after checking this many keys, None to search until they are found
+    :return: A generator of ('progress', keys checked, seconds) tuples after every task, followed by a
+             ('match', private key, address) tuple for every key of the task that matches
+    """
+    ranges = prefix_ranges(prefix)
+    # the public keys of the search are derived from the table of G, built once per worker
+    tasks = itertools.repeat((prefix, ranges, task_keys, batch_size))
+    if max_keys is not None:
+        tasks = itertools.islice(tasks, max(1, -(-max_keys // task_keys)))
+
+    start = time.perf_counter()
+    found = 0
+    checked = 0
+    results = bitcoin.map_chunks(_search_task, tasks, workers=workers)
+    try:
+        for _, task_matches in results:
+            checked += task_keys
+            yield "progress", checked, time.perf_counter() - start
+            for private_key, match in task_matches:
+                yield "match", private_key, match
+                found += 1
+                if found >= matches:
+                    return
+    finally:
+        results.close()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Audit of minted coins, without minting them again:
+
+- verify_manifest: re-derives the address of every coin of a manifest (see bertocoin/manifest.py) from
+                   the secret and its serial number, in the format of the manifest, and checks it against
+                   the one in the manifest.
+- verify_wifs    : decodes a stream of WIFs, verifying their Base58Check checksum, derives the address
+                   of every private key and checks it against the address given with it, if any, in the
+                   format of that address.
+
+Both read their input lazily and derive the keys in chunks on a pool of worker processes (see
+bitcoin.map_chunks), so the memory used does not grow with the size of the input. The results never
+hold a WIF or a private key: WIFs are referred to by their line number.
+"""
+
+from bertocoin import addresses, bitcoin, manifest
+
+CHUNK_SIZE = 256
+
+# the point multiplication backend, as seen from inside a worker process
+_worker_ec_backend = "table"
+
+
+def verify_manifest(secret, coins, workers=1, chunk_size=CHUNK_SIZE, ec_backend="table"):
+    """
+    Re-derives the coins of a manifest.
+    :param secret: The secret seed the coins were minted with
+    :param coins: An iterable of dictionaries with 'serial_number', 'address' and optionally 'address_format'
+                  (p2pkh by default), e.g.: manifest.read_manifest
+    :return: A generator of (serial number, address in the manifest, derived address) tuples, one per coin.
+             The derived address is in the format of the manifest, or P2PKH if the format is unknown.
+    """
+    # the serial numbers are derived ahead of the comparison by at most the chunks in flight in the pool
+    pending = {}
+
+    def serial_numbers():
+        for index, coin in enumerate(coins):
+            pending[index] = (coin["address"], coin.get("address_format") or manifest.DEFAULT_ADDRESS_FORMAT)
+            yield str(coin["serial_number"]).zfill(4)
+
+    derived = bitcoin.derive_coins(secret, serial_numbers(), workers=workers, chunk_size=chunk_size,
+                                   ec_backend=ec_backend)
+    for index, (serial_number, _, address) in enumerate(derived):
+        expected, address_format = pending.pop(index)
+        if address_format != "p2pkh" and address_format in addresses.ADDRESS_FORMATS:
+            # every address format is the same hash160 of the public key in another envelope
+            address = addresses.encode_hash160(manifest.address_hash160(address), (address_format,))[address_format]
+        yield serial_number, expected, address
+
+
+def _init_wif_worker(ec_backend):
+    global _worker_ec_backend
+    _worker_ec_backend = ec_backend
+
+
+def _verify_wif_chunk(lines):
+    """
+    Runs inside a worker process.
+    :param lines: A list of (line number, line) tuples, every line holds a WIF and optionally an address
+    :return: A list of (line number, expected address or None, derived address or None, error or None)
+    """
+    results = []
+    private_keys = []
+    for line_number, line in lines:
+        fields = line.split()
+        expected = fields[1] if len(fields) > 1 else None
+        try:
+            private_keys.append(bitcoin.Bitcoin.decode_wif(fields[0]))
+        except (IndexError, ValueError):
+            # the message of the error may quote the WIF, so it is not reported
+            results.append((line_number, expected, None, "not a valid WIF (characters, checksum, version or key)"))
+            continue
+        results.append((line_number, expected, _address_format(expected), None))
+
+    # only the formats of the expected addresses are encoded
+    formats = {address_format for _, _, address_format, error in results if error is None}
+    coins = iter(bitcoin.Bitcoin(None, None, _worker_ec_backend).encode_formats_many(private_keys, formats))
+    return [(line_number, expected, next(coins)[address_format] if error is None else None, error)
+            for line_number, expected, address_format, error in results]
+
+
+def _address_format(address):
+    """
+    The format of an address (see bertocoin/addresses.py), P2PKH if there is none or it is not valid.
+    """
+    try:
+        kind = addresses.decode_address(address)[0] if address else "p2pkh"
+    except ValueError:
+        return "p2pkh"
+    # the P2SH addresses of the coins can only be the P2SH-P2WPKH ones
+    return "p2sh-p2wpkh" if kind == "p2sh" else kind
+
+
+def verify_wifs(lines, workers=1, chunk_size=CHUNK_SIZE, ec_backend="table"):
+    """
+    Derives the address of every WIF of a stream. Blank lines and lines starting with # are skipped.
+    :param lines: An iterable of lines with a WIF, optionally followed by the address it should have,
+                  e.g.: an open file
+    :return: A generator of (line number, expected address or None, derived address or None, error or None)
+             tuples, one per WIF
+    """
+    numbered = ((line_number, line) for line_number, line in enumerate(lines, 1)
+                if line.strip() and not line.lstrip().startswith("#"))
+    results = bitcoin.map_chunks(_verify_wif_chunk, bitcoin.chunked(numbered, chunk_size), workers=workers,
+                                 initializer=_init_wif_worker, initargs=(ec_backend,))
+    for _, chunk_results in results:
+        yield from chunk_results
@@ -0,0 +1,116 @@
+import os
+import tempfile
+import unittest
+from bertocoin import addresses, hashes, secp256k1
+from bertocoin.bitcoin import Bitcoin, derive_coin_formats, derive_coins
+from bertocoin.stamper import CoinStamper
+
+
+class Testing(unittest.TestCase):
+
+    SECRET = 'addresses-test-secret'
+    # the encodings of the private key 1, the public key of the generator
+    KEY_1 = {
+        'wif': '5HpHagT65TZzG1PH3CSu63k8DbpvD8s5ip4nEB3kEsreAnchuDf',
+        'wif-compressed': 'KwDiBf89QgGbjEhKnhXJuH7LrciVrZi3qYjgd9M7rFU73sVHnoWn',
+        'p2pkh': '1BgGZ9tcN4rm9KBzDn7KprQz87SZ26SAMH',
+        'p2wpkh': 'bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4',
+        'p2sh-p2wpkh': '3JvL6Ymt8MVWiCNHC7oWU6nLeHNJKLZGLN',
+    }
+
+    def test_encode(self):
+        """
+        Every format of a key is the one of the wallets, and only the requested formats are computed
+        """
+
+        private_key = (1).to_bytes(32, 'big')
+        encodings = addresses.encode(private_key, secp256k1.public_key(private_key), addresses.FORMATS)
+        self.assertEqual(encodings.pop('public_key').hex(),
+                         '0279be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798')
+        self.assertEqual(encodings, self.KEY_1)
+
+        encodings = addresses.encode(private_key, secp256k1.public_key(private_key), ('wif-compressed',))
+        self.assertEqual(sorted(encodings), ['public_key', 'wif-compressed'])
+
+        with self.assertRaises(ValueError):
+            addresses.check_formats(['wif', 'p2tr'])
+
+    def test_bech32_encode(self):
+        """
+        The table driven checksum gives the addresses of the test vectors of BIP 173
+        """
+
+        program = bytes.fromhex('751e76e8199196d454941c45d1b3a323f1433bd6')
+        self.assertEqual(addresses.bech32_encode('bc', 0, program), self.KEY_1['p2wpkh'])
+        self.assertEqual(addresses.bech32_encode('tb', 0, program), 'tb1qw508d6qejxtdg4y5r3zarvary0c5xw7kxpjzsx')
+        program = bytes.fromhex('1863143c14c5166804bd19203356da136c985678cd4d27a1b8c6329604903262')
+        self.assertEqual(addresses.bech32_encode('tb', 0, program),
+                         'tb1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3q0sl5k7')
+
+    def test_decode_address(self):
+        """
+        Every address format decodes to the hash160 it envelops, and addresses of other scripts are rejected
+        """
+
+        hash160 = bytes.fromhex('751e76e8199196d454941c45d1b3a323f1433bd6')
+        self.assertEqual(addresses.decode_address(self.KEY_1['p2pkh']), ('p2pkh', hash160))
+        self.assertEqual(addresses.decode_address(self.KEY_1['p2wpkh'].upper()), ('p2wpkh', hash160))
+        self.assertEqual(addresses.decode_address(self.KEY_1['p2sh-p2wpkh']),
+                         ('p2sh', addresses.p2sh_p2wpkh_hash160(hash160)))
+        for invalid in ['bc1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3qccfmv3',
+                        'tb1qw508d6qejxtdg4y5r3zarvary0c5xw7kxpjzsx', 'bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t5',
+                        self.KEY_1['wif'], '1notanaddress']:
+            with self.assertRaises(ValueError):
+                addresses.decode_address(invalid)
+
+    def test_derive_coin_formats(self):
+        """
+        The batch derivation gives the same coins as derive_coins and the single coin of Bitcoin
+        """
+
+        serial_numbers = [str(serial).zfill(4) for serial in range(6)]
+        coins = list(derive_coins(self.SECRET, serial_numbers, ec_backend='table'))
+        for workers in [1, 2]:
+            derived = list(derive_coin_formats(self.SECRET, serial_numbers, addresses.FORMATS, workers=workers,
+                                               chunk_size=4, ec_backend='table'))
+            self.assertEqual([(serial_number, encodings['wif'], encodings['p2pkh'])
+                              for serial_number, encodings in derived], coins)
+
+        for serial_number, encodings in derived:
+            self.assertEqual(addresses.encode_hash160(hashes.hash160(encodings['public_key'])),
+                             {encoding: encodings[encoding] for encoding in addresses.ADDRESS_FORMATS})
+
+        btc = Bitcoin(self.SECRET, '0003', formats=('p2wpkh',))
+        self.assertEqual(btc.generate_coin(), coins[3][1:])
+        self.assertEqual(btc.encodings['p2wpkh'], derived[3][1]['p2wpkh'])
+
+    def test_stamper_formats(self):
+        """
+        The slots of the printable hold the formats chosen for the stamper
+        """
+
+        coin = {'serial_number': '0001', 'numerator': '1', 'denominator': '1000', 'WIF': self.KEY_1['wif'],
+                'address': self.KEY_1['p2pkh'], 'formats': self.KEY_1}
+
+        with tempfile.TemporaryDirectory() as folder:
+            stamper = CoinStamper(temp_folder=folder, inline_qr=True, address_format='p2wpkh',
+                                  wif_format='wif-compressed')
+            self.assertEqual(stamper.coin_address(coin), self.KEY_1['p2wpkh'])
+            printable = stamper.process_template(coin)
+            with open(printable, encoding='utf-8') as printable_file:
+                content = printable_file.read()
+            self.assertIn(self.KEY_1['p2wpkh'][:14], content)
+            self.assertIn(self.KEY_1['wif-compressed'][:18], content)
+            self.assertNotIn(self.KEY_1['p2pkh'][:12], content)
+
+            with self.assertRaises(ValueError):
+                CoinStamper(temp_folder=folder, address_format='p2sh-p2wpkh', wif_format='wif')
+
+            # coins without formats only have the WIF and the P2PKH address
+            with self.assertRaises(ValueError):
+                stamper.process_template({key: value for key, value in coin.items() if key != 'formats'})
+            self.assertEqual(os.listdir(folder), ['print-me.svg'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import unittest
+from bertocoin import base58
+
+
+class Testing(unittest.TestCase):
+
+    def test_b58encode(self):
+        """
+        Base58 encoding, including the leading 0x00 bytes encoded as 1s
+        """
+
+        self.assertEqual(base58.b58encode(b''), '')
+        self.assertEqual(base58.b58encode(b'\x00'), '1')
+        self.assertEqual(base58.b58encode(b'\x00\x00\x01'), '112')
+        self.assertEqual(base58.b58encode(b'\x39'), 'z')
+        self.assertEqual(base58.b58encode(b'\x3a'), '21')
+
+        input_a = bytes.fromhex('022cda0ce470147f840e3e0cfe3ff00c964e073015efc2ec31bfe48f5ebd86480b')
+        self.assertEqual(base58.b58encode(input_a), 'eUiXSRhqfqG2WEAJDG2LwhUTjjK6aqqpEd5gdCxhj2pJ')
+
+        input_b = bytes.fromhex('00765d28b452bc80fdd6885b05c644e643bf89ba6451f62283')
+        self.assertEqual(base58.b58encode(input_b), '1BnrLSLhaZv1vTQ3z5yidteZ8CDfMJCXRL')
+
+    def test_b58decode(self):
+        """
+        Base58 decoding keeps the leading zero bytes and rejects invalid characters
+        """
+
+        self.assertEqual(base58.b58decode(''), b'')
+        self.assertEqual(base58.b58decode('112'), b'\x00\x00\x01')
+        self.assertEqual(base58.b58decode('1BnrLSLhaZv1vTQ3z5yidteZ8CDfMJCXRL'),
+                         bytes.fromhex('00765d28b452bc80fdd6885b05c644e643bf89ba6451f62283'))
+
+        for data in [os.urandom(size) for size in range(1, 70)] + [b'\x00' * 3 + os.urandom(30)]:
+            self.assertEqual(base58.b58decode(base58.b58encode(data)), data)
+
+        for invalid in ['0', 'O', 'I', 'l', '1Bnr LSL', 'ñ']:
+            with self.assertRaises(ValueError):
+                base58.b58decode(invalid)
+
+    def test_b58check(self):
+        """
+        Base58Check adds and verifies the double sha256 checksum
+        """
+
+        address_payload = bytes.fromhex('00765d28b452bc80fdd6885b05c644e643bf89ba64')
+        self.assertEqual(base58.b58check_encode(address_payload), '1BnrLSLhaZv1vTQ3z5yidteZ8CDfMJCXRL')
+        self.assertEqual(base58.b58check_decode('1BnrLSLhaZv1vTQ3z5yidteZ8CDfMJCXRL'), address_payload)
+
+        wif_payload = bytes.fromhex('8060cf347dbc59d31c1358c8e5cf5e45b822ab85b79cb32a9f3d98184779a9efc2')
+        self.assertEqual(base58.b58check_decode('5JYvSurww2jTxmCeoN8T9QgRMWp45rre7WgFS76ae6Rgd1BnkC6'), wif_payload)
+
+        corrupted_strings = ['1BnrLSLhaZv1vTQ3z5yidteZ8CDfMJCXRM',
+                             '5JYvSurww2jTxmCeoN8T9QgRMWp45rre7WgFS76ae6Rgd1BnkC7',
+                             '1']
+        for corrupted in corrupted_strings:
+            with self.assertRaises(ValueError):
+                base58.b58check_decode(corrupted)
+
+        self.assertEqual(base58.b58check_encode_batch([address_payload, wif_payload]),
+                         ['1BnrLSLhaZv1vTQ3z5yidteZ8CDfMJCXRL', '5JYvSurww2jTxmCeoN8T9QgRMWp45rre7WgFS76ae6Rgd1BnkC6'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+from benchmarks import suite
+
+
+class Testing(unittest.TestCase):
+
+    def test_run(self):
+        """
+        Every stage of the suite runs and reports its time per coin
+        """
+
+        results = suite.run(coins=2, repeat=1)
+        self.assertEqual(sorted(results['us_per_coin']),
+                         sorted(['passphrase', 'ec_table', 'ec_ecdsa', 'hash160', 'base58check', 'template',
+                                 'qr_png', 'qr_inline', 'shred', 'end_to_end']))
+        self.assertTrue(all(us > 0 for us in results['us_per_coin'].values()))
+        self.assertEqual(results['files_per_coin'], 3)
+
+    def test_compare(self):
+        """
+        Only the stages slower than the threshold, and by more than the noise floor, are regressions
+        """
+
+        baseline = {'us_per_coin': {'ec_table': 400.0, 'passphrase': 0.5, 'qr_png': 20000.0}}
+        results = {'us_per_coin': {'ec_table': 520.0, 'passphrase': 1.5, 'qr_png': 21000.0}}
+        self.assertEqual(suite.compare(results, baseline, threshold=0.25), [('ec_table', 400.0, 520.0)])
+        self.assertEqual(suite.compare(results, baseline, threshold=0.5), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
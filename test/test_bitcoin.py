@@ -1,5 +1,6 @@
 import unittest
-from bertocoin.__main__ import Bitcoin
+from bertocoin.bitcoin import Bitcoin, derive_coins
+from bertocoin import base58
 from unittest.mock import MagicMock
 import binascii
 
@@ -108,6 +109,79 @@ class Testing(unittest.TestCase):
             'Coin_1234_D46M9vCkKHHhiFsHK1-MC2G8O9Y4UCemx2U9sFPljy/)rlg-nFT5IH64l3uldFXb'
         )
 
+    def test_generate_coin_ec_backends(self):
+        """
+        The precomputed table backend produces the same coins as the ecdsa reference backend
+        """
+
+        vectors = [
+            ('60cf347dbc59d31c1358c8e5cf5e45b822ab85b79cb32a9f3d98184779a9efc2', True,
+             '5JYvSurww2jTxmCeoN8T9QgRMWp45rre7WgFS76ae6Rgd1BnkC6', '17JsmEygbbEUEpvt4PFtYaTeSqfb9ki1F1'),
+            ('F273F81F4F7696F704964367815E4A641C5D80B468B1601F5EE6F2AB9F3A4188', True,
+             '5Kf4ibycbXZQJPRFNprACLNn4i2WapFLXPq397ZYLSYKuic6cqH', '1GB79Up5834H5GYMunBhMRxUxgz7rF82FT'),
+            ('D46M9vCkKHHhiFsHK1-MC2G8O9Y4UCemx2U9sFPljy/)rlg-nFT5IH64l3uldFXb', False,
+             '5J3btiKckkMpV9Ttm4epAt7Z8U3L8k3S8VsQm1rizSQ6DxE5gLi', '1BnrLSLhaZv1vTQ3z5yidteZ8CDfMJCXRL'),
+        ]
+
+        for ec_backend in Bitcoin.EC_BACKENDS:
+            for secret, debug, WIF, public_address_b58 in vectors:
+                btc = Bitcoin(secret, '1234', ec_backend=ec_backend)
+                self.assertEqual(btc.generate_coin(debug=debug), (WIF, public_address_b58))
+
+        with self.assertRaises(ValueError):
+            Bitcoin('', '1234', ec_backend='gpu')
+
+    def test_derive_many(self):
+        """
+        Bulk derivation returns exactly the same coins as generate_coin, with every backend
+        """
+
+        secret = 'D46M9vCkKHHhiFsHK1-MC2G8O9Y4UCemx2U9sFPljy/)rlg-nFT5IH64l3uldFXb'
+        serial_numbers = ['0000', '0001', '1234', '9999']
+        expected = [Bitcoin(secret, serial_number).generate_coin() for serial_number in serial_numbers]
+
+        for ec_backend in Bitcoin.EC_BACKENDS:
+            btc = Bitcoin(secret, '0000', ec_backend=ec_backend)
+            self.assertEqual(btc.derive_many(serial_numbers), expected)
+            self.assertEqual(btc.derive_many([]), [])
+
+        self.assertEqual(expected[2], ('5J3btiKckkMpV9Ttm4epAt7Z8U3L8k3S8VsQm1rizSQ6DxE5gLi',
+                                       '1BnrLSLhaZv1vTQ3z5yidteZ8CDfMJCXRL'))
+
+    def test_derive_coins(self):
+        """
+        The worker pool derives the same coins as Bitcoin.generate_coin, in the order of the serials
+        """
+
+        secret = 'D46M9vCkKHHhiFsHK1-MC2G8O9Y4UCemx2U9sFPljy/)rlg-nFT5IH64l3uldFXb'
+        serial_numbers = [str(serial).zfill(4) for serial in range(1230, 1240)]
+        expected = [(serial_number, *Bitcoin(secret, serial_number).generate_coin())
+                    for serial_number in serial_numbers]
+
+        self.assertEqual(list(derive_coins(secret, serial_numbers)), expected)
+        self.assertEqual(list(derive_coins(secret, serial_numbers, workers=2, chunk_size=3)), expected)
+        self.assertEqual(list(derive_coins(secret, serial_numbers, workers=2, ec_backend='table')), expected)
+        self.assertIn(('1234',
+                       '5J3btiKckkMpV9Ttm4epAt7Z8U3L8k3S8VsQm1rizSQ6DxE5gLi',
+                       '1BnrLSLhaZv1vTQ3z5yidteZ8CDfMJCXRL'), expected)
+
+    def test_decode_wif(self):
+        """
+        WIFs are decoded to their private key only if the checksum, the version and the key are valid
+        """
+
+        private_key = bytes.fromhex('60cf347dbc59d31c1358c8e5cf5e45b822ab85b79cb32a9f3d98184779a9efc2')
+        self.assertEqual(Bitcoin.decode_wif('5JYvSurww2jTxmCeoN8T9QgRMWp45rre7WgFS76ae6Rgd1BnkC6'), private_key)
+        self.assertEqual(Bitcoin.decode_wif(base58.b58check_encode(b'\x80' + private_key + b'\x01')), private_key)
+
+        for invalid in ['5JYvSurww2jTxmCeoN8T9QgRMWp45rre7WgFS76ae6Rgd1BnkC7',
+                        '17JsmEygbbEUEpvt4PFtYaTeSqfb9ki1F1',
+                        base58.b58check_encode(b'\x80' + private_key + b'\x02'),
+                        base58.b58check_encode(b'\x80' + bytes(32)),
+                        '0OIl', '']:
+            with self.assertRaises(ValueError):
+                Bitcoin.decode_wif(invalid)
+
     def test__ripemd160(self):
         """
         ripemd160 correctly hashed binary input and outputs hash in bin too
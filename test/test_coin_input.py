@@ -0,0 +1,57 @@
+import argparse
+import contextlib
+import io
+import subprocess
+import sys
+import unittest
+from bertocoin import addresses, bitcoin, inputs
+from bertocoin.inputs import CoinInput
+
+
+class Testing(unittest.TestCase):
+
+    def test_parse_serial_range(self):
+        """
+        Serial ranges are parsed as START:END, both ends included
+        """
+
+        self.assertEqual(CoinInput.parse_serial_range('0100:0199'), range(100, 200))
+        self.assertEqual(CoinInput.parse_serial_range('7:7'), range(7, 8))
+        self.assertEqual(list(CoinInput.parse_serial_range('0:2')), [0, 1, 2])
+
+        for invalid in ['', '12', '5:1', '1:10000', 'a:b', '1-5']:
+            with self.assertRaises(argparse.ArgumentTypeError):
+                CoinInput.parse_serial_range(invalid)
+
+    def test_wif_format(self):
+        """
+        The SegWit addresses come with the compressed WIF, the only one wallets find their funds with
+        """
+
+        for address_format, wif_format in [('p2pkh', 'wif'), ('p2wpkh', 'wif-compressed'),
+                                           ('p2sh-p2wpkh', 'wif-compressed')]:
+            arguments = CoinInput.command_line_arguments(['-p', 'secret', '--address-format', address_format])
+            self.assertEqual(arguments.wif_format, wif_format)
+
+        arguments = CoinInput.command_line_arguments(['-p', 'secret', '--wif-format', 'wif-compressed'])
+        self.assertEqual((arguments.address_format, arguments.wif_format), ('p2pkh', 'wif-compressed'))
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            CoinInput.command_line_arguments(['-p', 'secret', '--address-format', 'p2wpkh', '--wif-format', 'wif'])
+
+    def test_shared_choices(self):
+        """
+        The choices of the arguments are the backends and formats of the derivation, from a module without imports
+        """
+
+        self.assertIs(inputs.EC_BACKENDS, bitcoin.Bitcoin.EC_BACKENDS)
+        self.assertIs(inputs.ADDRESS_FORMATS, addresses.ADDRESS_FORMATS)
+        self.assertIs(inputs.WIF_FORMATS, addresses.WIF_FORMATS)
+
+        imported = subprocess.run([sys.executable, '-c', 'import sys; before = set(sys.modules); '
+                                   'import bertocoin.constants; print(*sorted(set(sys.modules) - before))'],
+                                  capture_output=True, text=True, check=True).stdout.split()
+        self.assertEqual(imported, ['bertocoin', 'bertocoin.constants'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+from bertocoin.stamper import CoinStamper
+
+
+class Testing(unittest.TestCase):
+
+    COIN = {
+        'serial_number': '1234',
+        'numerator': '1',
+        'denominator': '1000',
+        'WIF': '5J3btiKckkMpV9Ttm4epAt7Z8U3L8k3S8VsQm1rizSQ6DxE5gLi',
+        'address': '1BnrLSLhaZv1vTQ3z5yidteZ8CDfMJCXRL',
+    }
+
+    def test_process_template(self):
+        """
+        The printable holds the coin information and points to the png files of the QR codes
+        """
+
+        with tempfile.TemporaryDirectory() as folder:
+            stamper = CoinStamper(temp_folder=folder)
+            printable = stamper.process_template(self.COIN, per_serial=True)
+
+            self.assertEqual(printable, os.path.join(folder, 'print-me-1234.svg'))
+            self.assertEqual(sorted(os.listdir(folder)),
+                             ['coin_private_qr-1234.png', 'coin_public_qr-1234.png', 'print-me-1234.svg'])
+
+            with open(printable, encoding='utf-8') as printable_file:
+                content = printable_file.read()
+            self.assertIn('Coin_1234_PRIVATE', content)
+            self.assertIn('xlink:href="coin_private_qr-1234.png"', content)
+            self.assertNotIn('::', content)
+
+    def test_process_template_inline_qr(self):
+        """
+        With inline QR codes the printable is the only file written
+        """
+
+        with tempfile.TemporaryDirectory() as folder:
+            stamper = CoinStamper(temp_folder=folder, inline_qr=True)
+            printable = stamper.process_template(self.COIN)
+
+            self.assertEqual(os.listdir(folder), ['print-me.svg'])
+            with open(printable, encoding='utf-8') as printable_file:
+                content = printable_file.read()
+            self.assertEqual(content.count('xlink:href="data:image/svg+xml;base64,'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
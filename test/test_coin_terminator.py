@@ -0,0 +1,95 @@
+import asyncio
+import errno
+import os
+import signal
+import tempfile
+import time
+import unittest
+from unittest import mock
+from bertocoin import cli, manifest, storage
+from bertocoin.inputs import CoinInput
+from bertocoin.stamper import CoinStamper
+from bertocoin.terminator import CoinTerminator
+
+
+class Testing(unittest.TestCase):
+
+    @staticmethod
+    def terminator(folder):
+        dying_folder = os.path.join(folder, 'delete-me')
+        os.mkdir(dying_folder)
+        for name in ['print-me-0001.svg', 'print-me-0002.svg']:
+            with open(os.path.join(dying_folder, name), 'w') as printable:
+                printable.write('secret')
+        return CoinTerminator(os.path.join(dying_folder, 'print-me-*.svg'),
+                              storage=storage.DiskStorage(dying_folder, shred_passes='random'),
+                              animation=False)
+
+    def test_expire(self):
+        """
+        The files of a coin are destroyed on their own deadline, the rest of the folder when the countdown ends
+        """
+
+        with tempfile.TemporaryDirectory() as folder:
+            terminator = self.terminator(folder)
+            first = os.path.join(terminator.dying_folder, 'print-me-0001.svg')
+
+            async def batch():
+                terminator.watch_early_destruction()
+                expiring = asyncio.ensure_future(terminator.expire([first], 0.05))
+                await asyncio.sleep(0.5)
+                self.assertTrue(expiring.done())
+                self.assertEqual(os.listdir(terminator.dying_folder), ['print-me-0002.svg'])
+                await terminator.countdown_and_destroy(0, pending=[expiring])
+
+            asyncio.run(batch())
+            self.assertEqual(os.listdir(folder), [])
+
+    def test_early_destruction(self):
+        """
+        A signal destroys the files right away, without waiting for the countdown
+        """
+
+        with tempfile.TemporaryDirectory() as folder:
+            terminator = self.terminator(folder)
+
+            async def interrupted():
+                loop = asyncio.get_running_loop()
+                loop.call_later(0.2, os.kill, os.getpid(), signal.SIGTERM)
+                await terminator.countdown_and_destroy(60)
+
+            start = time.monotonic()
+            asyncio.run(interrupted())
+            self.assertLess(time.monotonic() - start, 10)
+            self.assertTrue(terminator.destruction_requested)
+            self.assertEqual(os.listdir(folder), [])
+
+    def test_failed_batch(self):
+        """
+        The printables of a batch that fails midway are destroyed before the error is raised, and its manifest
+        is closed with the coins minted so far
+        """
+
+        process_template = CoinStamper.process_template
+
+        def disk_full(stamper, coin_info, **kwargs):
+            if coin_info['serial_number'] == '0003':
+                raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC))
+            return process_template(stamper, coin_info=coin_info, **kwargs)
+
+        with tempfile.TemporaryDirectory() as folder:
+            dying_folder = os.path.join(folder, 'delete-me')
+            watch_only = os.path.join(folder, 'manifest.csv')
+            args = CoinInput.command_line_arguments(['--passphrase', 'failed-batch-secret', '--serial-range', '1:5',
+                                                     '--ec-backend', 'table', '--shred-passes', 'random',
+                                                     '--manifest', watch_only, '--no-animation', '--timeout', '0'])
+            with mock.patch.object(CoinStamper, 'process_template', disk_full):
+                with self.assertRaises(OSError) as context:
+                    cli.mint_serial_range(args, storage.DiskStorage(dying_folder, shred_passes='random'))
+            self.assertEqual(context.exception.errno, errno.ENOSPC)
+            self.assertEqual(os.listdir(folder), ['manifest.csv'])
+            self.assertEqual([coin['serial_number'] for coin in manifest.read_manifest(watch_only)], ['0001', '0002'])
+
+
+if __name__ == '__main__':
+    unittest.main()
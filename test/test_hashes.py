@@ -0,0 +1,50 @@
+import unittest
+from bertocoin import hashes
+
+
+class Testing(unittest.TestCase):
+
+    def test_ripemd160_backends(self):
+        """
+        Every available RIPEMD-160 backend produces the same digests (same vectors as test__ripemd160)
+        """
+
+        vectors = [
+            (b'973153f86ec2da1748e63f0cf85b89835b42f8ee8018c549868a1308a19f6ca3',
+             '0ef9258f3cde3a50ddc768f8a1c5041dd4b5c459'),
+            (b'37a770409eb4e1867ea7fe27168d38184350a31d6e1885cf456112f428e29dc8',
+             '33fdaca3beeba39d2ac18cecb543bf065c938432'),
+            (b'e67e72111b363d80c8124d28193926000980e1211c7986cacbd26aacc5528d48',
+             '71b1f6bfc5c99903d443be2bd6d1c8e2ec979d85'),
+            (b'', '9c1185a5c5e9fc54612808977ee8f548b2258d31'),
+        ]
+
+        available = []
+        for name in hashes.RIPEMD160_BACKENDS:
+            try:
+                available.append(hashes.load_ripemd160_backend(name))
+            except ValueError:
+                continue
+
+        self.assertIn(hashes.RIPEMD160_BACKEND, hashes.RIPEMD160_BACKENDS)
+        self.assertTrue(available)
+        for ripemd160 in available + [hashes.ripemd160]:
+            for data, digest in vectors:
+                self.assertEqual(ripemd160(data).hex(), digest)
+
+        with self.assertRaises(ValueError):
+            hashes.load_ripemd160_backend('md5')
+
+    def test_hash160(self):
+        """
+        hash160 is RIPEMD-160 over sha256, e.g.: the payload of the address of a compressed public key
+        """
+
+        public_key = bytes.fromhex('031e7bcc70c72770dbb72fea022e8a6d07f814d2ebe4de9ae3f7af75bf706902a7')
+        self.assertEqual(hashes.hash160(public_key), hashes.ripemd160(hashes.sha256(public_key)))
+        self.assertEqual(hashes.sha256d(b'').hex(),
+                         '5df6e0e2761359d30a8275058e299fcc0381534545f55cf43e41983f5d4c9456')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+import xml.dom.minidom
+from bertocoin import imposition
+from bertocoin.stamper import CoinStamper
+
+
+class Testing(unittest.TestCase):
+
+    COIN = {
+        'serial_number': '1234',
+        'numerator': '1',
+        'denominator': '1000',
+        'WIF': '5J3btiKckkMpV9Ttm4epAt7Z8U3L8k3S8VsQm1rizSQ6DxE5gLi',
+        'address': '1BnrLSLhaZv1vTQ3z5yidteZ8CDfMJCXRL',
+    }
+
+    def test_grid(self):
+        """
+        The grid makes the cells as large as possible, and prefers fewer empty cells on a tie
+        """
+
+        self.assertEqual(imposition.grid(3, 100, 100, 300, 100), (3, 1, 1.0))
+        self.assertEqual(imposition.grid(4, 100, 100, 200, 200), (2, 2, 1.0))
+        self.assertEqual(imposition.grid(6, 100, 50, 200, 150), (2, 3, 1.0))
+        self.assertEqual(imposition.grid(3, 100, 100, 300, 300), (2, 2, 1.5))
+
+        with self.assertRaises(ValueError):
+            imposition.grid(0, 100, 100, 200, 200)
+
+    def test_impose(self):
+        """
+        Coins are streamed into sheets of K coins, and the artwork is written once per sheet
+        """
+
+        with tempfile.TemporaryDirectory() as folder:
+            stamper = CoinStamper(temp_folder=folder, inline_qr=True, per_sheet=4)
+            sheets = []
+            for serial in range(1, 7):
+                sheets.append(stamper.impose(dict(self.COIN, serial_number=str(serial).zfill(4))))
+            self.assertEqual(stamper.close_sheets(), [os.path.join(folder, 'print-me-sheet-0001.svg'),
+                                                      os.path.join(folder, 'print-me-sheet-0002.svg')])
+            self.assertEqual(sheets.count(os.path.join(folder, 'print-me-sheet-0001.svg')), 4)
+            self.assertEqual(sorted(os.listdir(folder)), ['print-me-sheet-0001.svg', 'print-me-sheet-0002.svg'])
+
+            for sheet, coins in zip(stamper.close_sheets(), [4, 2]):
+                # the sheets are valid XML documents
+                document = xml.dom.minidom.parse(sheet)
+                self.assertEqual(len(document.getElementsByTagName('svg')), 1 + coins)
+
+                with open(sheet, encoding='utf-8') as sheet_file:
+                    content = sheet_file.read()
+                self.assertEqual(content.count('Open Source DIY Bitcoin coin'), 1)
+                self.assertEqual(content.count('xlink:href="#bertocoin-art-0"'), coins)
+                self.assertEqual(content.count('xlink:href="data:image/svg+xml;base64,'), 2 * coins)
+                self.assertNotIn('::', content)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import shutil
+import tempfile
+import unittest
+from bertocoin import manifest
+from bertocoin.bitcoin import derive_coin_formats, derive_coins
+
+
+class Testing(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        serial_numbers = [str(serial).zfill(4) for serial in range(10, 40, 3)]
+        self.coins = [{'serial_number': serial_number, 'numerator': '1', 'denominator': '1000',
+                       'WIF': WIF, 'address': address}
+                      for serial_number, WIF, address in derive_coins('manifest-test-secret', serial_numbers,
+                                                                      ec_backend='table')]
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_formats(self):
+        """
+        Every format reads back the public fields of the coins, and none of them holds a WIF
+        """
+
+        for manifest_format in manifest.FORMATS:
+            pathname = os.path.join(self.folder, 'coins.' + manifest_format)
+            with manifest.ManifestWriter(pathname, batch_size=4) as writer:
+                for coin in self.coins:
+                    writer.add(coin)
+            self.assertEqual(writer.rows, len(self.coins))
+
+            coins = list(manifest.read_manifest(pathname))
+            self.assertEqual([(coin['serial_number'], coin['address']) for coin in coins],
+                             [(coin['serial_number'], coin['address']) for coin in self.coins])
+
+            with open(pathname, 'rb') as manifest_file:
+                content = manifest_file.read()
+            for coin in self.coins:
+                self.assertNotIn(coin['WIF'].encode('ascii'), content)
+
+    def test_address_formats(self):
+        """
+        The manifests hold the address printed in the coins with its format, the bin one the hash160 of the key
+        """
+
+        coins = [{'serial_number': serial_number, 'numerator': '1', 'denominator': '1000',
+                  'WIF': encodings['wif-compressed'], 'address': encodings['p2wpkh'], 'address_format': 'p2wpkh',
+                  'formats': encodings}
+                 for serial_number, encodings in derive_coin_formats('manifest-test-secret', ['0001', '0002'],
+                                                                     ('p2pkh', 'p2wpkh', 'wif-compressed'))]
+        for manifest_format in manifest.FORMATS:
+            pathname = os.path.join(self.folder, 'coins.' + manifest_format)
+            with manifest.ManifestWriter(pathname) as writer:
+                for coin in coins:
+                    writer.add(coin)
+
+            expected = [(coin['address'], 'p2wpkh') if manifest_format != 'bin' else (coin['formats']['p2pkh'], 'p2pkh')
+                        for coin in coins]
+            self.assertEqual([(coin['address'], coin['address_format'])
+                              for coin in manifest.read_manifest(pathname)], expected)
+
+        # the manifests written before the address formats hold P2PKH addresses
+        pathname = os.path.join(self.folder, 'old.csv')
+        with open(pathname, 'w') as old_manifest:
+            old_manifest.write(f"serial_number,numerator,denominator,address\n0010,1,1000,{self.coins[0]['address']}\n")
+        self.assertEqual(next(manifest.read_manifest(pathname))['address_format'], 'p2pkh')
+
+    def test_streaming(self):
+        """
+        The rows are written in batches, before the manifest is closed
+        """
+
+        pathname = os.path.join(self.folder, 'coins.csv')
+        writer = manifest.ManifestWriter(pathname, batch_size=3)
+        for coin in self.coins[:4]:
+            writer.add(coin)
+        self.assertEqual(len(list(manifest.read_manifest(pathname))), 3)
+        writer.close()
+        self.assertEqual(len(list(manifest.read_manifest(pathname))), 4)
+
+    def test_binary_search(self):
+        """
+        A binary manifest is searched by serial number
+        """
+
+        pathname = os.path.join(self.folder, 'coins.dat')
+        with manifest.ManifestWriter(pathname, manifest_format='bin') as writer:
+            for coin in self.coins:
+                writer.add(coin)
+            with self.assertRaises(ValueError):
+                writer.add(self.coins[0])
+
+        with manifest.BinaryManifest(pathname) as binary_manifest:
+            self.assertEqual(len(binary_manifest), len(self.coins))
+            for coin in self.coins:
+                self.assertEqual(manifest.hash160_address(binary_manifest.find(int(coin['serial_number']))),
+                                 coin['address'])
+            for missing in [0, 11, 40, 9999]:
+                self.assertIsNone(binary_manifest.find(missing))
+
+        with open(pathname, 'ab') as manifest_file:
+            manifest_file.write(b'\x00')
+        with self.assertRaises(ValueError):
+            manifest.BinaryManifest(pathname)
+
+    def test_resolve_format(self):
+        """
+        The format is taken from the extension unless it is given
+        """
+
+        self.assertEqual(manifest.resolve_format('coins.JSONL'), 'jsonl')
+        self.assertEqual(manifest.resolve_format('coins.txt', 'csv'), 'csv')
+        with self.assertRaises(ValueError):
+            manifest.resolve_format('coins.txt')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import hashlib
+import unittest
+import ecdsa
+from bertocoin import base58, proofs, secp256k1
+from bertocoin.bitcoin import Bitcoin, derive_coins
+
+
+class Testing(unittest.TestCase):
+
+    SECRET = 'proofs-test-secret'
+    CHALLENGE = 'Reserve audit 2026-10-18'
+
+    def test_sign_message(self):
+        """
+        Signatures are the ones of signmessage in Bitcoin Core, deterministic and with a low s
+        """
+
+        # test vector of the functional tests of Bitcoin Core (rpc_signmessage.py), a WIF of testnet
+        private_key = base58.b58check_decode('cUeKHd5orzT3mz8P9pxyREHfsWtVfgsfDjiZZBcjUBAaGk1BTj7N')[1:33]
+        signature = proofs.sign_message(private_key, 'This is just a test message')
+        self.assertEqual(signature,
+                         'INbVnW4e6PeRmsv2Qgu8NuopvrVjkcxob+sX8OcZG0SALhWybUjzMLPdAsXI46YZGb0KQTRii+wWIQzRpG/U+S0=')
+
+        r, s, recovery_id, compressed = proofs.decode_signature(signature)
+        self.assertTrue(compressed)
+        self.assertLessEqual(s, secp256k1.N // 2)
+        public_key = secp256k1.public_key(private_key)
+        self.assertEqual(proofs.recover_public_key(proofs.message_digest('This is just a test message'),
+                                                   r, s, recovery_id),
+                         (int.from_bytes(public_key[:32], 'big'), int.from_bytes(public_key[32:], 'big')))
+
+        for invalid in ['', 'not base64!', 'AAAA', 'AA' * 44]:
+            with self.assertRaises(ValueError):
+                proofs.decode_signature(invalid)
+
+    def test_sign_messages(self):
+        """
+        The batch signatures are the low s signatures of ecdsa, and their recovery ids recover the signers
+        """
+
+        private_keys = Bitcoin(self.SECRET, None, 'table').private_keys_many([str(serial) for serial in range(16)])
+        digest = proofs.message_digest(self.CHALLENGE)
+        signatures = proofs.sign_messages(private_keys, digest)
+
+        decoded = [proofs.decode_signature(signature) for signature in signatures]
+        for private_key, (r, s, _, _) in zip(private_keys, decoded):
+            signing_key = ecdsa.SigningKey.from_string(private_key, curve=ecdsa.SECP256k1)
+            expected = signing_key.sign_digest_deterministic(digest, hashfunc=hashlib.sha256,
+                                                             sigencode=ecdsa.util.sigencode_strings_canonize)
+            self.assertEqual((r, s), tuple(int.from_bytes(value, 'big') for value in expected))
+
+        # a signature that can not be recovered does not spoil the rest of the batch
+        recovered = proofs._recover_many(digest, [(0, 1, 0)] + [signature[:3] for signature in decoded])
+        self.assertIsNone(recovered[0])
+        for private_key, public_key in zip(private_keys, recovered[1:]):
+            x, y = public_key
+            self.assertEqual(x.to_bytes(32, 'big') + y.to_bytes(32, 'big'), secp256k1.public_key(private_key))
+        self.assertEqual({recovery_id & 1 for _, _, recovery_id, _ in decoded}, {0, 1})
+
+    def test_prove_and_verify(self):
+        """
+        The proofs of a serial range are signed by the keys of its coins, and tampered proofs are found
+        """
+
+        serial_numbers = [str(serial).zfill(4) for serial in range(12)]
+        coins = list(derive_coins(self.SECRET, serial_numbers, ec_backend='table'))
+
+        for workers in [1, 2]:
+            signed = list(proofs.prove(self.SECRET, self.CHALLENGE, iter(serial_numbers), workers=workers,
+                                       chunk_size=5))
+            self.assertEqual([(serial_number, address) for serial_number, address, _ in signed],
+                             [(serial_number, address) for serial_number, _, address in coins])
+
+            lines = [f'{serial_number} {address} {signature}\n' for serial_number, address, signature in signed]
+            lines[3] = f'{coins[4][2]} {signed[3][2]}\n'
+            lines[5] = f'0005 {coins[5][2]} {signed[5][2][:-4]}AAA=\n'
+            lines.append('# a comment\n')
+            lines.append('0012 only-an-address\n')
+
+            results = list(proofs.verify_proofs(proofs.parse_proofs(lines), self.CHALLENGE, workers=workers,
+                                                chunk_size=4))
+            self.assertEqual(len(results), 13)
+            failed = [(label, address, recovered) for label, address, recovered, error in results
+                      if error is not None or address != recovered]
+            self.assertEqual([label for label, _, _ in failed], ['line 4', 'coin 0005', 'line 14'])
+            self.assertEqual(failed[0][1:], (coins[4][2], coins[3][2]))
+
+        # another challenge recovers other keys
+        results = proofs.verify_proofs(proofs.parse_proofs(lines[:3]), 'Another challenge')
+        self.assertTrue(all(address != recovered for _, address, recovered, _ in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
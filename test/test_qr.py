@@ -0,0 +1,80 @@
+import base64
+import re
+import unittest
+import pyqrcode
+from bertocoin import qr
+
+
+class Testing(unittest.TestCase):
+
+    def test_qr_encoder(self):
+        """
+        Codes built reusing the cached layouts are identical to the ones built by PyQRCode
+        """
+
+        encoder = qr.QREncoder()
+        contents = ['5J3btiKckkMpV9Ttm4epAt7Z8U3L8k3S8VsQm1rizSQ6DxE5gLi',
+                    '5JYvSurww2jTxmCeoN8T9QgRMWp45rre7WgFS76ae6Rgd1BnkC6',
+                    '1BnrLSLhaZv1vTQ3z5yidteZ8CDfMJCXRL',
+                    '17JsmEygbbEUEpvt4PFtYaTeSqfb9ki1F1',
+                    '0123', 'COIN 0123', 'Moneda nº 1']
+        for content in contents:
+            expected = pyqrcode.create(content)
+            self.assertEqual(encoder.create(content), (expected.version, expected.code))
+
+    def test_penalty(self):
+        """
+        The penalty of every mask is the same score computed by PyQRCode
+        """
+
+        for content in ['5J3btiKckkMpV9Ttm4epAt7Z8U3L8k3S8VsQm1rizSQ6DxE5gLi', '1BnrLSLhaZv1vTQ3z5yidteZ8CDfMJCXRL']:
+            code_builder = pyqrcode.create(content).builder
+            self.assertEqual([qr.penalty(mask) for mask in code_builder.masks],
+                             [sum(scores) for scores in code_builder.scores])
+
+    def test_qr_encoder_fixed_mask(self):
+        """
+        With a fixed mask, the codes are the ones PyQRCode builds with that mask
+        """
+
+        content = '5J3btiKckkMpV9Ttm4epAt7Z8U3L8k3S8VsQm1rizSQ6DxE5gLi'
+        expected = pyqrcode.create(content).builder
+        for mask in range(qr.MASKS):
+            version, code = qr.QREncoder(fixed_mask=mask).create(content)
+            self.assertEqual(version, expected.version)
+            self.assertEqual(code, expected.masks[mask])
+
+        with self.assertRaises(ValueError):
+            qr.QREncoder(fixed_mask=8)
+
+    def test_svg_path(self):
+        """
+        The SVG path draws exactly the dark modules of the QR matrix, shifted by the quiet zone
+        """
+
+        _, code = qr.create('5J3btiKckkMpV9Ttm4epAt7Z8U3L8k3S8VsQm1rizSQ6DxE5gLi')
+        drawn = set()
+        for x, y, width in re.findall(r'M(\d+) (\d+)h(\d+)v1h-\3z', qr.svg_path(code)):
+            for i in range(int(width)):
+                drawn.add((int(y) - qr.QUIET_ZONE, int(x) + i - qr.QUIET_ZONE))
+
+        dark = {(y, x) for y, row in enumerate(code) for x, module in enumerate(row) if module}
+        self.assertEqual(drawn, dark)
+
+        self.assertEqual(qr.svg_path([[1, 1, 0, 1]], quiet_zone=0), 'M0 0h2v1h-2zM3 0h1v1h-1z')
+
+    def test_svg_data_uri(self):
+        """
+        The data URI holds a standalone SVG sized for the QR code plus its quiet zone
+        """
+
+        uri = qr.svg_data_uri('1BnrLSLhaZv1vTQ3z5yidteZ8CDfMJCXRL')
+        self.assertTrue(uri.startswith('data:image/svg+xml;base64,'))
+
+        svg = base64.b64decode(uri.split(',', 1)[1]).decode('utf-8')
+        size = len(qr.create('1BnrLSLhaZv1vTQ3z5yidteZ8CDfMJCXRL')[1]) + 2 * qr.QUIET_ZONE
+        self.assertIn(f'viewBox="0 0 {size} {size}"', svg)
+
+
+if __name__ == '__main__':
+    unittest.main()
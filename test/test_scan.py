@@ -0,0 +1,79 @@
+import os
+import random
+import tempfile
+import unittest
+from bertocoin import addresses, manifest, scan
+from bertocoin.bitcoin import derive_coin_formats, derive_coins
+
+
+class Testing(unittest.TestCase):
+
+    SECRET = 'scan-test-secret'
+
+    def test_build_index(self):
+        """
+        The index built with an external sort holds every address once, with the total of its outputs
+        """
+
+        generator = random.Random(22)
+        hashes = [generator.getrandbits(160).to_bytes(20, 'big') for _ in range(300)]
+        # a P2WSH output is not an output of any coin
+        lines = ['address,value', '# a comment', 'bc1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3qccfmv3 5000',
+                 '1notanaddress 7']
+        totals = {}
+        for _ in range(1000):
+            hash160 = generator.choice(hashes)
+            value = generator.randrange(1, 10 ** 8)
+            totals[hash160] = totals.get(hash160, 0) + value
+            if generator.random() < 0.5:
+                lines.append(f'{manifest.hash160_address(hash160)} {value}')
+            else:
+                lines.append(f'{hash160.hex()},{value}')
+        generator.shuffle(lines)
+
+        with tempfile.TemporaryDirectory() as folder:
+            pathname = os.path.join(folder, 'utxos.idx')
+            for run_size in [7, 1000, 10 ** 6]:
+                self.assertEqual(scan.build_index(iter(lines), pathname, run_size=run_size), (1000, 4, len(totals)))
+                self.assertTrue(scan.is_index(pathname))
+                self.assertEqual(sorted(os.listdir(folder)), ['utxos.idx'])
+                with scan.UtxoIndex(pathname) as index:
+                    self.assertEqual(len(index), len(totals))
+                    for hash160, total in totals.items():
+                        self.assertEqual(index.find(hash160), total)
+                    for hash160 in [b'\x00' * 20, b'\xff' * 20, generator.getrandbits(160).to_bytes(20, 'big')]:
+                        self.assertIsNone(index.find(hash160))
+
+            with open(os.path.join(folder, 'utxos.txt'), 'w') as snapshot:
+                snapshot.write('\n'.join(lines))
+            self.assertFalse(scan.is_index(snapshot.name))
+            with self.assertRaises(ValueError):
+                scan.UtxoIndex(snapshot.name)
+
+    def test_scan_coins(self):
+        """
+        The coins of a serial range are reported funded or empty, whatever the format of their addresses
+        """
+
+        serial_numbers = [str(serial).zfill(4) for serial in range(10)]
+        coins = list(derive_coins(self.SECRET, serial_numbers, ec_backend='table'))
+        encodings = dict(derive_coin_formats(self.SECRET, serial_numbers, addresses.ADDRESS_FORMATS))
+        lines = [f'{coins[2][2]} 1500', f'{coins[7][2]} 20', f'{coins[7][2]} 30',
+                 f'{encodings["0004"]["p2wpkh"]} 700', f'{encodings["0005"]["p2sh-p2wpkh"]} 900',
+                 f'{encodings["0007"]["p2wpkh"].upper()} 100']
+
+        with tempfile.TemporaryDirectory() as folder:
+            pathname = os.path.join(folder, 'utxos.idx')
+            scan.build_index(lines, pathname)
+            with scan.UtxoIndex(pathname) as index:
+                for workers in [1, 2]:
+                    results = list(scan.scan_coins(self.SECRET, (coin[0] for coin in coins), index, workers=workers,
+                                                   chunk_size=3))
+                    self.assertEqual([(serial_number, address) for serial_number, address, _ in results],
+                                     [(serial_number, address) for serial_number, _, address in coins])
+                    self.assertEqual({serial_number: value for serial_number, _, value in results if value},
+                                     {'0002': 1500, '0004': 700, '0005': 900, '0007': 150})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import unittest
+import ecdsa
+from bertocoin import secp256k1
+
+
+class Testing(unittest.TestCase):
+
+    def test_multiply_generator(self):
+        """
+        Small and edge scalars give the well known multiples of G
+        """
+
+        self.assertEqual(secp256k1.to_affine(secp256k1.multiply_generator(1)), secp256k1.G)
+
+        # (N - 1) * G = -G
+        minus_g = (secp256k1.Gx, secp256k1.P - secp256k1.Gy)
+        self.assertEqual(secp256k1.to_affine(secp256k1.multiply_generator(secp256k1.N - 1)), minus_g)
+
+        # 2 * G, from both the table and the doubling formulas
+        two_g = secp256k1.to_affine(secp256k1.jacobian_double((secp256k1.Gx, secp256k1.Gy, 1)))
+        self.assertEqual(secp256k1.to_affine(secp256k1.multiply_generator(2)), two_g)
+
+        for invalid in [0, secp256k1.N, -1]:
+            with self.assertRaises(ValueError):
+                secp256k1.multiply_generator(invalid)
+
+    def test_batch_to_affine(self):
+        """
+        Normalising a batch with a shared inversion gives the same points as one inversion per point
+        """
+
+        points = [secp256k1.multiply_generator(int.from_bytes(os.urandom(32), 'big') % (secp256k1.N - 1) + 1)
+                  for _ in range(20)]
+        self.assertEqual(secp256k1.batch_to_affine(points), [secp256k1.to_affine(point) for point in points])
+        self.assertEqual(secp256k1.batch_to_affine(points[:1]), [secp256k1.to_affine(points[0])])
+        self.assertEqual(secp256k1.batch_to_affine([]), [])
+
+        with self.assertRaises(ValueError):
+            secp256k1.batch_to_affine(points + [(0, 1, 0)])
+
+    def test_public_key(self):
+        """
+        The public keys match the ones computed by the ecdsa library
+        """
+
+        for private_key in [bytes.fromhex('60cf347dbc59d31c1358c8e5cf5e45b822ab85b79cb32a9f3d98184779a9efc2'),
+                            bytes(31) + b'\x01',
+                            b'\x01' + bytes(31),
+                            os.urandom(32)]:
+            expected = ecdsa.SigningKey.from_string(private_key, curve=ecdsa.SECP256k1).get_verifying_key()
+            self.assertEqual(secp256k1.public_key(private_key), expected.to_string())
+
+
+if __name__ == '__main__':
+    unittest.main()
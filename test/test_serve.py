@@ -0,0 +1,85 @@
+import asyncio
+import json
+import os
+import signal
+import tempfile
+import unittest
+from bertocoin import serve, storage
+from bertocoin.bitcoin import Bitcoin
+
+
+class Testing(unittest.TestCase):
+
+    def test_latency_stats(self):
+        """
+        Latencies are summarized as nearest-rank percentiles, in ms, over the last requests only
+        """
+
+        stats = serve.LatencyStats(window=100)
+        self.assertEqual(stats.percentiles(), {})
+        for ms in range(1, 201):
+            stats.add(ms / 1000)
+        self.assertEqual({name: round(ms) for name, ms in stats.percentiles().items()},
+                         {'p50': 150, 'p90': 190, 'p99': 199, 'max': 200})
+
+    def test_parse_request(self):
+        """
+        Mint requests need a serial number, and the fraction is 1:1000 by default
+        """
+
+        self.assertEqual(serve.parse_request({'serial': 21}), ('0021', 1, 1000))
+        self.assertEqual(serve.parse_request({'serial': 0, 'numerator': 3, 'denominator': 4}), ('0000', 3, 4))
+        for invalid in [{}, {'serial': '21'}, {'serial': 10000}, {'serial': True}, {'serial': 1, 'numerator': 0}]:
+            with self.assertRaises(serve.RequestError):
+                serve.parse_request(invalid)
+
+    def test_serve(self):
+        """
+        The daemon mints the coins requested through its socket, never answers with a WIF, and destroys
+        every file when it stops
+        """
+
+        secret = 'serve-test-secret'
+        with tempfile.TemporaryDirectory() as folder:
+            socket_path = os.path.join(folder, 'bertocoin.sock')
+            coins_folder = os.path.join(folder, 'delete-me')
+            server = serve.MintServer(secret, socket_path, storage.DiskStorage(coins_folder, shred_passes='unlink'),
+                                      workers=1, concurrency=2, timeout=60, inline_qr=True)
+            responses = []
+
+            async def send(*requests):
+                reader, writer = await asyncio.open_unix_connection(socket_path)
+                for request in requests:
+                    writer.write(json.dumps(request).encode('utf-8') + b'\n')
+                    await writer.drain()
+                    responses.append(json.loads(await reader.readline()))
+                writer.close()
+
+            async def client():
+                while not os.path.exists(socket_path):
+                    await asyncio.sleep(0.05)
+                self.assertEqual(os.stat(socket_path).st_mode & 0o777, 0o600)
+                await asyncio.gather(send({'serial': 21}, {'serial': 21}), send({'serial': 22, 'numerator': 5}))
+                await send({'command': 'stats'})
+                os.kill(os.getpid(), signal.SIGTERM)
+
+            async def run():
+                await asyncio.gather(server.serve(), client())
+
+            asyncio.run(run())
+
+            minted = {response['serial_number']: response for response in responses if response.get('address')}
+            self.assertEqual(sorted(minted), ['0021', '0022'])
+            for serial_number, response in minted.items():
+                WIF, address = Bitcoin(secret, serial_number).generate_coin()
+                self.assertEqual(response['address'], address)
+                self.assertNotIn(WIF, json.dumps(responses))
+            self.assertIn({'ok': False, 'error': 'The files of the coin 0021 have not expired yet'},
+                          [{'ok': response['ok'], 'error': response.get('error')} for response in responses])
+            self.assertEqual(responses[-1]['minted'], 2)
+            self.assertEqual(set(responses[-1]['latency_ms']), {'p50', 'p90', 'p99', 'max'})
+            self.assertEqual(os.listdir(folder), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from bertocoin import shredder
+
+
+class Testing(unittest.TestCase):
+
+    def test_shred_tree(self):
+        """
+        The whole tree is deleted, files are emptied in place and links are removed without touching their targets
+        """
+
+        with tempfile.TemporaryDirectory() as folder:
+            tree = os.path.join(folder, 'delete-me')
+            os.makedirs(os.path.join(tree, 'qr'))
+            for name in ['print-me.svg', os.path.join('qr', 'coin_private_qr.png')]:
+                with open(os.path.join(tree, name), 'wb') as secret_file:
+                    secret_file.write(b'secret' * 1000)
+            # a hard link shares the data of the file, so it shows what happened to it
+            os.link(os.path.join(tree, 'print-me.svg'), os.path.join(folder, 'hard-link'))
+            with open(os.path.join(folder, 'target'), 'w') as target:
+                target.write('keep me')
+            os.symlink(os.path.join(folder, 'target'), os.path.join(tree, 'link'))
+
+            shredder.Shredder(passes='random', fsync=False, workers=2).shred(tree)
+
+            self.assertEqual(sorted(os.listdir(folder)), ['hard-link', 'target'])
+            self.assertEqual(os.path.getsize(os.path.join(folder, 'hard-link')), 0)
+            with open(os.path.join(folder, 'target')) as target:
+                self.assertEqual(target.read(), 'keep me')
+
+    def test_random_passes(self):
+        """
+        Random passes write fresh data on every block of every file, constant passes write their pattern
+        """
+
+        written = []
+
+        def pwrite(fd, data, offset, pwrite=os.pwrite):
+            written.append(bytes(data))
+            return pwrite(fd, data, offset)
+
+        with tempfile.TemporaryDirectory() as folder:
+            for name in ['a.svg', 'b.svg']:
+                with open(os.path.join(folder, name), 'wb') as secret_file:
+                    secret_file.write(b'secret' * 4000)
+
+            with mock.patch.object(shredder.os, 'pwrite', pwrite):
+                shredder.Shredder(passes='srm-lite', fsync=False, workers=1, buffer_size=4096).shred(folder)
+
+        constant = [data for data in written if data == b'\xff' * len(data)]
+        random = [data for data in written if data not in constant]
+        self.assertEqual(len(constant), len(random))
+        self.assertGreaterEqual(len(random), 2 * 6)
+        self.assertEqual(len(set(random)), len(random))
+
+    def test_rename_collision(self):
+        """
+        A random name that belongs to another file is not used, so that file is not replaced by the shredded one
+        """
+
+        with tempfile.TemporaryDirectory() as folder:
+            with open(os.path.join(folder, 'a.svg'), 'wb') as secret_file:
+                secret_file.write(b'secret')
+            with open(os.path.join(folder, 'keep0'), 'w') as sibling:
+                sibling.write('keep me')
+
+            # the first random name drawn is the one of the sibling
+            drawn = iter('keep0')
+            with mock.patch.object(shredder.secrets, 'choice', lambda alphabet: next(drawn, 'z')):
+                shredder.Shredder(passes='random', fsync=False, workers=1).shred_file(os.path.join(folder, 'a.svg'))
+
+            self.assertEqual(os.listdir(folder), ['keep0'])
+            with open(os.path.join(folder, 'keep0')) as sibling:
+                self.assertEqual(sibling.read(), 'keep me')
+
+    def test_failures(self):
+        """
+        Every file that can not be shredded is reported, and unknown pass policies are rejected
+        """
+
+        with tempfile.TemporaryDirectory() as folder:
+            missing = os.path.join(folder, 'missing.svg')
+            with self.assertRaises(shredder.ShredError) as context:
+                shredder.Shredder().shred(missing)
+            self.assertEqual([path for path, _ in context.exception.failures], [missing])
+
+        with self.assertRaises(ValueError):
+            shredder.Shredder(passes='gutmann')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import contextlib
+import io
+import unittest
+from benchmarks import startup
+from bertocoin import cli
+
+
+class Testing(unittest.TestCase):
+
+    def test_light_commands(self):
+        """
+        generate-pass and --help do not import the EC library, the QR and PNG stack, asyncio or the process pool
+        """
+
+        for arguments in startup.COMMANDS.values():
+            modules = startup.imported_modules(arguments)
+            self.assertIn('bertocoin.cli', modules)
+            self.assertEqual(modules.intersection(startup.HEAVY_MODULES), set(), arguments)
+
+    def test_parse_importtime(self):
+        """
+        The breakdown of -X importtime is parsed with the nesting level of every module
+        """
+
+        stderr = ("import time: self [us] | cumulative | imported package\n"
+                  "import time:       120 |        120 |     _json\n"
+                  "import time:       300 |        420 |   json\n"
+                  "import time:      1000 |       1420 | bertocoin.cli\n")
+        self.assertEqual(startup.parse_importtime(stderr),
+                         [('_json', 120, 120, 2), ('json', 300, 420, 1), ('bertocoin.cli', 1000, 1420, 0)])
+
+    def test_subcommands(self):
+        """
+        The first argument selects the subcommand, and the passphrase generated is robust
+        """
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(cli.main(['generate-pass', '--length', '80']), 0)
+        passphrase = output.getvalue().strip()
+        self.assertEqual(len(passphrase), 80)
+        self.assertTrue(cli.CoinInput.passphrase_is_robust(passphrase))
+
+    def test_main_exports(self):
+        """
+        The classes are still importable from bertocoin.__main__, from the modules that define them
+        """
+
+        from bertocoin.__main__ import Bitcoin, CoinStamper
+        from bertocoin import bitcoin, stamper
+        self.assertIs(Bitcoin, bitcoin.Bitcoin)
+        self.assertIs(CoinStamper, stamper.CoinStamper)
+        with self.assertRaises(ImportError):
+            from bertocoin.__main__ import NotDefined  # noqa: F401
+
+
+if __name__ == '__main__':
+    unittest.main()
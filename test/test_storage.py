@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from bertocoin import storage
+from bertocoin.stamper import CoinStamper
+
+
+class Testing(unittest.TestCase):
+
+    COIN = {
+        'serial_number': '1234',
+        'numerator': '1',
+        'denominator': '1000',
+        'WIF': '5J3btiKckkMpV9Ttm4epAt7Z8U3L8k3S8VsQm1rizSQ6DxE5gLi',
+        'address': '1BnrLSLhaZv1vTQ3z5yidteZ8CDfMJCXRL',
+    }
+
+    def test_file_system_type(self):
+        """
+        The file system of a path is the one of its deepest mount point
+        """
+
+        with tempfile.NamedTemporaryFile('w', suffix='.mounts', delete=False) as mounts:
+            mounts.write('/dev/sda1 / ext4 rw 0 0\n'
+                         'tmpfs /dev/shm tmpfs rw 0 0\n'
+                         'tmpfs /my\\040ram tmpfs rw 0 0\n')
+        try:
+            self.assertEqual(storage.file_system_type('/dev/shm/coins', mounts.name), 'tmpfs')
+            self.assertEqual(storage.file_system_type('/dev/shmoo', mounts.name), 'ext4')
+            self.assertEqual(storage.file_system_type('/my ram', mounts.name), 'tmpfs')
+        finally:
+            os.unlink(mounts.name)
+
+    def test_ram_storage(self):
+        """
+        The printables are written in a private folder in RAM, which is removed without leftovers
+        """
+
+        if storage.file_system_type('/dev/shm') not in storage.RAM_FILE_SYSTEMS:
+            self.skipTest('/dev/shm is not a RAM backed file system')
+
+        ram = storage.RamStorage()
+        self.assertEqual(os.stat(ram.folder).st_mode & 0o777, 0o700)
+
+        printable = CoinStamper(inline_qr=True, storage=ram).process_template(self.COIN)
+        self.assertEqual(printable, os.path.join(ram.folder, 'print-me.svg'))
+
+        ram.destroy()
+        self.assertFalse(os.path.exists(ram.folder))
+
+    def test_ram_storage_not_available(self):
+        """
+        RAM-only output is refused when the folder is not in memory
+        """
+
+        with tempfile.TemporaryDirectory() as folder:
+            if storage.file_system_type(folder) in storage.RAM_FILE_SYSTEMS:
+                self.skipTest('the temporary folder is in RAM')
+            with self.assertRaises(storage.StorageError):
+                storage.RamStorage(parent=folder)
+
+        with self.assertRaises(storage.StorageError):
+            storage.RamStorage(parent='/this/folder/does/not/exist')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import hashlib
+import io
+import json
+import unittest
+import ecdsa
+from bertocoin import hashes, manifest, sweep
+from bertocoin.bitcoin import Bitcoin, derive_coin_formats, derive_coins
+
+
+def parse_transaction(raw):
+    """
+    Splits a sweep transaction (less than 253 inputs) in its inputs and its outputs
+    """
+    inputs = []
+    position = 5
+    for _ in range(raw[4]):
+        outpoint = raw[position:position + 36]
+        script_size = raw[position + 36]
+        script = raw[position + 37:position + 37 + script_size]
+        inputs.append((outpoint, script))
+        position += 37 + script_size + 4
+    return inputs, raw[position:-4]
+
+
+class Testing(unittest.TestCase):
+
+    SECRET = 'sweep-test-secret'
+
+    def setUp(self):
+        self.coins = list(derive_coins(self.SECRET, [str(serial).zfill(4) for serial in range(6)], ec_backend='table'))
+        self.utxos = [(hashlib.sha256(bytes([index])).hexdigest(), index % 3, 10000 * (index + 1), address)
+                      for index, (_, _, address) in enumerate(self.coins[:4] * 2)]
+        # an output of an address that is not a coin of the serials, and a repeated one
+        self.utxos += [(hashlib.sha256(b'other').hexdigest(), 0, 50000, manifest.hash160_address(b'\x01' * 20)),
+                       self.utxos[0]]
+        self.destination = manifest.hash160_address(b'\x02' * 20)
+
+    def test_load_utxos(self):
+        """
+        Values are read in satoshis, or in BTC from the amounts of listunspent
+        """
+
+        utxo_file = io.StringIO(json.dumps([{'txid': '00' * 32, 'vout': 1, 'address': '1A', 'value': 1500},
+                                            {'txid': 'ff' * 32, 'vout': 0, 'address': '1B', 'amount': 0.00012345}]))
+        self.assertEqual(sweep.load_utxos(utxo_file), [('00' * 32, 1, 1500, '1A'), ('ff' * 32, 0, 12345, '1B')])
+        for invalid in [{'txid': '00', 'vout': 0, 'address': '1A', 'value': 1}, {'txid': '00' * 32, 'vout': 0},
+                        {'txid': '00' * 32, 'vout': 0, 'address': '1A', 'value': -5}]:
+            with self.assertRaises(ValueError):
+                sweep.load_utxos(io.StringIO(json.dumps([invalid])))
+
+    def test_signature_hashes(self):
+        """
+        The hashes computed from the cached midstates are the ones of the whole serialization of every input
+        """
+
+        outpoints = [hashlib.sha256(bytes([index])).digest() + bytes(4) for index in range(5)]
+        scripts = [sweep.p2pkh_script(bytes([index]) * 20) for index in range(5)]
+        outputs = b'\x01' + bytes(8) + b'\x00'
+
+        expected = []
+        for index in range(5):
+            serialization = (b'\x01\x00\x00\x00\x05' +
+                             b''.join(outpoint + (bytes([25]) + script if index == position else b'\x00') +
+                                      b'\xff\xff\xff\xff'
+                                      for position, (outpoint, script) in enumerate(zip(outpoints, scripts))) +
+                             outputs + bytes(4) + b'\x01\x00\x00\x00')
+            expected.append(hashes.sha256d(serialization))
+        self.assertEqual(sweep.signature_hashes(outpoints, scripts, outputs), expected)
+
+    def test_der_signature(self):
+        """
+        The DER signatures are the ones of ecdsa, for values with and without their top bit set
+        """
+
+        for r, s in [(1, 2**255), (2**255 - 1, 127), (128, 2**256 - 2**32 - 977), (0x7f12, 0xff)]:
+            self.assertEqual(sweep.der_signature(r, s), ecdsa.util.sigencode_der(r, s, ecdsa.SECP256k1.order))
+
+    def test_sweep(self):
+        """
+        The outputs of the coins are spent in batches, every input signed by the key of its coin
+        """
+
+        for workers in [1, 2]:
+            transactions, empty = sweep.sweep(self.SECRET, [coin[0] for coin in self.coins], self.utxos,
+                                              self.destination, fee_rate=2, max_inputs=3, workers=workers,
+                                              chunk_size=2)
+            self.assertEqual(empty, ['0004', '0005'])
+            self.assertEqual([transaction['inputs'] for transaction in transactions], [3, 3, 2])
+            self.assertEqual(sum(transaction['value'] + transaction['fee'] for transaction in transactions),
+                             sum(10000 * (index + 1) for index in range(8)))
+
+            keys = {address: Bitcoin.decode_wif(WIF) for _, WIF, address in self.coins}
+            spent = []
+            for transaction in transactions:
+                raw = bytes.fromhex(transaction['hex'])
+                self.assertLessEqual(len(raw), sweep.estimate_size(transaction['inputs']))
+                inputs, outputs = parse_transaction(raw)
+                self.assertEqual(outputs, b'\x01' + transaction['value'].to_bytes(8, 'little') + b'\x19' +
+                                 sweep.p2pkh_script(b'\x02' * 20))
+
+                utxos = {sweep._outpoint(txid, vout): address for txid, vout, _, address in self.utxos}
+                scripts = [sweep.p2pkh_script(manifest.address_hash160(utxos[outpoint])) for outpoint, _ in inputs]
+                digests = sweep.signature_hashes([outpoint for outpoint, _ in inputs], scripts, outputs)
+                for (outpoint, script), digest in zip(inputs, digests):
+                    signature, public_key = script[1:script[0]], script[script[0] + 2:]
+                    self.assertEqual(script[script[0]], 1)
+                    key = ecdsa.SigningKey.from_string(keys[utxos[outpoint]], curve=ecdsa.SECP256k1)
+                    self.assertEqual(public_key, key.get_verifying_key().to_string('compressed'))
+                    self.assertTrue(key.get_verifying_key().verify_digest(signature, digest,
+                                                                          sigdecode=ecdsa.util.sigdecode_der))
+                    spent.append(outpoint)
+            self.assertEqual(len(set(spent)), 8)
+
+        with self.assertRaises(ValueError):
+            sweep.sweep(self.SECRET, ['0000'], self.utxos, self.destination, fee_rate=1000)
+
+        # the outputs of the SegWit addresses of a coin are not taken for an empty coin
+        segwit = dict(derive_coin_formats(self.SECRET, ['0005'], ['p2wpkh']))['0005']['p2wpkh']
+        with self.assertRaises(ValueError):
+            sweep.sweep(self.SECRET, ['0004', '0005'], [('00' * 32, 0, 10000, segwit.upper())], self.destination,
+                        fee_rate=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from bertocoin import template
+
+
+class Testing(unittest.TestCase):
+
+    TEMPLATE = ('<svg>::serial::|::f::|::address.0001::::address.0002::::address.0003::|'
+                '::secret.0001::::secret.0002::::secret.0003::|COIN_PRIVATE_QR.png|COIN_PUBLIC_QR.png|'
+                'Coin_::serial::_PUBLIC ñ</svg>')
+
+    VALUES = {
+        'serial': '0021', 'f': '1:1000',
+        'address.0001': 'A1', 'address.0002': 'A2', 'address.0003': 'A3',
+        'secret.0001': 'S1', 'secret.0002': 'S2', 'secret.0003': 'S3',
+        'private_qr': 'private.png', 'public_qr': 'public.png',
+    }
+
+    def test_render(self):
+        """
+        Every slot is filled, including repeated ones, and the static text is kept untouched
+        """
+
+        compiled = template.CompiledTemplate(self.TEMPLATE)
+        self.assertEqual(compiled.slots['serial'], [1, 21])
+        self.assertEqual(compiled.render(self.VALUES).decode('utf-8'),
+                         '<svg>0021|1:1000|A1A2A3|S1S2S3|private.png|public.png|Coin_0021_PUBLIC ñ</svg>')
+
+    def test_invalid_templates(self):
+        """
+        Unknown and missing placeholders are reported when the template is compiled
+        """
+
+        with self.assertRaisesRegex(template.TemplateError, 'unknown placeholders ::serial.0001::'):
+            template.CompiledTemplate(self.TEMPLATE + '::serial.0001::')
+
+        with self.assertRaisesRegex(template.TemplateError, 'missing placeholders ::f::'):
+            template.CompiledTemplate(self.TEMPLATE.replace('::f::', ''))
+
+    def test_load_template(self):
+        """
+        The template of the project compiles, and it is compiled only once
+        """
+
+        compiled = template.load_template('resources/bertocoin.svg')
+        self.assertIs(template.load_template('resources/bertocoin.svg'), compiled)
+        self.assertEqual(sorted(compiled.slots), sorted(template.SLOTS))
+
+    def test_split_elements(self):
+        """
+        The children of the root element are split apart, ignoring the tags inside comments
+        """
+
+        document = '<?xml version="1.0"?>\n<!-- <g> -->\n<svg a="1">\n<rect/>\n<g><text>::f::</text></g>\n</svg>\n'
+        prologue, elements, epilogue = template.split_elements(document)
+
+        self.assertEqual(elements, ['\n<rect/>', '\n<g><text>::f::</text></g>'])
+        self.assertTrue(prologue.endswith('<svg a="1">'))
+        self.assertEqual(prologue + ''.join(elements) + epilogue, document)
+        self.assertEqual([template.has_slots(element) for element in elements], [False, True])
+
+        with self.assertRaises(template.TemplateError):
+            template.split_elements('<svg><g></svg>')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import json
+import os
+import tempfile
+import unittest
+from bertocoin import tracing
+
+
+class Testing(unittest.TestCase):
+
+    def test_disabled(self):
+        """
+        While tracing is off, spans are a shared no-op and nothing is recorded
+        """
+
+        self.assertFalse(tracing.enabled())
+        self.assertIs(tracing.span('derive.ec'), tracing.span('stamp.qr', coins=1))
+        with tracing.span('derive.ec'):
+            pass
+        self.assertEqual(tracing.stop(), [])
+
+    def test_trace(self):
+        """
+        Spans are recorded and written as JSON or as Chrome trace events, and attributes can not hold text
+        """
+
+        with tempfile.TemporaryDirectory() as folder:
+            for output_format in tracing.FORMATS:
+                tracing.start()
+                with tracing.span('batch', coins=2):
+                    for _ in range(2):
+                        with tracing.span('batch.stamp'):
+                            pass
+                with self.assertRaises(TypeError):
+                    tracing.span('derive', secret='5J3btiKckkMpV9Ttm4epAt7Z8U3L8k3S8VsQm1rizSQ6DxE5gLi')
+
+                pathname = os.path.join(folder, f'trace.{output_format}.json')
+                tracing.write(pathname, output_format)
+                self.assertFalse(tracing.enabled())
+                with open(pathname) as trace_file:
+                    trace = json.load(trace_file)
+
+                if output_format == 'json':
+                    self.assertEqual(trace['summary']['batch.stamp']['count'], 2)
+                    self.assertEqual(trace['spans'][-1]['attributes'], {'coins': 2})
+                else:
+                    self.assertEqual([event['name'] for event in trace['traceEvents']],
+                                     ['batch.stamp', 'batch.stamp', 'batch'])
+                    self.assertTrue(all(event['ph'] == 'X' for event in trace['traceEvents']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import random
+import unittest
+from bertocoin import vanity
+from bertocoin.bitcoin import Bitcoin
+
+
+class Testing(unittest.TestCase):
+
+    def test_prefix_ranges(self):
+        """
+        Every hash160 whose address starts with the prefix is inside its ranges, and most of the rest are not
+        """
+
+        generator = random.Random(21)
+        for prefix in ['1', '11', '111', '1A', '1Bz', '1z', '12', '1Q']:
+            ranges = vanity.prefix_ranges(prefix)
+            for _ in range(5000):
+                # hash160 values with leading zero bytes too, to get addresses with several leading '1'
+                value = generator.getrandbits(160) >> generator.choice([0, 0, 0, 8, 16, 24])
+                in_range = any(low <= value <= high for low, high in ranges)
+                address = vanity.address(value.to_bytes(20, 'big'))
+                self.assertEqual(address.startswith(prefix), in_range, (prefix, address))
+
+        for invalid in ['', '3Bert', '1l', '1' * 22]:
+            with self.assertRaises(ValueError):
+                vanity.prefix_ranges(invalid)
+
+    def test_search_keys(self):
+        """
+        Walking the keys by point additions finds the same addresses the coins of debug mode have
+        """
+
+        start = int.from_bytes(os.urandom(31), 'big')
+        matches = vanity.search_keys(start, 600, vanity.prefix_ranges('1A'), '1A', batch_size=128)
+        self.assertTrue(matches)
+        for private_key, address in matches:
+            self.assertTrue(start <= private_key < start + 600)
+            self.assertTrue(address.startswith('1A'))
+            _, coin_address = Bitcoin(f'{private_key:064x}', '0000').generate_coin(debug=True)
+            self.assertEqual(coin_address, address)
+
+    def test_search(self):
+        """
+        The search stops once the keys are found, in this process or in a pool of workers
+        """
+
+        for workers in [1, 2]:
+            results = list(vanity.search('1B', matches=2, workers=workers, task_keys=256))
+            matches = [result for result in results if result[0] == 'match']
+            self.assertEqual(len(matches), 2)
+            self.assertEqual(results[-1], matches[-1])
+            self.assertTrue(all(address.startswith('1B') for _, _, address in matches))
+
+        results = list(vanity.search('1zzzzz', workers=1, task_keys=100, max_keys=250))
+        self.assertEqual(results[-1][:2], ('progress', 300))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import io
+import unittest
+from bertocoin import addresses, verify
+from bertocoin.bitcoin import derive_coin_formats, derive_coins
+
+
+class Testing(unittest.TestCase):
+
+    SECRET = 'verify-test-secret'
+
+    def setUp(self):
+        self.coins = list(derive_coins(self.SECRET, [str(serial).zfill(4) for serial in range(20)],
+                                       ec_backend='table'))
+
+    def test_verify_manifest(self):
+        """
+        The coins of a manifest are derived again, and the ones with another address are found
+        """
+
+        manifest = [{'serial_number': serial_number, 'address': address} for serial_number, _, address in self.coins]
+        manifest[7]['address'] = self.coins[8][2]
+
+        for workers in [1, 2]:
+            results = list(verify.verify_manifest(self.SECRET, iter(manifest), workers=workers, chunk_size=3))
+            self.assertEqual(len(results), len(manifest))
+            self.assertEqual([result for result in results if result[1] != result[2]],
+                             [('0007', self.coins[8][2], self.coins[7][2])])
+
+    def test_verify_wifs(self):
+        """
+        The address of every WIF is derived, and invalid WIFs are reported without quoting them
+        """
+
+        lines = io.StringIO('# WIF address\n'
+                            f'{self.coins[0][1]} {self.coins[0][2]}\n'
+                            '\n'
+                            f'{self.coins[1][1]}\n'
+                            f'{self.coins[2][1][:-1]}1\n'
+                            f'{self.coins[3][1]} {self.coins[4][2]}\n')
+
+        for workers in [1, 2]:
+            lines.seek(0)
+            results = list(verify.verify_wifs(lines, workers=workers, chunk_size=2))
+            self.assertEqual([result[:3] for result in results],
+                             [(2, self.coins[0][2], self.coins[0][2]),
+                              (4, None, self.coins[1][2]),
+                              (5, None, None),
+                              (6, self.coins[4][2], self.coins[3][2])])
+            self.assertIsNotNone(results[2][3])
+            self.assertNotIn(self.coins[2][1][:-1], results[2][3])
+
+    def test_address_formats(self):
+        """
+        Manifests and WIF lists of SegWit coins are checked in the format of their addresses
+        """
+
+        encodings = dict(derive_coin_formats(self.SECRET, ['0000', '0001', '0002'], addresses.FORMATS))
+        manifest = [{'serial_number': '0000', 'address': encodings['0000']['p2wpkh'], 'address_format': 'p2wpkh'},
+                    {'serial_number': '0001', 'address': encodings['0001']['p2sh-p2wpkh'],
+                     'address_format': 'p2sh-p2wpkh'},
+                    {'serial_number': '0002', 'address': encodings['0001']['p2wpkh'], 'address_format': 'p2wpkh'}]
+        results = list(verify.verify_manifest(self.SECRET, iter(manifest)))
+        self.assertEqual([result for result in results if result[1] != result[2]],
+                         [('0002', encodings['0001']['p2wpkh'], encodings['0002']['p2wpkh'])])
+
+        lines = [f"{encodings['0000']['wif-compressed']} {encodings['0000']['p2wpkh'].upper()}\n",
+                 f"{encodings['0001']['wif-compressed']} {encodings['0001']['p2sh-p2wpkh']}\n",
+                 f"{encodings['0002']['wif-compressed']}\n"]
+        self.assertEqual([result[2] for result in verify.verify_wifs(lines)],
+                         [encodings['0000']['p2wpkh'], encodings['0001']['p2sh-p2wpkh'], encodings['0002']['p2pkh']])
+
+
+if __name__ == '__main__':
+    unittest.main()